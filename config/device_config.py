@@ -124,6 +124,10 @@ class DeviceConfig:
         """Get complete Pico TC-08 configuration"""
         return self.config.get('pico_tc08', {})
     
+    def get_pico_tc08_backend(self) -> str:
+        """Get TC-08 driver backend ('dll' for the vendor library, 'virtual' for the simulated unit)"""
+        return self.get_pico_tc08_config().get('backend', 'dll')
+    
     def get_temperature_channel_config(self, channel_name: str) -> Dict[str, Any]:
         """Get configuration for specific temperature channel including zero offset"""
         channels = self.config.get('pico_tc08', {}).get('channels', {})
@@ -236,6 +240,133 @@ class DeviceConfig:
         """Get sample rate for specific device"""
         return self.get_sample_rates().get(device, 1.0)
     
+    def get_startup_config(self) -> Dict[str, Any]:
+        """Get service startup settings (parallel connects, per-service deadlines, degraded mode)"""
+        startup = self.config.get('system', {}).get('startup', {})
+        timeouts = {'ni_daq': 15.0, 'pico_tc08': 10.0, 'bga244': 20.0, 'cvm24p': 30.0}
+        timeouts.update(startup.get('timeouts', {}))
+        return {
+            'parallel': startup.get('parallel', True),
+            'allow_degraded': startup.get('allow_degraded', False),
+            'timeouts': timeouts
+        }
+    
+    def get_supervisor_config(self) -> Dict[str, Any]:
+        """Get service supervisor settings (stall detection and reconnect backoff)"""
+        supervisor = self.config.get('system', {}).get('supervisor', {})
+        return {
+            'enabled': supervisor.get('enabled', True),
+            'check_interval': supervisor.get('check_interval', 0.1),
+            'stall_periods': supervisor.get('stall_periods', 2.0),
+            'min_stall_seconds': supervisor.get('min_stall_seconds', 0.5),
+            'backoff_initial': supervisor.get('backoff_initial', 1.0),
+            'backoff_max': supervisor.get('backoff_max', 30.0)
+        }
+    
+    def get_runtime_config(self) -> Dict[str, Any]:
+        """Get acquisition runtime settings (per-service threads, one shared event loop, or child processes)"""
+        runtime = self.config.get('system', {}).get('runtime', {})
+        return {
+            'mode': runtime.get('mode', 'threads'),
+            'executor_workers': runtime.get('executor_workers', 4),
+            'mirror_rate': runtime.get('mirror_rate', 20.0),
+            'ring_capacity': runtime.get('ring_capacity', 1024)
+        }
+    
+    def get_scheduler_config(self) -> Dict[str, Any]:
+        """Get deadline scheduler settings (overrun policy and log tick alignment)"""
+        scheduler = self.config.get('system', {}).get('scheduler', {})
+        return {
+            'overrun_policy': scheduler.get('overrun_policy', 'skip'),
+            'max_catch_up': scheduler.get('max_catch_up', 5),
+            'log_align_to': scheduler.get('log_align_to', 'cvm24p'),
+            'log_phase': scheduler.get('log_phase', 0.01)
+        }
+    
+    def get_storage_config(self) -> Dict[str, Any]:
+        """Get session data storage settings (backend, columnar options, compression and rotation)"""
+        storage = self.config.get('system', {}).get('storage', {})
+        return {
+            'backend': storage.get('backend', 'csv'),
+            'columnar': {
+                'row_group_size': storage.get('row_group_size', 1000),
+                'compression': storage.get('compression', 'zstd')
+            },
+            'segments': {
+                'text_compression': storage.get('csv_compression', 'none'),
+                'rotate_bytes': int(storage.get('rotate_mb', 0) * 1024 * 1024),
+                'rotate_seconds': storage.get('rotate_minutes', 0) * 60
+            }
+        }
+    
+    def get_logging_config(self) -> Dict[str, Any]:
+        """Get session data logging settings (mode and background writer policy)"""
+        logging_config = self.config.get('system', {}).get('logging', {})
+        return {
+            'mode': logging_config.get('mode', 'snapshot'),
+            'queue_rows': logging_config.get('queue_rows', 10000),
+            'overflow_policy': logging_config.get('overflow_policy', 'spill'),
+            'block_timeout': logging_config.get('block_timeout', 0.05),
+            'flush_interval': logging_config.get('flush_interval', 1.0),
+            'flush_bytes': logging_config.get('flush_bytes', 262144),
+            'fsync': logging_config.get('fsync', False),
+            'journal': logging_config.get('journal', True)
+        }
+    
+    def get_post_processing_config(self) -> Dict[str, Any]:
+        """Get end-of-test post-processing settings"""
+        post_processing = self.config.get('system', {}).get('post_processing', {})
+        return {
+            'plot_workers': post_processing.get('plot_workers', 0),
+            'background': post_processing.get('background', True),
+            'stream_cache': post_processing.get('stream_cache', True),
+            'batch_workers': post_processing.get('batch_workers', 0),
+            'batch_memory_mb': post_processing.get('batch_memory_mb', 4096),
+            'out_of_core': post_processing.get('out_of_core', 'auto'),
+            'in_memory_limit_mb': post_processing.get('in_memory_limit_mb', 1024),
+            'chunk_rows': post_processing.get('chunk_rows', 20000)
+        }
+    
+    def get_archive_config(self) -> Dict[str, Any]:
+        """Get session archiving settings (data/session_archive.py)"""
+        archive = self.config.get('system', {}).get('archive', {})
+        return {
+            'after_days': archive.get('after_days', 30),
+            'workers': archive.get('workers', 0),
+            'convert_csv': archive.get('convert_csv', True),
+            'compression_level': archive.get('compression_level', 9)
+        }
+    
+    def get_stats_config(self) -> Dict[str, Any]:
+        """Get session statistics settings (summary.json)"""
+        stats = self.config.get('system', {}).get('stats', {})
+        return {
+            'enabled': stats.get('enabled', True),
+            'percentiles': stats.get('percentiles', [1, 5, 50, 95, 99]),
+            'histogram_bins': stats.get('histogram_bins', 2048),
+            'spread_window_seconds': stats.get('spread_window_seconds', 60),
+            'thresholds': stats.get('thresholds', {})
+        }
+    
+    def get_plot_decimation_config(self) -> Dict[str, Any]:
+        """Get plot decimation settings (shared by live and post-processing plots)"""
+        decimation = self.config.get('system', {}).get('plot_decimation', {})
+        return {
+            'method': decimation.get('method', 'minmax'),
+            'points_per_pixel': decimation.get('points_per_pixel', 2),
+            'history_raw_points': decimation.get('history_raw_points', 2048),
+            'history_tier_points': decimation.get('history_tier_points', 256),
+            'history_factor': decimation.get('history_factor', 4)
+        }
+    
+    def get_live_plot_config(self) -> Dict[str, Any]:
+        """Get dashboard live plot settings (data preparation rate and Tk frame budget)"""
+        live_plots = self.config.get('system', {}).get('live_plots', {})
+        return {
+            'update_rate': live_plots.get('update_rate', 10),
+            'frame_budget_ms': live_plots.get('frame_budget_ms', 50)
+        }
+    
     def get_calibration_config(self) -> Dict[str, Any]:
         """Get calibration configuration settings"""
         return self.config.get('system', {}).get('calibration', {})
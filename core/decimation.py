@@ -0,0 +1,433 @@
+"""
+Plot decimation for AWE test rig
+Reduces long time series to about two points per pixel before drawing (post-processing and live plots)
+"""
+
+from typing import Any, Optional, Tuple
+import numpy as np
+
+# Decimation methods:
+#   minmax  min and max of each pixel-wide bucket (shared x for all channels, keeps every spike)
+#   lttb    largest-triangle-three-buckets (one point per bucket, shape-preserving, x per channel)
+#   none    plot every sample
+DECIMATION_METHODS = ('minmax', 'lttb', 'none')
+
+
+def target_points(pixel_width: float, points_per_pixel: float = 2.0) -> int:
+    """Output size for a plot area of pixel_width"""
+    return max(int(pixel_width * points_per_pixel), 4)
+
+
+def axes_target_points(ax: Any, points_per_pixel: float = 2.0, dpi: Optional[float] = None) -> int:
+    """
+    Output size for a matplotlib Axes (its drawn width in pixels at dpi)
+    
+    Args:
+        ax: Axes to draw into
+        points_per_pixel: Output points per horizontal pixel
+        dpi: Output resolution if different from the figure's (e.g. savefig dpi)
+    """
+    figure = ax.get_figure()
+    width_inches = figure.get_figwidth() * ax.get_position().width
+    return target_points(width_inches * (dpi or figure.dpi), points_per_pixel)
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Min/max envelope per x bucket, for all channels at once
+    
+    The x range is split into n_out // 2 equal buckets; each non-empty bucket becomes two
+    points at its first and last sample time carrying the channel's min and max (in the
+    order the first sample suggests). NaN samples are ignored; an all-NaN bucket stays
+    NaN so gaps remain gaps.
+    
+    Args:
+        x: Sample times, ascending (n,)
+        y: Values (n,) or (n, channels)
+        n_out: Approximate number of output points
+    
+    Returns:
+        (x_out, y_out) with x_out shared by all channels
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= n_out or len(x) < 3:
+        return x, y
+    
+    squeeze = y.ndim == 1
+    values = y[:, None] if squeeze else y
+    
+    buckets = max(n_out // 2, 1)
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side='left'))
+    starts = starts[starts < len(x)]
+    ends = np.append(starts[1:], len(x))
+    
+    with np.errstate(invalid='ignore'):
+        low = np.fmin.reduceat(values, starts, axis=0)
+        high = np.fmax.reduceat(values, starts, axis=0)
+    
+    # Emit max first where the bucket starts nearer its max (keeps the line continuous)
+    first = values[starts]
+    max_first = np.abs(high - first) < np.abs(first - low)
+    
+    x_out = np.empty(2 * len(starts))
+    x_out[0::2] = x[starts]
+    x_out[1::2] = x[ends - 1]
+    y_out = np.empty((2 * len(starts), values.shape[1]))
+    y_out[0::2] = np.where(max_first, high, low)
+    y_out[1::2] = np.where(max_first, low, high)
+    return x_out, (y_out[:, 0] if squeeze else y_out)
+
+
+def lttb_decimate(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-triangle-three-buckets, vectorized over channels
+    
+    Keeps the first and last sample and, from each bucket in between, the sample forming
+    the largest triangle with the previously kept point and the next bucket's mean.
+    
+    Args:
+        x: Sample times, ascending (n,)
+        y: Values (n,) or (n, channels); NaN samples are never chosen unless a whole bucket is NaN
+        n_out: Number of output points
+    
+    Returns:
+        (x_out, y_out), both (n_out,) for 1D input or (n_out, channels)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    count = len(x)
+    if count <= n_out or n_out < 3:
+        return x, y
+    
+    squeeze = y.ndim == 1
+    values = y[:, None] if squeeze else y
+    channels = values.shape[1]
+    columns = np.arange(channels)
+    
+    # Bucket boundaries over samples 1 .. count-2 (first and last are always kept)
+    bounds = np.floor(np.linspace(1, count - 1, n_out - 1)).astype(np.int64)
+    x_out = np.empty((n_out, channels))
+    y_out = np.empty((n_out, channels))
+    x_out[0], y_out[0] = x[0], values[0]
+    x_out[-1], y_out[-1] = x[-1], values[-1]
+    
+    previous_x = np.full(channels, x[0])
+    previous_y = values[0].copy()
+    for bucket in range(n_out - 2):
+        start, end = bounds[bucket], max(bounds[bucket + 1], bounds[bucket] + 1)
+        next_start, next_end = end, (bounds[bucket + 2] if bucket + 2 < len(bounds) else count)
+        next_end = max(next_end, next_start + 1)
+        mean_x = x[next_start:next_end].mean()
+        
+        # NaN-ignoring mean from sum/count (np.nanmean warns on all-NaN buckets; those stay NaN)
+        next_values = values[next_start:next_end]
+        present = ~np.isnan(next_values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_y = np.where(present, next_values, 0.0).sum(axis=0) / present.sum(axis=0)
+        
+        bucket_x = x[start:end, None]
+        bucket_y = values[start:end]
+        area = np.abs((previous_x - mean_x) * (bucket_y - previous_y)
+                      - (previous_x - bucket_x) * (mean_y - previous_y))
+        area = np.where(np.isnan(area), -1.0, area)
+        chosen = start + np.argmax(area, axis=0)
+        
+        x_out[bucket + 1] = x[chosen]
+        y_out[bucket + 1] = values[chosen, columns]
+        previous_x = x_out[bucket + 1]
+        previous_y = np.where(np.isnan(y_out[bucket + 1]), previous_y, y_out[bucket + 1])
+    
+    if squeeze:
+        return x_out[:, 0], y_out[:, 0]
+    return x_out, y_out
+
+
+def _reduce_groups(index: np.ndarray, x_first: np.ndarray, x_last: np.ndarray, first: np.ndarray,
+                   low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Combine consecutive rows sharing a bucket index (index must be non-decreasing)"""
+    starts = np.flatnonzero(np.diff(index, prepend=index[0] - 1))
+    ends = np.append(starts[1:], len(index)) - 1
+    with np.errstate(invalid='ignore'):
+        return (index[starts], x_first[starts], x_last[ends], first[starts],
+                np.fmin.reduceat(low, starts, axis=0), np.fmax.reduceat(high, starts, axis=0))
+
+
+class StreamingMinMax:
+    """Min/max envelope built chunk by chunk, for series too long to hold in memory
+    
+    Buckets have a fixed width in x; whenever the series outgrows `buckets` buckets the
+    width doubles and neighbouring buckets merge pairwise (min of mins, max of maxes),
+    so the result is the same envelope minmax_decimate would give at that width while
+    memory stays at `buckets` rows per channel.
+    """
+    
+    def __init__(self, n_out: int, initial_width: float = 1e-3):
+        """
+        Args:
+            n_out: Approximate number of output points (two per bucket)
+            initial_width: Starting bucket width in x units (grows as needed)
+        """
+        self.buckets = max(n_out // 2, 2)
+        self.width = initial_width
+        self.origin = None
+        self._state = None  # (index, x_first, x_last, first, low, high)
+    
+    def update(self, x: np.ndarray, y: np.ndarray):
+        """
+        Add a chunk of rows (x ascending and after every earlier chunk)
+        
+        Args:
+            x: Sample times (rows,)
+            y: Values (rows, channels)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if not len(x):
+            return
+        if self.origin is None:
+            self.origin = x[0]
+        
+        # Widen until the whole series so far fits the bucket budget
+        while (x[-1] - self.origin) / self.width >= self.buckets:
+            self.width *= 2
+            if self._state is not None:
+                index, *rest = self._state
+                self._state = _reduce_groups(index // 2, *rest)
+        
+        index = np.floor((x - self.origin) / self.width).astype(np.int64)
+        chunk = _reduce_groups(index, x, x, y, y, y)
+        if self._state is None:
+            self._state = chunk
+            return
+        
+        merged = [np.concatenate([old, new]) for old, new in zip(self._state, chunk)]
+        self._state = _reduce_groups(*merged) if self._state[0][-1] == chunk[0][0] else tuple(merged)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the envelope"""
+        return sum(array.nbytes for array in self._state) if self._state is not None else 0
+    
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(x_out, y_out) in minmax_decimate's layout: two points per bucket, shared x"""
+        if self._state is None:
+            return np.empty(0), np.empty((0, 0))
+        _, x_first, x_last, first, low, high = self._state
+        max_first = np.abs(high - first) < np.abs(first - low)
+        x_out = np.empty(2 * len(x_first))
+        x_out[0::2] = x_first
+        x_out[1::2] = x_last
+        y_out = np.empty((2 * len(x_first), low.shape[1]))
+        y_out[0::2] = np.where(max_first, high, low)
+        y_out[1::2] = np.where(max_first, low, high)
+        return x_out, y_out
+
+
+class _Ring:
+    """Fixed-capacity row buffer (oldest rows overwritten)"""
+    
+    def __init__(self, capacity: int, width: int):
+        self.rows = np.empty((capacity, width))
+        self.start = 0
+        self.size = 0
+    
+    def append(self, row: np.ndarray):
+        capacity = len(self.rows)
+        self.rows[(self.start + self.size) % capacity] = row
+        if self.size < capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % capacity
+    
+    @property
+    def full(self) -> bool:
+        return self.size == len(self.rows)
+    
+    def array(self) -> np.ndarray:
+        """Rows oldest first (a copy)"""
+        end = self.start + self.size
+        if end <= len(self.rows):
+            return self.rows[self.start:end].copy()
+        return np.concatenate([self.rows[self.start:], self.rows[:end - len(self.rows)]])
+
+
+class LevelOfDetailHistory:
+    """Multi-resolution history of a live plot's channels, bounded in memory and draw cost
+    
+    The most recent raw_points samples are kept as they are. Older data lives in tiers of
+    min/max buckets: a tier-1 bucket summarizes `factor` samples, a tier-k bucket `factor`
+    tier-(k-1) buckets, and each tier keeps its latest tier_points buckets. When the coarsest
+    tier fills up a coarser one is built from it, so the whole test is always covered.
+    Appending a sample is O(1) amortized (per channel). A snapshot has at most
+    raw_points + 2 * tier_points * tiers rows, and tiers grows only with log(samples).
+    """
+    
+    def __init__(self, channels: int, raw_points: int = 2048, tier_points: int = 256, factor: int = 4):
+        """
+        Args:
+            channels: Values per sample
+            raw_points: Recent samples kept at full resolution
+            tier_points: Buckets kept per tier (rounded up to a multiple of factor)
+            factor: Samples (or finer buckets) per bucket
+        """
+        self.channels = channels
+        self.raw_points = max(raw_points, factor)
+        self.factor = max(factor, 2)
+        self.tier_points = -(-max(tier_points, 2 * self.factor) // self.factor) * self.factor
+        self.clear()
+    
+    def clear(self):
+        """Forget all samples"""
+        self.samples = 0
+        self._raw = _Ring(self.raw_points, 1 + self.channels)  # [t, values...]
+        self._tiers = []
+        self._add_tier()
+    
+    def _add_tier(self):
+        """Append an empty tier: ring of [t_first, t_last, min..., max...] plus the bucket being filled"""
+        self._tiers.append({'ring': _Ring(self.tier_points, 2 + 2 * self.channels), 'count': 0,
+                            'pending': np.empty(2 + 2 * self.channels)})
+    
+    def _accumulate(self, level: int, row: np.ndarray):
+        """Fold a bucket-shaped row into tier `level`; a completed bucket moves on to the next tier"""
+        while True:
+            tier = self._tiers[level]
+            pending = tier['pending']
+            if tier['count'] == 0:
+                pending[:] = row
+            else:
+                pending[1] = row[1]
+                np.fmin(pending[2:2 + self.channels], row[2:2 + self.channels], out=pending[2:2 + self.channels])
+                np.fmax(pending[2 + self.channels:], row[2 + self.channels:], out=pending[2 + self.channels:])
+            tier['count'] += 1
+            if tier['count'] < self.factor:
+                return
+            
+            tier['count'] = 0
+            if tier['ring'].full and level + 1 == len(self._tiers):
+                self._coarsen(level)
+            tier['ring'].append(pending)
+            if level + 1 == len(self._tiers):
+                return
+            level, row = level + 1, pending
+    
+    def _coarsen(self, level: int):
+        """Build a new coarsest tier from the full tier below it (so its oldest buckets can be dropped)"""
+        buckets = self._tiers[level]['ring'].array()
+        self._add_tier()
+        starts = np.arange(0, len(buckets), self.factor)
+        with np.errstate(invalid='ignore'):
+            merged = np.column_stack([
+                buckets[starts, 0], buckets[np.minimum(starts + self.factor, len(buckets)) - 1, 1],
+                np.fmin.reduceat(buckets[:, 2:2 + self.channels], starts, axis=0),
+                np.fmax.reduceat(buckets[:, 2 + self.channels:], starts, axis=0)
+            ])
+        for row in merged:
+            self._tiers[-1]['ring'].append(row)
+    
+    def append(self, t: float, values):
+        """Add one sample (values: one per channel)"""
+        row = np.empty(1 + self.channels)
+        row[0] = t
+        row[1:] = values
+        self._raw.append(row)
+        self.samples += 1
+        
+        bucket = np.empty(2 + 2 * self.channels)
+        bucket[0] = bucket[1] = t
+        bucket[2:2 + self.channels] = row[1:]
+        bucket[2 + self.channels:] = row[1:]
+        self._accumulate(0, bucket)
+    
+    def __len__(self) -> int:
+        return self.samples
+    
+    @property
+    def tiers(self) -> int:
+        return len(self._tiers)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the history (fixed per tier, independent of test length)"""
+        return self._raw.rows.nbytes + sum(tier['ring'].rows.nbytes for tier in self._tiers)
+    
+    def snapshot(self, columns=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The whole history at decreasing resolution with age
+        
+        Raw samples cover the recent window; before it, each tier contributes the buckets
+        starting before what the finer levels cover, as two points (min then max) per bucket.
+        
+        Args:
+            columns: Optional channel indices to return (default all)
+        
+        Returns:
+            (x, y) with x ascending (rows,) and y (rows, channels)
+        """
+        columns = np.arange(self.channels) if columns is None else np.asarray(columns, dtype=np.int64)
+        raw = self._raw.array()
+        if not len(raw):
+            return np.empty(0), np.empty((0, len(columns)))
+        
+        parts_x = [raw[:, 0]]
+        parts_y = [raw[:, 1 + columns]]
+        covered_from = raw[0, 0]
+        for tier in self._tiers:
+            buckets = tier['ring'].array()
+            buckets = buckets[buckets[:, 0] < covered_from]
+            if not len(buckets):
+                continue
+            # A bucket straddling the finer data ends where that data starts (x stays ascending)
+            x = np.empty(2 * len(buckets))
+            x[0::2] = buckets[:, 0]
+            x[1::2] = np.minimum(buckets[:, 1], covered_from)
+            y = np.empty((2 * len(buckets), len(columns)))
+            y[0::2] = buckets[:, 2 + columns]
+            y[1::2] = buckets[:, 2 + self.channels + columns]
+            parts_x.append(x)
+            parts_y.append(y)
+            covered_from = buckets[0, 0]
+        return np.concatenate(parts_x[::-1]), np.concatenate(parts_y[::-1])
+
+
+def decimate(x: np.ndarray, y: np.ndarray, n_out: int, method: str = 'minmax') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate with the given method (see DECIMATION_METHODS)
+    
+    Returns:
+        (x_out, y_out); x_out is 1D (shared) except for 'lttb' with several channels
+    """
+    if method == 'minmax':
+        return minmax_decimate(x, y, n_out)
+    if method == 'lttb':
+        return lttb_decimate(x, y, n_out)
+    if method == 'none':
+        return np.asarray(x), np.asarray(y)
+    raise ValueError(f"Unknown decimation method '{method}' (expected one of {DECIMATION_METHODS})")
+
+
+def main():
+    """Decimate 120 channels of a multi-day 10 Hz session and check spikes survive"""
+    import time
+    
+    print("=" * 60)
+    print("DECIMATION TEST: 120 channels, 3 days at 10 Hz")
+    print("=" * 60)
+    
+    samples = 3 * 24 * 3600 * 10
+    x = np.arange(samples) / 10.0
+    y = 1.8 + 0.01 * np.sin(x[:, None] / 3600 + np.arange(120)) + np.zeros((1, 120), dtype=np.float32)
+    y[samples // 2, 7] = 3.0  # one-sample spike on cell 8
+    
+    for method in ('minmax', 'lttb'):
+        started = time.perf_counter()
+        x_out, y_out = decimate(x, y, 4000, method)
+        print(f"   {method}: {samples} -> {len(y_out)} rows in {time.perf_counter() - started:.2f} s, "
+              f"spike kept: {np.nanmax(y_out[:, 7]) == 3.0}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
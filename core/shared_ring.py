@@ -0,0 +1,169 @@
+"""
+Shared-memory sample ring buffer for AWE test rig
+Single writer process, any number of read-only readers, consistency via a seqlock header
+"""
+
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+# Header layout (uint64): sequence counter, rows written, values per row, ring capacity,
+# writer heartbeat (monotonic ns of the last write or touch)
+HEADER_FIELDS = 5
+_SEQ, _COUNT, _WIDTH, _CAPACITY, _HEARTBEAT = range(HEADER_FIELDS)
+
+
+class SharedRingBuffer:
+    """Ring of float64 rows [monotonic timestamp, value_1 ... value_n] in a shared memory segment
+    
+    The writer makes the sequence counter odd while it updates a slot and even when done.
+    Readers retry whenever the counter is odd or changed during their copy, so they never
+    see a half-written row and never block the writer.
+    """
+    
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        self.width = int(self._header[_WIDTH])
+        self.capacity = int(self._header[_CAPACITY])
+        self._rows = np.ndarray((self.capacity, self.width + 1), dtype=np.float64,
+                                buffer=shm.buf, offset=HEADER_FIELDS * 8)
+    
+    @classmethod
+    def create(cls, width: int, capacity: int = 1024, name: Optional[str] = None) -> 'SharedRingBuffer':
+        """Create a new ring (the creator owns the segment and unlinks it on close)"""
+        size = HEADER_FIELDS * 8 + capacity * (width + 1) * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = [0, 0, width, capacity, 0]
+        del header
+        return cls(shm, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> 'SharedRingBuffer':
+        """Attach to an existing ring created by another process (spawned children share its resource tracker)"""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    @property
+    def count(self) -> int:
+        """Total rows written since creation"""
+        return int(self._header[_COUNT])
+    
+    @property
+    def heartbeat(self) -> Optional[float]:
+        """Monotonic time of the writer's last write or touch (None before the first one)"""
+        heartbeat_ns = int(self._header[_HEARTBEAT])
+        return heartbeat_ns / 1e9 if heartbeat_ns else None
+    
+    def touch(self):
+        """Record that the writer is alive without appending a row"""
+        self._header[_HEARTBEAT] = time.monotonic_ns()
+    
+    def write(self, values: Sequence[float], timestamp: Optional[float] = None):
+        """Append one row (single writer only)"""
+        header = self._header
+        row = self._rows[int(header[_COUNT]) % self.capacity]
+        
+        header[_SEQ] += 1  # odd - write in progress
+        row[0] = time.monotonic() if timestamp is None else timestamp
+        row[1:] = values
+        header[_COUNT] += 1
+        header[_SEQ] += 1  # even - consistent
+        header[_HEARTBEAT] = time.monotonic_ns()
+    
+    def read_latest(self, retries: int = 1000) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Copy the newest row
+        
+        Returns:
+            (rows written, row copy) or None if nothing has been written yet
+        """
+        header = self._header
+        for _ in range(retries):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            
+            count = int(header[_COUNT])
+            if count == 0:
+                return None
+            row = self._rows[(count - 1) % self.capacity].copy()
+            
+            if int(header[_SEQ]) == seq:
+                return count, row
+        return None
+    
+    def read_since(self, last_count: int, retries: int = 1000) -> Tuple[int, np.ndarray]:
+        """
+        Copy every row written after last_count (oldest first)
+        
+        Rows already overwritten by the writer are skipped; compare the returned
+        row count with the expected one to detect such gaps.
+        
+        Returns:
+            (rows written, array of shape (n, width + 1))
+        """
+        header = self._header
+        for _ in range(retries):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            
+            count = int(header[_COUNT])
+            first = max(last_count, count - self.capacity)
+            rows = self._rows[np.arange(first, count) % self.capacity]
+            
+            if int(header[_SEQ]) == seq:
+                return count, rows
+        return last_count, np.empty((0, self.width + 1))
+    
+    def close(self):
+        """Detach from the segment (and remove it if this process created it)"""
+        if self._shm is None:
+            return
+        
+        # Views into the buffer must be released before the segment can close
+        self._header = None
+        self._rows = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+
+
+def main():
+    """Write and read back a few rows"""
+    print("=" * 60)
+    print("SHARED RING TEST: Seqlock ring buffer")
+    print("=" * 60)
+    
+    ring = SharedRingBuffer.create(width=3, capacity=4)
+    reader = SharedRingBuffer.attach(ring.name)
+    
+    for i in range(6):
+        ring.write([i, i * 2, i * 3])
+    
+    count, latest = reader.read_latest()
+    print(f"1. Rows written: {count}, latest: {latest[1:].tolist()}")
+    
+    count, rows = reader.read_since(0)
+    print(f"2. Rows still in ring: {len(rows)} (capacity {reader.capacity})")
+    
+    reader.close()
+    ring.close()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
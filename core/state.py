@@ -3,8 +3,52 @@ Global application state singleton for AWE test rig
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Set
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
 import threading
+import time
+
+
+# Event names for actuator and mode changes (valve names in valve_states order)
+VALVE_EVENTS = ('koh_storage', 'di_storage', 'stack_drain', 'h2_purge', 'o2_purge', 'h2_deoxo')
+PUMP_EVENTS = {'pump': 'pump_di_fill', 'koh_pump': 'pump_koh_fill'}
+MODE_EVENTS = ('test_running', 'test_paused', 'emergency_stop', 'purge_mode')
+
+# time.time_ns() can advance in 1-16 ms steps (Windows); events use the sub-microsecond
+# perf_counter anchored to the epoch. Samples are stamped with time.time_ns(), which NTP
+# slews, so the anchor is checked against it (at most once per interval) and moved when
+# the two differ by more than the threshold (never finer than twice the wall clock's step)
+EVENT_CLOCK_CHECK_INTERVAL_NS = 1_000_000_000
+EVENT_CLOCK_MAX_DRIFT_NS = max(1_000_000, int(2e9 * time.get_clock_info('time').resolution))
+
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+_last_clock_check_ns = time.perf_counter_ns()
+
+
+def resync_event_clock() -> int:
+    """
+    Re-anchor event timestamps to the wall clock used for samples (e.g. at session start)
+    
+    Returns:
+        Correction applied in nanoseconds
+    """
+    global _EPOCH_OFFSET_NS, _last_clock_check_ns
+    offset_ns = time.time_ns() - time.perf_counter_ns()
+    correction = offset_ns - _EPOCH_OFFSET_NS
+    _EPOCH_OFFSET_NS = offset_ns
+    _last_clock_check_ns = time.perf_counter_ns()
+    return correction
+
+
+def event_time_ns() -> int:
+    """Epoch nanoseconds with sub-millisecond resolution (actuator/mode event timestamps)"""
+    global _EPOCH_OFFSET_NS, _last_clock_check_ns
+    now_ns = time.perf_counter_ns()
+    if now_ns - _last_clock_check_ns >= EVENT_CLOCK_CHECK_INTERVAL_NS:
+        _last_clock_check_ns = now_ns
+        offset_ns = time.time_ns() - now_ns
+        if abs(offset_ns - _EPOCH_OFFSET_NS) > EVENT_CLOCK_MAX_DRIFT_NS:
+            _EPOCH_OFFSET_NS = offset_ns
+    return now_ns + _EPOCH_OFFSET_NS
 
 
 @dataclass
@@ -15,7 +59,10 @@ class GlobalState:
     test_running: bool = False
     test_paused: bool = False
     emergency_stop: bool = False
-    timer_value: float = 0.0  # seconds
+    
+    # Test timer - timer_value is computed from the source when read (no update thread)
+    _timer_source: Optional[Callable[[], float]] = None
+    _timer_value: float = 0.0  # seconds, used when no source is set
     
     # Session information
     current_session_id: Optional[str] = None
@@ -29,6 +76,9 @@ class GlobalState:
         'cvm24p': False
     })
     
+    # Devices whose polling has stalled - their latest values in this state are stale
+    stale_devices: Set[str] = field(default_factory=set)
+    
     # Individual BGA connection status (for 3 separate units)
     bga_connections: Dict[str, bool] = field(default_factory=lambda: {
         'bga244_1': False,
@@ -41,6 +91,7 @@ class GlobalState:
     current_value: float = 0.0  # 1 current sensor
     flowrate_value: float = 0.0  # 1 flowrate sensor
     temperature_values: List[float] = field(default_factory=lambda: [0.0] * 8)  # 8 thermocouples
+    temperature_device_time: float = 0.0  # TC-08 clock (s since streaming start) of latest temperature reading
     cell_voltages: List[float] = field(default_factory=lambda: [0.0] * 120)  # 120 cell voltages
     
     # UI State - which channels to display
@@ -79,6 +130,29 @@ class GlobalState:
     # Thread lock for state updates
     _lock: threading.Lock = field(default_factory=threading.Lock)
     
+    # Callbacks run after any actuator change (e.g. forwarding commands to acquisition processes)
+    _actuator_listeners: List[Callable[[], None]] = field(default_factory=list)
+    
+    # Callbacks receiving every sample block a service publishes (e.g. the native-rate logger)
+    _sample_listeners: List[Callable[[str, List[Tuple[int, List[Any]]]], None]] = field(default_factory=list)
+    
+    # Callbacks receiving each actuator/mode change as (epoch ns, event name, new value)
+    _event_listeners: List[Callable[[int, str, Any], None]] = field(default_factory=list)
+    
+    @property
+    def timer_value(self) -> float:
+        """Elapsed test time in seconds"""
+        source = self._timer_source
+        return source() if source else self._timer_value
+    
+    @timer_value.setter
+    def timer_value(self, value: float):
+        self._timer_value = value
+    
+    def set_timer_source(self, source: Optional[Callable[[], float]]):
+        """Compute timer_value lazily from source (e.g. Timer.get_elapsed_time)"""
+        self._timer_source = source
+    
     def update_sensor_values(self, **kwargs):
         """Thread-safe update of sensor values"""
         with self._lock:
@@ -94,10 +168,25 @@ class GlobalState:
             elif device in self.bga_connections:
                 self.bga_connections[device] = connected
     
+    def set_device_stale(self, device: str, stale: bool):
+        """Thread-safe update of the stale flag for a device's values"""
+        with self._lock:
+            if stale:
+                self.stale_devices.add(device)
+            else:
+                self.stale_devices.discard(device)
+    
+    def is_device_stale(self, device: str) -> bool:
+        """Check whether a device's latest values are stale"""
+        with self._lock:
+            return device in self.stale_devices
+    
     def update_test_status(self, running: bool = None, paused: bool = None, 
                           session_id: str = None, session_start_time: str = None):
         """Thread-safe update of test status and session info"""
+        timestamp = event_time_ns()
         with self._lock:
+            before = self._event_values()
             if running is not None:
                 self.test_running = running
             if paused is not None:
@@ -106,10 +195,15 @@ class GlobalState:
                 self.current_session_id = session_id
             if session_start_time is not None:
                 self.session_start_time = session_start_time
+            changes = self._event_changes(timestamp, before)
+        
+        self._notify_event_listeners(changes)
     
     def set_actuator_state(self, actuator: str, state: bool, index: int = None):
         """Thread-safe update of actuator states"""
+        timestamp = event_time_ns()
         with self._lock:
+            before = self._event_values()
             if actuator == 'pump':
                 self.pump_state = state
             elif actuator == 'koh_pump':
@@ -117,14 +211,140 @@ class GlobalState:
             elif actuator == 'valve' and index is not None:
                 if 0 <= index < len(self.valve_states):
                     self.valve_states[index] = state
+            changes = self._event_changes(timestamp, before)
+        
+        self._notify_event_listeners(changes)
+        self._notify_actuator_listeners()
+    
+    def set_outputs_safe(self):
+        """Thread-safe de-energize of every valve and pump (E-stop and safe state), one event per change"""
+        timestamp = event_time_ns()
+        with self._lock:
+            before = self._event_values()
+            self.pump_state = False
+            self.koh_pump_state = False
+            for i in range(len(self.valve_states)):
+                self.valve_states[i] = False
+            changes = self._event_changes(timestamp, before)
+        
+        self._notify_event_listeners(changes)
+        self._notify_actuator_listeners()
+    
+    def set_purge_mode(self, enabled: bool):
+        """Thread-safe update of the BGA244 purge mode flag"""
+        timestamp = event_time_ns()
+        with self._lock:
+            before = self._event_values()
+            self.purge_mode = enabled
+            changes = self._event_changes(timestamp, before)
+        
+        self._notify_event_listeners(changes)
+    
+    def add_actuator_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked after every actuator state change"""
+        with self._lock:
+            if callback not in self._actuator_listeners:
+                self._actuator_listeners.append(callback)
+    
+    def remove_actuator_listener(self, callback: Callable[[], None]):
+        """Unregister an actuator change callback"""
+        with self._lock:
+            if callback in self._actuator_listeners:
+                self._actuator_listeners.remove(callback)
+    
+    def _notify_actuator_listeners(self):
+        with self._lock:
+            listeners = list(self._actuator_listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Actuator listener error: {e}")
+    
+    def publish_samples(self, stream: str, samples: List[Tuple[int, List[Any]]]):
+        """
+        Hand a block of timestamped samples from a service to the sample listeners
+        
+        Args:
+            stream: Publishing device ('ni_daq', 'pico_tc08', 'bga244', 'cvm24p')
+            samples: [(epoch nanoseconds, values), ...] oldest first
+        """
+        listeners = self._sample_listeners
+        if not listeners:
+            return
+        for callback in list(listeners):
+            try:
+                callback(stream, samples)
+            except Exception as e:
+                print(f"⚠️  Sample listener error: {e}")
+    
+    def add_sample_listener(self, callback: Callable[[str, List[Tuple[int, List[Any]]]], None]):
+        """Register a callback invoked with every published sample block"""
+        with self._lock:
+            if callback not in self._sample_listeners:
+                self._sample_listeners.append(callback)
+    
+    def remove_sample_listener(self, callback: Callable[[str, List[Tuple[int, List[Any]]]], None]):
+        """Unregister a sample block callback"""
+        with self._lock:
+            if callback in self._sample_listeners:
+                self._sample_listeners.remove(callback)
     
     def set_emergency_stop(self, stop: bool = True):
         """Thread-safe emergency stop activation"""
+        timestamp = event_time_ns()
         with self._lock:
+            before = self._event_values()
             self.emergency_stop = stop
             if stop:
                 self.test_running = False
                 self.test_paused = False
+            changes = self._event_changes(timestamp, before)
+        
+        self._notify_event_listeners(changes)
+    
+    def _event_values(self) -> Dict[str, bool]:
+        """Current value of every event source (caller holds the lock)"""
+        values = {name: bool(state) for name, state in zip(VALVE_EVENTS, self.valve_states)}
+        values[PUMP_EVENTS['pump']] = bool(self.pump_state)
+        values[PUMP_EVENTS['koh_pump']] = bool(self.koh_pump_state)
+        for name in MODE_EVENTS:
+            values[name] = bool(getattr(self, name))
+        return values
+    
+    def _event_changes(self, timestamp: int, before: Dict[str, bool]) -> List[Tuple[int, str, bool]]:
+        """Events for values that differ from before (caller holds the lock)"""
+        return [(timestamp, name, value) for name, value in self._event_values().items()
+                if before.get(name) != value]
+    
+    def get_event_values(self) -> Dict[str, bool]:
+        """Current actuator and mode values keyed by event name"""
+        with self._lock:
+            return self._event_values()
+    
+    def add_event_listener(self, callback: Callable[[int, str, Any], None]):
+        """Register a callback invoked with every actuator/mode change"""
+        with self._lock:
+            if callback not in self._event_listeners:
+                self._event_listeners.append(callback)
+    
+    def remove_event_listener(self, callback: Callable[[int, str, Any], None]):
+        """Unregister an actuator/mode change callback"""
+        with self._lock:
+            if callback in self._event_listeners:
+                self._event_listeners.remove(callback)
+    
+    def _notify_event_listeners(self, changes: List[Tuple[int, str, bool]]):
+        if not changes:
+            return
+        with self._lock:
+            listeners = list(self._event_listeners)
+        for callback in listeners:
+            for timestamp, name, value in changes:
+                try:
+                    callback(timestamp, name, value)
+                except Exception as e:
+                    print(f"⚠️  Event listener error: {e}")
     
     def get_test_status(self) -> Dict[str, Any]:
         """Get current test status information"""
@@ -145,7 +365,8 @@ class GlobalState:
                 "main_services": self.connections.copy(),
                 "bga_units": self.bga_connections.copy(),
                 "all_connected": all(self.connections.values()),
-                "any_bga_connected": any(self.bga_connections.values())
+                "any_bga_connected": any(self.bga_connections.values()),
+                "stale_devices": sorted(self.stale_devices)
             }
 
 
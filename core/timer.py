@@ -1,14 +1,156 @@
 """
-Timer/stopwatch logic for AWE test rig
+Timer/stopwatch logic and the shared deadline scheduler for AWE test rig
 """
 
 import time
 import threading
+from typing import Any, Dict, Optional
 from .state import get_global_state
 
 
+class PeriodicDeadline:
+    """Absolute-deadline pacing for one periodic task
+    
+    Deadlines are epoch + phase + k * period on the time.monotonic_ns clock, so the work
+    time of each iteration never accumulates as drift. Tasks sharing an epoch stay aligned
+    (e.g. 1 Hz log ticks land on 10 Hz CVM frame boundaries).
+    """
+    
+    def __init__(self, name: str, rate: float, epoch_ns: int, phase: float = 0.0,
+                 policy: str = "skip", max_catch_up: int = 5):
+        """
+        Create a deadline sequence
+        
+        Args:
+            name: Task name for statistics
+            rate: Runs per second
+            epoch_ns: Shared monotonic_ns origin of all deadline grids
+            phase: Offset in seconds from the grid (e.g. run just after another task)
+            policy: "skip" drops missed deadlines, "catch_up" runs them back to back
+            max_catch_up: Missed deadlines beyond this are skipped even with catch_up
+        """
+        if policy not in ("skip", "catch_up"):
+            raise ValueError(f"Unknown overrun policy: {policy}")
+        
+        self.name = name
+        self.rate = rate
+        self.period_ns = max(int(round(1e9 / rate)), 1)
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self._origin_ns = epoch_ns + int(round(phase * 1e9))
+        
+        # Current deadline: the latest grid point not after now
+        now_ns = time.monotonic_ns()
+        self.next_ns = self._origin_ns + ((now_ns - self._origin_ns) // self.period_ns) * self.period_ns
+        
+        # Statistics
+        self.first_tick_ns = None
+        self.last_tick_ns = None
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_lateness_ns = 0
+    
+    def tick(self, now_ns: Optional[int] = None) -> float:
+        """
+        Account for one finished iteration and advance to the next deadline
+        
+        Returns:
+            Seconds to sleep until the next deadline (0.0 when running behind)
+        """
+        now_ns = time.monotonic_ns() if now_ns is None else now_ns
+        self.ticks += 1
+        if self.first_tick_ns is None:
+            self.first_tick_ns = now_ns
+        self.last_tick_ns = now_ns
+        self.next_ns += self.period_ns
+        
+        lateness_ns = now_ns - self.next_ns
+        if lateness_ns >= 0:
+            # Iteration overran its slot
+            self.overruns += 1
+            self.max_lateness_ns = max(self.max_lateness_ns, lateness_ns)
+            missed = lateness_ns // self.period_ns
+            if self.policy == "skip" or missed > self.max_catch_up:
+                skipped = missed + 1
+                self.skipped += skipped
+                self.next_ns += skipped * self.period_ns
+            else:
+                return 0.0
+        
+        return (self.next_ns - now_ns) / 1e9
+    
+    def wait(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Tick and sleep until the next deadline
+        
+        Returns:
+            False if stop_event was set while waiting
+        """
+        delay = self.tick()
+        if stop_event is not None:
+            return not stop_event.wait(delay)
+        if delay > 0:
+            time.sleep(delay)
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get nominal vs measured rate and overrun counters"""
+        elapsed = ((self.last_tick_ns - self.first_tick_ns) / 1e9) if self.ticks > 1 else 0.0
+        return {
+            'rate': self.rate,
+            'measured_rate': (self.ticks - 1) / elapsed if elapsed > 0 else 0.0,
+            'policy': self.policy,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'max_lateness_ms': self.max_lateness_ns / 1e6
+        }
+
+
+class DeadlineScheduler:
+    """Central registry handing out phase-aligned deadlines to every periodic loop"""
+    
+    def __init__(self, default_policy: str = "skip", max_catch_up: int = 5):
+        self.epoch_ns = time.monotonic_ns()
+        self.default_policy = default_policy
+        self.max_catch_up = max_catch_up
+        self._tasks: Dict[str, PeriodicDeadline] = {}
+        self._lock = threading.Lock()
+    
+    def create_task(self, name: str, rate: float, phase: float = 0.0,
+                    policy: Optional[str] = None, align_to: Optional[str] = None) -> PeriodicDeadline:
+        """
+        Create (or replace) the deadline sequence for a task
+        
+        Args:
+            name: Unique task name
+            rate: Runs per second
+            phase: Offset in seconds from the shared grid
+            policy: "skip" or "catch_up" (defaults to the scheduler policy)
+            align_to: Name of a task whose phase is added to this one
+        """
+        with self._lock:
+            if align_to and align_to in self._tasks:
+                phase += (self._tasks[align_to]._origin_ns - self.epoch_ns) / 1e9
+            deadline = PeriodicDeadline(name, rate, self.epoch_ns, phase,
+                                        policy or self.default_policy, self.max_catch_up)
+            self._tasks[name] = deadline
+            return deadline
+    
+    def remove_task(self, name: str):
+        """Forget a task's deadline sequence"""
+        with self._lock:
+            self._tasks.pop(name, None)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for every registered task"""
+        with self._lock:
+            return {name: task.get_stats() for name, task in self._tasks.items()}
+
+
 class Timer:
-    """Stopwatch timer that updates global state"""
+    """Stopwatch timer backing state.timer_value (computed when read, no update thread)"""
     
     def __init__(self):
         self.state = get_global_state()
@@ -16,51 +158,39 @@ class Timer:
         self._elapsed_time = 0.0
         self._running = False
         self._paused = False
-        self._update_thread = None
-        self._stop_event = threading.Event()
+        self.state.set_timer_source(self.get_elapsed_time)
     
     def start(self):
         """Start the timer"""
         if not self._running:
-            self._start_time = time.time()
+            self._start_time = time.monotonic()
             self._running = True
             self._paused = False
-            self._stop_event.clear()
-            
-            # Start update thread
-            self._update_thread = threading.Thread(target=self._update_loop)
-            self._update_thread.daemon = True
-            self._update_thread.start()
     
     def pause(self):
         """Pause the timer"""
         if self._running and not self._paused:
             self._paused = True
-            self._elapsed_time += time.time() - self._start_time
+            self._elapsed_time += time.monotonic() - self._start_time
     
     def resume(self):
         """Resume the timer from pause"""
         if self._running and self._paused:
             self._paused = False
-            self._start_time = time.time()
+            self._start_time = time.monotonic()
     
     def stop(self):
         """Stop the timer"""
         if self._running:
             if not self._paused:
-                self._elapsed_time += time.time() - self._start_time
+                self._elapsed_time += time.monotonic() - self._start_time
             self._running = False
             self._paused = False
-            self._stop_event.set()
-            
-            if self._update_thread and self._update_thread.is_alive():
-                self._update_thread.join(timeout=1.0)
     
     def reset(self):
         """Reset the timer to zero"""
         self.stop()
         self._elapsed_time = 0.0
-        self.state.update_sensor_values(timer_value=0.0)
     
     def get_elapsed_time(self):
         """Get current elapsed time in seconds"""
@@ -69,17 +199,7 @@ class Timer:
         elif self._paused:
             return self._elapsed_time
         else:
-            return self._elapsed_time + (time.time() - self._start_time)
-    
-    def _update_loop(self):
-        """Background thread to update state with current time"""
-        while self._running and not self._stop_event.is_set():
-            current_time = self.get_elapsed_time()
-            self.state.update_sensor_values(timer_value=current_time)
-            
-            # Update every 100ms
-            if self._stop_event.wait(0.1):
-                break
+            return self._elapsed_time + (time.monotonic() - self._start_time)
     
     @property
     def is_running(self):
@@ -92,9 +212,11 @@ class Timer:
         return self._paused
 
 
-# Global timer instance
+# Global timer and scheduler instances
 _timer_instance = None
 _timer_lock = threading.Lock()
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
 
 
 def get_timer() -> Timer:
@@ -104,4 +226,16 @@ def get_timer() -> Timer:
         with _timer_lock:
             if _timer_instance is None:
                 _timer_instance = Timer()
-    return _timer_instance 
\ No newline at end of file
+    return _timer_instance
+
+
+def get_scheduler() -> DeadlineScheduler:
+    """Get the singleton DeadlineScheduler instance"""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:
+                from config.device_config import get_device_config
+                config = get_device_config().get_scheduler_config()
+                _scheduler_instance = DeadlineScheduler(config['overrun_policy'], config['max_catch_up'])
+    return _scheduler_instance
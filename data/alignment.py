@@ -0,0 +1,279 @@
+"""
+Multi-stream time alignment for AWE test rig session analysis
+Merges per-device streams logged at their own rates onto one common timeline
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+# Alignment strategies:
+#   asof     last sample at or before each time, if no older than tolerance
+#   nearest  closest sample before or after, if within tolerance
+#   linear   interpolation between the bracketing samples, if they are at most tolerance apart
+#   window   aggregate of the samples in (t - tolerance, t] (mean, min, max, last or count)
+STRATEGIES = ('asof', 'nearest', 'linear', 'window')
+WINDOW_AGGREGATES = ('mean', 'min', 'max', 'last', 'count')
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class TimeSeries:
+    """Numeric stream as sorted sample times (int64 ns since session start) and a 2D value array"""
+    
+    def __init__(self, name: str, times: np.ndarray, values: np.ndarray, columns: List[str]):
+        if len(times) != len(values):
+            raise ValueError(f"{name}: {len(times)} times but {len(values)} value rows")
+        self.name = name
+        self.times = times
+        self.values = values
+        self.columns = list(columns)
+    
+    def __len__(self) -> int:
+        return len(self.times)
+    
+    @classmethod
+    def from_frame(cls, name: str, df: pd.DataFrame, columns: Optional[List[str]] = None) -> 'TimeSeries':
+        """
+        Build from a logged stream DataFrame (elapsed_seconds plus numeric/bool columns)
+        
+        Args:
+            name: Stream name
+            df: Stream as read by data.storage.read_stream
+            columns: Columns to keep (all numeric columns if None)
+        """
+        if columns is None:
+            columns = [column for column in df.columns if column not in ('timestamp', 'elapsed_seconds', 'timestamp_ns')
+                       and (pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column]))]
+        
+        # elapsed_seconds shares the logger's start time across streams (no wall-clock parsing)
+        times = np.rint(df['elapsed_seconds'].to_numpy(dtype=np.float64) * NS_PER_SECOND).astype(np.int64)
+        values = df[columns].to_numpy(dtype=np.float64)
+        if len(times) > 1 and np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+        return cls(name, times, values, columns)
+
+
+def _to_ns(seconds: Optional[float]) -> Optional[int]:
+    return None if seconds is None else int(round(seconds * NS_PER_SECOND))
+
+
+def _gather(values: np.ndarray, index: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Rows of values at index where valid, NaN elsewhere"""
+    result = np.full((len(index), values.shape[1]), np.nan)
+    if valid.any():
+        result[valid] = values[index[valid]]
+    return result
+
+
+def align_asof(times: np.ndarray, series: TimeSeries, tolerance_ns: Optional[int]) -> np.ndarray:
+    """Last sample at or before each time (NaN if older than tolerance_ns; None = no limit)"""
+    index = np.searchsorted(series.times, times, side='right') - 1
+    valid = index >= 0
+    if tolerance_ns is not None:
+        age = times - series.times[np.clip(index, 0, None)] if len(series) else times
+        valid &= age <= tolerance_ns
+    return _gather(series.values, index, valid)
+
+
+def align_nearest(times: np.ndarray, series: TimeSeries, tolerance_ns: Optional[int]) -> np.ndarray:
+    """Closest sample to each time (NaN if further than tolerance_ns; None = no limit)"""
+    count = len(series)
+    if count == 0:
+        return np.full((len(times), series.values.shape[1]), np.nan)
+    
+    after = np.clip(np.searchsorted(series.times, times, side='left'), 0, count - 1)
+    before = np.clip(after - 1, 0, count - 1)
+    distance_after = np.abs(series.times[after] - times)
+    distance_before = np.abs(times - series.times[before])
+    index = np.where(distance_before <= distance_after, before, after)
+    distance = np.minimum(distance_before, distance_after)
+    valid = np.ones(len(times), dtype=bool) if tolerance_ns is None else distance <= tolerance_ns
+    return _gather(series.values, index, valid)
+
+
+def align_linear(times: np.ndarray, series: TimeSeries, tolerance_ns: Optional[int]) -> np.ndarray:
+    """
+    Linear interpolation between the samples bracketing each time
+    
+    NaN outside the stream and where the bracketing samples are more than tolerance_ns
+    apart (a dropout is not bridged). Exact sample times return the sample itself.
+    """
+    count = len(series)
+    result = np.full((len(times), series.values.shape[1]), np.nan)
+    if count == 0:
+        return result
+    
+    left = np.searchsorted(series.times, times, side='right') - 1
+    exact = (left >= 0) & (series.times[np.clip(left, 0, None)] == times)
+    inside = (left >= 0) & (left < count - 1)
+    if tolerance_ns is not None:
+        gap = series.times[np.clip(left + 1, 0, count - 1)] - series.times[np.clip(left, 0, None)]
+        inside &= gap <= tolerance_ns
+    inside &= ~exact
+    
+    if exact.any():
+        result[exact] = series.values[left[exact]]
+    if inside.any():
+        lo, hi = left[inside], left[inside] + 1
+        t0, t1 = series.times[lo], series.times[hi]
+        weight = ((times[inside] - t0) / (t1 - t0))[:, None]
+        v0, v1 = series.values[lo], series.values[hi]
+        result[inside] = v0 + (v1 - v0) * weight
+    return result
+
+
+def align_window(times: np.ndarray, series: TimeSeries, window_ns: int, how: str = 'mean') -> np.ndarray:
+    """
+    Aggregate the samples in the trailing window (t - window_ns, t] of each time
+    
+    NaN samples are ignored ('last' is the latest non-NaN sample of each column);
+    empty windows are NaN (0 for 'count').
+    """
+    if how not in WINDOW_AGGREGATES:
+        raise ValueError(f"Unknown window aggregate '{how}' (expected one of {WINDOW_AGGREGATES})")
+    if window_ns is None or window_ns <= 0:
+        raise ValueError("Window alignment needs a positive tolerance (window length)")
+    
+    start = np.searchsorted(series.times, times - window_ns, side='right')
+    end = np.searchsorted(series.times, times, side='right')
+    filled = end > start
+    width = series.values.shape[1]
+    
+    values = np.asarray(series.values, dtype=np.float64)
+    present = ~np.isnan(values)
+    
+    if how == 'last':
+        # Per column, the index of the latest non-NaN sample at or before each row (-1 before the first)
+        rows = np.arange(len(values))[:, None]
+        latest = np.maximum.accumulate(np.where(present, rows, -1), axis=0)
+        result = np.full((len(times), width), np.nan)
+        if filled.any():
+            index = latest[end[filled] - 1]
+            valid = index >= start[filled][:, None]
+            columns = np.broadcast_to(np.arange(width), index.shape)
+            result[filled] = np.where(valid, values[np.clip(index, 0, None), columns], np.nan)
+        return result
+    counts = np.vstack([np.zeros((1, width)), np.cumsum(present, axis=0)])
+    window_counts = counts[end] - counts[start]
+    if how == 'count':
+        return window_counts
+    
+    result = np.full((len(times), width), np.nan)
+    if how == 'mean':
+        sums = np.vstack([np.zeros((1, width)), np.cumsum(np.where(present, values, 0.0), axis=0)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = (sums[end] - sums[start]) / window_counts
+        result[window_counts == 0] = np.nan
+        return result
+    
+    # min/max: reduceat over interleaved [start, end) pairs (sentinel row so end may equal len)
+    if filled.any():
+        fill = np.inf if how == 'min' else -np.inf
+        padded = np.vstack([np.where(present, values, fill), np.full((1, width), fill)])
+        bounds = np.column_stack([start[filled], end[filled]]).ravel()
+        reduce = np.minimum if how == 'min' else np.maximum
+        reduced = reduce.reduceat(padded, bounds, axis=0)[::2]
+        reduced[np.isinf(reduced)] = np.nan
+        result[filled] = reduced
+    return result
+
+
+def make_timeline(series: Sequence[TimeSeries], rate: float) -> np.ndarray:
+    """Uniform timeline (ns) at rate Hz over the span where all streams have data"""
+    spans = [(s.times[0], s.times[-1]) for s in series if len(s)]
+    if not spans:
+        return np.zeros(0, dtype=np.int64)
+    start = max(span[0] for span in spans)
+    end = min(span[1] for span in spans)
+    step = int(round(NS_PER_SECOND / rate))
+    if end < start:
+        return np.zeros(0, dtype=np.int64)
+    return np.arange(start, end + 1, step, dtype=np.int64)
+
+
+def align_streams(series: Dict[str, TimeSeries], specs: Dict[str, Dict[str, Any]],
+                  timeline: Union[str, float, np.ndarray]) -> pd.DataFrame:
+    """
+    Merge streams onto one timeline
+    
+    Args:
+        series: Stream name -> TimeSeries
+        specs: Stream name -> {'strategy': one of STRATEGIES, 'tolerance': seconds (None = no limit,
+               required for 'window'), 'columns': optional subset, 'how': window aggregate}
+        timeline: A stream name (its own sample times), a rate in Hz (uniform grid over the
+                  common span) or an array of elapsed seconds
+    
+    Returns:
+        DataFrame with elapsed_seconds and the aligned columns (prefixed with the stream name
+        when two streams share a column name)
+    """
+    if isinstance(timeline, str):
+        times = np.asarray(series[timeline].times, dtype=np.int64)
+    elif np.isscalar(timeline):
+        times = make_timeline([series[name] for name in specs], float(timeline))
+    else:
+        times = np.rint(np.asarray(timeline, dtype=np.float64) * NS_PER_SECOND).astype(np.int64)
+    
+    aligned = {'elapsed_seconds': times / NS_PER_SECOND}
+    for name, spec in specs.items():
+        strategy = spec.get('strategy', 'asof')
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown alignment strategy '{strategy}' for {name} (expected one of {STRATEGIES})")
+        if 'tolerance' not in spec:
+            raise ValueError(f"No tolerance given for {name} - pass seconds, or None for no limit")
+        
+        source = series[name]
+        if spec.get('columns'):
+            picks = [source.columns.index(column) for column in spec['columns']]
+            source = TimeSeries(name, source.times, source.values[:, picks], spec['columns'])
+        
+        tolerance_ns = _to_ns(spec['tolerance'])
+        if strategy == 'asof':
+            values = align_asof(times, source, tolerance_ns)
+        elif strategy == 'nearest':
+            values = align_nearest(times, source, tolerance_ns)
+        elif strategy == 'linear':
+            values = align_linear(times, source, tolerance_ns)
+        else:
+            values = align_window(times, source, tolerance_ns, spec.get('how', 'mean'))
+        
+        for i, column in enumerate(source.columns):
+            key = column if column not in aligned else f"{name}_{column}"
+            aligned[key] = values[:, i]
+    
+    return pd.DataFrame(aligned)
+
+
+def main():
+    """Align a 250 Hz current stream and a 10 Hz voltage stream with a dropout"""
+    print("=" * 60)
+    print("ALIGNMENT TEST: Strategies")
+    print("=" * 60)
+    
+    daq_elapsed = np.arange(0, 10, 1 / 250)
+    cvm_elapsed = np.arange(0.003, 10, 1 / 10)
+    cvm_elapsed = cvm_elapsed[(cvm_elapsed < 4) | (cvm_elapsed > 5)]  # 1 s dropout
+    
+    series = {
+        'daq': TimeSeries.from_frame('daq', pd.DataFrame({
+            'elapsed_seconds': daq_elapsed, 'Current': daq_elapsed * 10})),
+        'cell_voltages': TimeSeries.from_frame('cell_voltages', pd.DataFrame({
+            'elapsed_seconds': cvm_elapsed, 'cell_001_v': 1.8 + cvm_elapsed / 100}))
+    }
+    
+    for strategy in STRATEGIES:
+        df = align_streams(series, {
+            'cell_voltages': {'strategy': 'asof', 'tolerance': 0.15},
+            'daq': {'strategy': strategy, 'tolerance': 0.1}
+        }, timeline='cell_voltages')
+        print(f"   {strategy:8s} rows {len(df)}, current at 2.003 s: {df['Current'].iloc[20]:.3f} A")
+    
+    df = align_streams(series, {'cell_voltages': {'strategy': 'linear', 'tolerance': 0.15}}, timeline=10.0)
+    print(f"   linear onto 10 Hz grid: {df['cell_001_v'].isna().sum()} points in the dropout left empty")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
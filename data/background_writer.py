@@ -0,0 +1,408 @@
+"""
+Background stream writer for AWE test rig
+Producers enqueue timestamped sample blocks; one writer thread owns all file I/O
+"""
+
+import pickle
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Overflow policies when the queue is full
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+
+
+class BackgroundWriter:
+    """Bounded sample queue drained by a dedicated writer thread with group commit
+    
+    submit() never touches a file, so a slow disk (or an antivirus scan) only grows
+    the queue. When the queue is full the overflow policy decides: 'block' waits up
+    to block_timeout for space then drops, 'drop_oldest' discards the oldest queued
+    blocks, 'spill' hands blocks to a spill thread that pickles them to a temporary
+    file, replayed in order once the writer catches up.
+    
+    Each pass the writer takes everything queued, writes it, then commits (flush,
+    optionally fsync) once flush_bytes or flush_interval has accumulated. The writer
+    owns the stream writers and closes them when it exits.
+    """
+    
+    def __init__(self, writers: Dict[str, Any], start_time: float, max_rows: int = 10000,
+                 overflow_policy: str = 'drop_oldest', block_timeout: float = 0.5,
+                 flush_interval: float = 1.0, flush_bytes: int = 262144, fsync: bool = False,
+                 spill_dir: Optional[str] = None):
+        """
+        Args:
+            writers: Stream name -> storage writer (data.storage), closed by close()
+            start_time: Session start (epoch seconds) for the elapsed_seconds column
+            max_rows: Queue capacity in sample rows
+            overflow_policy: 'block', 'drop_oldest' or 'spill'
+            block_timeout: Longest a producer waits for space under 'block'
+            flush_interval: Seconds between commits
+            flush_bytes: Text bytes written that force an early commit
+            fsync: Also fsync files on every commit
+            spill_dir: Directory for the spill file (system temp directory if None)
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}' (expected one of {OVERFLOW_POLICIES})")
+        
+        self.writers = dict(writers)
+        self.start_time = start_time
+        self.max_rows = max(int(max_rows), 1)
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fsync = fsync
+        self.spill_dir = spill_dir
+        
+        self._queue: deque = deque()
+        self._queued_rows = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = None
+        self._spill_thread = None
+        self._streams_closed = False
+        
+        # Spill state - while spilling, every new block goes to the overflow list to keep order;
+        # the spill thread moves it to the spill file outside _cond (producers never do file I/O)
+        self._spilling = False
+        self._overflow: deque = deque()
+        self._overflow_rows = 0
+        self._spill_lock = threading.Lock()  # Spill file, shared by the spill and writer threads only
+        self._spill_file = None
+        self._spill_rows = 0
+        
+        # Counters
+        self.stream_counts: Dict[str, int] = {stream: 0 for stream in writers}
+        self.submitted_rows = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.write_errors = 0  # rows the stream writer rejected (skipped, the rest of the block is kept)
+        self.spilled_rows = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self.commits = 0
+        self.fsyncs = 0
+        self.write_rate = 0.0  # rows/s over the last commit interval
+        self.busy = 0.0  # fraction of the last commit interval spent writing
+    
+    def start(self):
+        """Start the writer thread (and the spill thread under the 'spill' policy)"""
+        self._thread = threading.Thread(target=self._run, daemon=True, name="stream_writer")
+        self._thread.start()
+        if self.overflow_policy == 'spill':
+            self._spill_thread = threading.Thread(target=self._spill_worker, daemon=True, name="stream_spill")
+            self._spill_thread.start()
+    
+    def close(self, timeout: float = 10.0) -> bool:
+        """
+        Write everything still queued or spilled, commit, close the stream writers and stop
+        
+        Returns:
+            False if the writer thread was still busy after timeout; it keeps draining and
+            closes the stream writers itself when it finishes
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        
+        deadline = time.monotonic() + timeout
+        for thread in (self._thread, self._spill_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=max(deadline - time.monotonic(), 0))
+        if self._thread and self._thread.is_alive():
+            return False
+        
+        if self._thread is None:
+            self._close_streams()  # Never started
+        return True
+    
+    def is_alive(self) -> bool:
+        """True while the writer thread is still writing"""
+        return bool(self._thread and self._thread.is_alive())
+    
+    def submit(self, stream: str, samples: List[Tuple[int, List[Any]]]) -> bool:
+        """
+        Queue a block of samples for a stream (called from acquisition threads)
+        
+        Args:
+            stream: Target stream name
+            samples: [(epoch nanoseconds, values), ...]
+        
+        Returns:
+            False if the block was dropped
+        """
+        rows = len(samples)
+        with self._cond:
+            if self._closing:
+                return False
+            self.submitted_rows += rows
+            
+            if self._spilling:
+                return self._overflow_block(stream, samples)
+            
+            if self._queued_rows + rows > self.max_rows:
+                if self.overflow_policy == 'spill':
+                    self._spilling = True
+                    return self._overflow_block(stream, samples)
+                
+                if self.overflow_policy == 'block':
+                    self.blocked += 1
+                    started = time.monotonic()
+                    has_space = self._cond.wait_for(
+                        lambda: self._queued_rows + rows <= self.max_rows or self._closing,
+                        timeout=self.block_timeout
+                    )
+                    self.blocked_seconds += time.monotonic() - started
+                    if not has_space or self._closing:
+                        self.dropped_rows += rows
+                        return False
+                else:
+                    while self._queue and self._queued_rows + rows > self.max_rows:
+                        _, dropped = self._queue.popleft()
+                        self._queued_rows -= len(dropped)
+                        self.dropped_rows += len(dropped)
+            
+            self._queue.append((stream, samples))
+            self._queued_rows += rows
+            self.max_queue_depth = max(self.max_queue_depth, self._queued_rows)
+            self._cond.notify()
+        return True
+    
+    def _overflow_block(self, stream: str, samples) -> bool:
+        """Hand a block to the spill thread (caller holds the lock; no I/O here)"""
+        self._overflow.append((stream, samples))
+        self._overflow_rows += len(samples)
+        self.spilled_rows += len(samples)
+        self._cond.notify_all()
+        return True
+    
+    def _spill_worker(self):
+        """Spill thread: move overflow blocks from memory to the spill file"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._overflow or self._closing)
+                if self._closing:
+                    return  # The writer replays what is left in memory
+            
+            with self._spill_lock:
+                # Counted as spilled from here on, so the writer waits for the spill lock
+                # instead of finishing while these blocks are in flight
+                with self._cond:
+                    blocks, self._overflow = self._overflow, deque()
+                    self._spill_rows += self._overflow_rows
+                    self._overflow_rows = 0
+                
+                failed = 0
+                for stream, samples in blocks:
+                    try:
+                        if self._spill_file is None:
+                            self._spill_file = tempfile.TemporaryFile(prefix="awe_spill_", dir=self.spill_dir)
+                        pickle.dump((stream, samples), self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+                    except Exception as e:
+                        print(f"⚠️  Spill write failed: {e}")
+                        failed += len(samples)
+                
+                if failed:
+                    with self._cond:
+                        self._spill_rows -= failed
+                        self.dropped_rows += failed
+    
+    def _run(self):
+        """Writer thread: group-write everything queued, replay spills, commit by bytes or time"""
+        window_start = last_commit = time.monotonic()
+        window_rows = 0
+        busy = 0.0
+        bytes_at_commit = self._text_bytes()
+        
+        while True:
+            with self._cond:
+                if not self._queue and not self._spill_pending() and not self._closing:
+                    self._cond.wait(timeout=max(last_commit + self.flush_interval - time.monotonic(), 0.01))
+                batch = self._queue
+                self._queue = deque()
+                self._queued_rows = 0
+                closing = self._closing
+                self._cond.notify_all()  # wake blocked producers
+            
+            started = time.perf_counter()
+            for stream, samples in batch:
+                window_rows += self._write_block(stream, samples)
+            if not batch:
+                window_rows += self._replay_spill()
+            busy += time.perf_counter() - started
+            
+            now = time.monotonic()
+            text_bytes = self._text_bytes()
+            if now - last_commit >= self.flush_interval or text_bytes - bytes_at_commit >= self.flush_bytes:
+                self._commit()
+                last_commit, bytes_at_commit = now, text_bytes
+            
+            if now - window_start >= self.flush_interval:
+                self.write_rate = window_rows / (now - window_start)
+                self.busy = busy / (now - window_start)
+                window_start, window_rows, busy = now, 0, 0.0
+            
+            if closing and not batch:
+                with self._cond:
+                    finished = not self._queue and not self._spill_pending()
+                if finished:
+                    break
+        
+        self._commit()
+        self._close_streams()
+    
+    def _write_block(self, stream: str, samples) -> int:
+        """Write one sample block, returning the number of rows written"""
+        writer = self.writers.get(stream)
+        if writer is None:
+            return 0
+        
+        written = 0
+        errors = 0
+        first_error = None
+        for timestamp_ns, values in samples:
+            elapsed = timestamp_ns / 1e9 - self.start_time
+            if elapsed < 0:
+                continue  # sampled before the session started (e.g. mirrored from a ring)
+            try:
+                writer.write_row([timestamp_ns, elapsed] + list(values))
+            except Exception as e:
+                errors += 1
+                first_error = first_error or e
+                continue
+            written += 1
+        
+        if errors:
+            print(f"⚠️  Error logging {stream}: {first_error} ({errors} of {len(samples)} rows skipped)")
+        
+        self.stream_counts[stream] += written
+        self.written_rows += written
+        self.write_errors += errors
+        return written
+    
+    def _spill_pending(self) -> bool:
+        """Blocks waiting in the spill file or the overflow list (caller holds the lock)"""
+        return bool(self._spill_rows or self._overflow_rows)
+    
+    def _replay_spill(self) -> int:
+        """Write spilled blocks in order (file, then overflow still in memory); producers keep
+        spilling until both are empty"""
+        written = 0
+        while True:
+            # The spill lock keeps the spill thread from moving blocks while the two are taken
+            with self._spill_lock:
+                with self._cond:
+                    if not self._spill_pending():
+                        self._spilling = False
+                        return written
+                    spill_file, self._spill_file = self._spill_file, None
+                    self._spill_rows = 0
+                    blocks, self._overflow = self._overflow, deque()
+                    self._overflow_rows = 0
+            
+            if spill_file is not None:
+                spill_file.seek(0)
+                try:
+                    while True:
+                        try:
+                            stream, samples = pickle.load(spill_file)
+                        except EOFError:
+                            break
+                        written += self._write_block(stream, samples)
+                finally:
+                    spill_file.close()
+            for stream, samples in blocks:
+                written += self._write_block(stream, samples)
+    
+    def _text_bytes(self) -> int:
+        return sum(getattr(writer, 'bytes_written', 0) for writer in self.writers.values())
+    
+    def _commit(self):
+        """Flush text streams (and fsync if configured); columnar streams commit per row group"""
+        for stream, writer in self.writers.items():
+            try:
+                writer.commit(self.fsync)
+            except Exception as e:
+                print(f"⚠️  Commit failed for {stream}: {e}")
+        self.commits += 1
+        if self.fsync:
+            self.fsyncs += 1
+    
+    def _close_streams(self):
+        """Close every stream writer once (columnar writers write their last row group here)"""
+        if self._streams_closed:
+            return
+        self._streams_closed = True
+        for stream, writer in self.writers.items():
+            try:
+                writer.close()
+            except Exception as e:
+                print(f"⚠️  Error closing {stream}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue, overflow and throughput counters"""
+        with self._cond:
+            queue_depth = self._queued_rows
+            spill_pending = self._spill_rows + self._overflow_rows
+        return {
+            'overflow_policy': self.overflow_policy,
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_capacity': self.max_rows,
+            'spill_pending': spill_pending,
+            'submitted_rows': self.submitted_rows,
+            'written_rows': self.written_rows,
+            'dropped_rows': self.dropped_rows,
+            'write_errors': self.write_errors,
+            'spilled_rows': self.spilled_rows,
+            'blocked': self.blocked,
+            'blocked_seconds': self.blocked_seconds,
+            'commits': self.commits,
+            'fsyncs': self.fsyncs,
+            'write_rate': self.write_rate,
+            'writer_busy': self.busy,
+            'stream_counts': dict(self.stream_counts)
+        }
+
+
+def main():
+    """Push rows through a deliberately slow writer under each overflow policy"""
+    print("=" * 60)
+    print("BACKGROUND WRITER TEST: Overflow policies")
+    print("=" * 60)
+    
+    class SlowWriter:
+        bytes_written = 0
+        
+        def write_row(self, row):
+            time.sleep(0.001)
+        
+        def commit(self, fsync=False):
+            pass
+        
+        def close(self):
+            pass
+    
+    for policy in OVERFLOW_POLICIES:
+        writer = BackgroundWriter({'test': SlowWriter()}, time.time() - 1, max_rows=100,
+                                  overflow_policy=policy, block_timeout=0.01)
+        writer.start()
+        started = time.perf_counter()
+        for i in range(1000):
+            writer.submit('test', [(time.time_ns(), [i])])
+        submit_time = time.perf_counter() - started
+        writer.close()
+        
+        stats = writer.get_stats()
+        print(f"   {policy}: submitted {stats['submitted_rows']}, written {stats['written_rows']}, "
+              f"dropped {stats['dropped_rows']}, spilled {stats['spilled_rows']}, "
+              f"producer time {submit_time * 1000:.0f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Batch post-processing for AWE test rig
+Regenerates plots and summaries for every session folder, skipping sessions whose inputs and settings are unchanged
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path for imports when running standalone
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.post_processor import DataPostProcessor
+from data.session_stats import SUMMARY_FILE
+from data.stream_cache import source_fingerprint
+from config.device_config import get_device_config
+from utils.logger import log
+
+# POSIX only: per-worker address-space cap (not enforced on Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Written into each processed session folder
+STAMP_FILE = "post_processing.json"
+
+# Written into the sessions root after a batch run
+REPORT_FILE = "post_processing_report.json"
+
+# Modules whose code shapes the outputs: editing any of them invalidates every stamp
+PROCESSING_CODE_MODULES = ['data/post_processor.py', 'data/plot_renderer.py', 'core/decimation.py',
+                           'data/session_stats.py', 'data/storage.py', 'data/stream_cache.py']
+
+# Sessions a worker processes before it is replaced (returns fragmented memory to the OS)
+SESSIONS_PER_WORKER = 8
+
+
+def discover_sessions(root: Path) -> List[Path]:
+    """Session folders (anything with a csv_data/ subfolder) under root, largest first"""
+    sessions = [path for path in Path(root).iterdir() if (path / "csv_data").is_dir()]
+    
+    # Largest first so the longest sessions do not start last and stretch the batch
+    return sorted(sessions, key=lambda path: sum(f.stat().st_size for f in (path / "csv_data").iterdir()
+                                                 if f.is_file()), reverse=True)
+
+
+def _code_version() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    root = Path(__file__).parent.parent
+    for module in PROCESSING_CODE_MODULES:
+        digest.update((root / module).read_bytes())
+    return digest.hexdigest()
+
+
+def session_fingerprint(session_folder: Path, code_version: Optional[str] = None) -> str:
+    """
+    Content hash of everything a session's plots depend on
+    
+    Covers the session's data files (size, mtime, head/tail hash), its active channels,
+    the plot, decimation and statistics settings, and the processing code itself.
+    """
+    session_folder = Path(session_folder)
+    processor = DataPostProcessor(str(session_folder))
+    device_config = processor.device_config
+    inputs = {
+        'files': [source_fingerprint(path) for path in sorted((session_folder / "csv_data").iterdir())
+                  if path.is_file()],
+        'active_channels': processor.active_channels,
+        'plot_config': processor.plot_config,
+        'decimation': device_config.get_plot_decimation_config(),
+        'stats': device_config.get_stats_config(),
+        'code': code_version or _code_version()
+    }
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def read_stamp(session_folder: Path) -> Dict[str, Any]:
+    """Last batch/processing record of a session (empty if never processed)"""
+    try:
+        with open(Path(session_folder) / STAMP_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_up_to_date(session_folder: Path, fingerprint: str) -> bool:
+    """True if the session was processed with this fingerprint and its outputs still exist"""
+    stamp = read_stamp(session_folder)
+    if stamp.get('fingerprint') != fingerprint:
+        return False
+    if stamp.get('summary') and not (Path(session_folder) / SUMMARY_FILE).exists():
+        return False
+    return all((Path(session_folder) / "plots" / plot).exists() for plot in stamp.get('plots', []))
+
+
+def _limit_memory(memory_mb: int):
+    """Worker initializer: cap the address space so one huge session cannot exhaust the machine"""
+    if memory_mb and RESOURCE_AVAILABLE:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def process_one(session_folder: str, fingerprint: str) -> Dict[str, Any]:
+    """
+    Load a session and render its plots and summary in this process, recording a stamp on success
+    
+    Returns:
+        {'session', 'status' ('processed' | 'failed'), 'seconds', 'plots', 'error'}
+    """
+    started = time.perf_counter()
+    result = {'session': Path(session_folder).name, 'status': 'failed', 'plots': [], 'error': None}
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            processor = DataPostProcessor(session_folder)
+            if not processor.load_data():
+                raise RuntimeError("no data could be loaded")
+            plots = processor.generate_plots(workers=1)
+            summary = processor.generate_summary() if get_device_config().get_stats_config()['enabled'] else None
+        
+        failed = [plot for plot in plots if not plot['ok']]
+        result['plots'] = [Path(plot['output']).name for plot in plots if plot['ok']]
+        if failed:
+            result['error'] = "; ".join(f"{plot['name']}: {plot['error']}" for plot in failed)
+        if result['plots']:
+            result['status'] = 'processed'
+            with open(Path(session_folder) / STAMP_FILE, 'w') as f:
+                json.dump({'fingerprint': fingerprint, 'processed_at': datetime.now().isoformat(),
+                           'plots': result['plots'], 'summary': summary is not None}, f, indent=2)
+        elif not failed:
+            result['error'] = "no plottable streams"
+    except MemoryError:
+        result['error'] = "memory cap exceeded"
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    
+    # The processor reports per-stream problems on stdout; keep them with a failure
+    if result['status'] == 'failed':
+        problems = [line.strip() for line in output.getvalue().splitlines() if '❌' in line]
+        if problems:
+            result['error'] = f"{result['error']} ({'; '.join(problems[:3])})"
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def process_all_sessions(root: Path, workers: Optional[int] = None, memory_mb: Optional[int] = None,
+                         force: bool = False) -> Dict[str, Any]:
+    """
+    Post-process every session under root that changed since it was last processed
+    
+    Args:
+        root: Sessions folder (e.g. data/sessions)
+        workers: Worker processes (defaults to system.post_processing.batch_workers, 0 = CPU count,
+                 1 = in this process)
+        memory_mb: Address-space cap per worker in MB (defaults to batch_memory_mb, 0 = none)
+        force: Reprocess sessions even if their fingerprint is unchanged
+    
+    Returns:
+        Report dict (also written to root/post_processing_report.json)
+    """
+    root = Path(root)
+    config = get_device_config().get_post_processing_config()
+    workers = config['batch_workers'] if workers is None else workers
+    memory_mb = config['batch_memory_mb'] if memory_mb is None else memory_mb
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    started = time.perf_counter()
+    code_version = _code_version()
+    results = []
+    pending = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for session in discover_sessions(root):
+            fingerprint = session_fingerprint(session, code_version)
+            if not force and is_up_to_date(session, fingerprint):
+                results.append({'session': session.name, 'status': 'skipped', 'seconds': 0.0,
+                                'plots': read_stamp(session).get('plots', []), 'error': None})
+            else:
+                pending.append((str(session), fingerprint))
+    
+    log.info("BatchProcessor", f"{len(pending)} of {len(pending) + len(results)} sessions need processing",
+             [f"→ {min(workers, max(len(pending), 1))} worker(s), "
+              f"memory cap {f'{memory_mb} MB' if memory_mb and RESOURCE_AVAILABLE else 'none'}"])
+    
+    progress = []
+    
+    def finished(result: Dict[str, Any]):
+        progress.append(result)
+        mark = "✅" if result['status'] == 'processed' else "❌"
+        error = f" - {result['error']}" if result['error'] else ""
+        print(f"   {mark} [{len(progress)}/{len(pending)}] {result['session']} ({result['seconds']:.1f} s){error}")
+    
+    if workers == 1 or len(pending) <= 1:
+        for session, fingerprint in pending:
+            finished(process_one(session, fingerprint))
+    elif pending:
+        # Spawned workers do not inherit the caller's threads or GUI state
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=mp.get_context('spawn'),
+                                 initializer=_limit_memory, initargs=(memory_mb,),
+                                 max_tasks_per_child=SESSIONS_PER_WORKER) as pool:
+            futures = {pool.submit(process_one, session, fingerprint): session for session, fingerprint in pending}
+            for future in as_completed(futures):
+                try:
+                    finished(future.result())
+                except Exception as e:
+                    # A worker killed outright (e.g. by the OS out-of-memory killer)
+                    finished({'session': Path(futures[future]).name, 'status': 'failed', 'seconds': 0.0,
+                              'plots': [], 'error': f"worker died: {e}"})
+    results.extend(progress)
+    
+    counts = {status: sum(1 for result in results if result['status'] == status)
+              for status in ('processed', 'skipped', 'failed')}
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'root': str(root),
+        'workers': workers,
+        'memory_mb': memory_mb,
+        'wall_seconds': round(time.perf_counter() - started, 2),
+        'counts': counts,
+        'sessions': sorted(({**result, 'seconds': round(result['seconds'], 2)} for result in results),
+                           key=lambda result: result['session'])
+    }
+    with open(root / REPORT_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    summary = [f"→ {counts['processed']} processed, {counts['skipped']} unchanged, {counts['failed']} failed",
+               f"→ Report: {root / REPORT_FILE}"]
+    slowest = sorted((result for result in results if result['status'] == 'processed'),
+                     key=lambda result: result['seconds'], reverse=True)[:5]
+    summary += [f"• {result['session']}: {result['seconds']:.1f} s" for result in slowest]
+    log.success("BatchProcessor", f"Batch finished in {report['wall_seconds']:.1f} s", summary)
+    return report
+
+
+def main():
+    """Command-line entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AWE Test Rig batch post-processor')
+    parser.add_argument('root', nargs='?', default=str(Path(__file__).parent / "sessions"),
+                        help='Sessions folder (default: data/sessions)')
+    parser.add_argument('--workers', type=int, help='Worker processes (0 = CPU count, 1 = in-process)')
+    parser.add_argument('--memory-mb', type=int, help='Memory cap per worker in MB (0 = none)')
+    parser.add_argument('--force', action='store_true', help='Reprocess sessions even if unchanged')
+    args = parser.parse_args()
+    
+    report = process_all_sessions(Path(args.root), args.workers, args.memory_mb, args.force)
+    return 1 if report['counts']['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Actuator and mode event log for AWE test rig
+Change-only history of valves, pumps, purge, E-stop and pause/resume with as-of queries
+"""
+
+import bisect
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from data.storage import find_stream_files, read_stream_segments
+
+# Stream name suffix of the session's event file
+EVENTS_SUFFIX = 'events'
+
+
+class EventLog:
+    """Change-only event history keyed by event name
+    
+    Each name keeps parallel sorted lists of timestamps (epoch ns) and values, so the
+    value in force at any time is one binary search: the last change at or before it.
+    """
+    
+    def __init__(self):
+        self._times: Dict[str, List[int]] = {}
+        self._values: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, timestamp_ns: int, name: str, value: Any):
+        """Add one change (out-of-order events are inserted in place)"""
+        with self._lock:
+            times = self._times.setdefault(name, [])
+            values = self._values.setdefault(name, [])
+            if times and timestamp_ns < times[-1]:
+                position = bisect.bisect_right(times, timestamp_ns)
+                times.insert(position, timestamp_ns)
+                values.insert(position, value)
+            else:
+                times.append(timestamp_ns)
+                values.append(value)
+    
+    @property
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._times)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(times) for times in self._times.values())
+    
+    def value_at(self, name: str, timestamp_ns: int, default: Any = None) -> Any:
+        """Value of one event source at a time (default before its first event)"""
+        with self._lock:
+            times = self._times.get(name)
+            if not times:
+                return default
+            position = bisect.bisect_right(times, timestamp_ns)
+            return self._values[name][position - 1] if position else default
+    
+    def state_at(self, timestamp_ns: int) -> Dict[str, Any]:
+        """Reconstruct every known value at a time (names without an event yet are omitted)"""
+        with self._lock:
+            state = {}
+            for name, times in self._times.items():
+                position = bisect.bisect_right(times, timestamp_ns)
+                if position:
+                    state[name] = self._values[name][position - 1]
+            return state
+    
+    def states_at(self, timestamps_ns: Iterable[int], names: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        As-of state at many times at once (e.g. to align actuators with a sensor stream)
+        
+        Args:
+            timestamps_ns: Query times in epoch nanoseconds
+            names: Event names to include (all if None)
+        
+        Returns:
+            DataFrame with one row per query time and one column per name (None before the first event)
+        """
+        query = np.asarray(list(timestamps_ns), dtype=np.int64)
+        with self._lock:
+            columns = {}
+            for name in names or list(self._times):
+                times = np.asarray(self._times.get(name, []), dtype=np.int64)
+                values = np.asarray(self._values.get(name, []), dtype=object)
+                positions = np.searchsorted(times, query, side='right') - 1
+                column = np.full(len(query), None, dtype=object)
+                known = positions >= 0
+                column[known] = values[positions[known]]
+                columns[name] = column
+        return pd.DataFrame(columns, index=pd.Index(query, name='timestamp_ns'))
+    
+    def changes(self, name: Optional[str] = None, start_ns: Optional[int] = None,
+                end_ns: Optional[int] = None) -> List[Tuple[int, str, Any]]:
+        """Events in [start_ns, end_ns] in time order, for one name or all"""
+        with self._lock:
+            events = []
+            for event_name in [name] if name else list(self._times):
+                times = self._times.get(event_name, [])
+                first = bisect.bisect_left(times, start_ns) if start_ns is not None else 0
+                last = bisect.bisect_right(times, end_ns) if end_ns is not None else len(times)
+                events.extend((times[i], event_name, self._values[event_name][i]) for i in range(first, last))
+        events.sort(key=lambda event: event[0])
+        return events
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'EventLog':
+        """Build from an events stream (timestamp_ns, event, value columns)"""
+        event_log = cls()
+        for timestamp_ns, name, value in zip(df['timestamp_ns'].astype(np.int64), df['event'].astype(str),
+                                             df['value'].astype(bool)):
+            event_log.record(int(timestamp_ns), name, bool(value))
+        return event_log
+
+
+def load_event_log(folder: Path) -> Optional[EventLog]:
+    """Load a session's event stream (any backend, all segments), or None if it has none"""
+    paths = find_stream_files(folder, EVENTS_SUFFIX)
+    if not paths:
+        return None
+    return EventLog.from_frame(read_stream_segments(paths, columns=['timestamp_ns', 'event', 'value']))
+
+
+def main():
+    """Record a short valve pulse and query the state around it"""
+    import time
+    
+    print("=" * 60)
+    print("EVENT LOG TEST: As-of queries")
+    print("=" * 60)
+    
+    start = time.time_ns()
+    event_log = EventLog()
+    event_log.record(start, 'koh_storage', False)
+    event_log.record(start, 'test_running', True)
+    event_log.record(start + 250_000, 'koh_storage', True)    # 0.25 ms pulse
+    event_log.record(start + 500_000, 'koh_storage', False)
+    
+    print(f"1. Before start: {event_log.state_at(start - 1)}")
+    print(f"2. During pulse: {event_log.state_at(start + 300_000)}")
+    print(f"3. After pulse: {event_log.state_at(start + 600_000)}")
+    print(f"4. Vectorized:\n{event_log.states_at([start + i * 100_000 for i in range(7)])}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
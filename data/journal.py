@@ -0,0 +1,439 @@
+"""
+Crash-safe stream journal and session recovery for AWE test rig
+Append-only, length-prefixed, checksummed records next to each stream's segments
+"""
+
+import datetime
+import json
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.logger import log
+
+# Record layout: magic, payload length, CRC32 of payload, then the pickled (kind, body) payload
+MAGIC = b'AWEJ'
+HEADER = struct.Struct('<4sII')
+
+# Tail window read when looking for the last valid record (doubled until one is found)
+TAIL_WINDOW = 64 * 1024
+
+JOURNAL_EXTENSION = '.journal'
+
+# Start of a gzip member / zstd frame (compressed CSV segments end one at every commit)
+MEMBER_MAGIC = {
+    'gzip': b'\x1f\x8b\x08',
+    'zstd': b'\x28\xb5\x2f\xfd'
+}
+COMPRESSED_CSV_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def encode_record(kind: str, body: Any) -> bytes:
+    """Frame one journal record"""
+    payload = pickle.dumps((kind, body), protocol=pickle.HIGHEST_PROTOCOL)
+    return HEADER.pack(MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_at(data: bytes, offset: int) -> Optional[Tuple[str, Any, int]]:
+    """Decode the record starting at offset, returning (kind, body, end offset) or None if invalid"""
+    if offset + HEADER.size > len(data):
+        return None
+    magic, length, crc = HEADER.unpack_from(data, offset)
+    end = offset + HEADER.size + length
+    if magic != MAGIC or end > len(data):
+        return None
+    record = _decode_payload(data[offset + HEADER.size:end], crc)
+    if record is None:
+        return None
+    return (*record, end)
+
+
+def _decode_payload(payload: bytes, crc: int) -> Optional[Tuple[str, Any]]:
+    """Check and unpickle a record payload, returning (kind, body) or None if invalid"""
+    if zlib.crc32(payload) != crc:
+        return None
+    try:
+        kind, body = pickle.loads(payload)
+    except Exception:
+        return None
+    return kind, body
+
+
+class StreamJournal:
+    """Append-only journal for one stream
+    
+    Records: 'segment' when a segment opens (schema and writer settings), 'checkpoint'
+    after each commit (durable bytes, rows, last timestamp), 'rows' with the rows of
+    each commit (columnar streams only - they cannot be truncated to a checkpoint),
+    and 'closed' when a segment is complete.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'ab')
+    
+    def append(self, kind: str, body: Any):
+        self._file.write(encode_record(kind, body))
+    
+    def sync(self, fsync: bool = False):
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+    
+    def close(self, remove: bool = True):
+        """Close the journal (a cleanly closed stream needs no journal)"""
+        self._file.close()
+        if remove:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def find_last_record(path: Path, kinds: Optional[set] = None) -> Optional[Tuple[int, str, Any, int]]:
+    """
+    Find the last valid record (optionally of the given kinds) by scanning back from the end
+    
+    Only a tail window is read; it doubles until a match is found, so the cost follows the
+    distance from the end of the file, not the file size.
+    
+    Returns:
+        (offset, kind, body, end offset) or None
+    """
+    size = os.path.getsize(path)
+    window = TAIL_WINDOW
+    with open(path, 'rb') as f:
+        while True:
+            start = max(size - window, 0)
+            f.seek(start)
+            data = f.read(size - start)
+            
+            position = len(data)
+            while True:
+                position = data.rfind(MAGIC, 0, position)
+                if position < 0:
+                    break
+                record = _decode_at(data, position)
+                if record and (kinds is None or record[0] in kinds):
+                    return start + position, record[0], record[1], start + record[2]
+            
+            if start == 0:
+                return None
+            window *= 2
+
+
+def iter_records(path: Path, start: int = 0) -> Iterator[Tuple[str, Any, int]]:
+    """
+    Read consecutive valid records from start, one at a time
+    
+    Yields:
+        (kind, body, offset just past the record) until the first invalid or torn record
+    """
+    size = os.path.getsize(path)
+    offset = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while offset + HEADER.size <= size:
+            magic, length, crc = HEADER.unpack(f.read(HEADER.size))
+            end = offset + HEADER.size + length
+            if magic != MAGIC or end > size:
+                return
+            record = _decode_payload(f.read(length), crc)
+            if record is None:
+                return
+            offset = end
+            yield (*record, end)
+
+
+def recover_stream(journal_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Repair the last segment of a stream from its journal
+    
+    Text segments are truncated to the last checkpoint (a torn row or unfinished gzip member
+    is cut off). Columnar segments have no footer after a crash and are rewritten from the
+    journalled rows of that segment.
+    
+    Returns:
+        Manifest info for the repaired segment, or None if the journal holds no segment
+    """
+    # Imported here so the journal module stays importable without the storage dependencies
+    from data.storage import create_stream_writer, format_timestamp
+    
+    journal_path = Path(journal_path)
+    segment = find_last_record(journal_path, {'segment'})
+    if segment is None:
+        return None
+    segment_offset, _, info, _ = segment
+    segment_path = journal_path.parent / info['path']
+    
+    # First pass: where the valid records end, and the segment's last checkpoint and close
+    valid_end = segment_offset
+    checkpoint = closed = None
+    for kind, body, valid_end in iter_records(journal_path, segment_offset):
+        if kind == 'checkpoint':
+            checkpoint = body
+        elif kind == 'closed':
+            closed = body
+    
+    # Drop any torn record at the end of the journal
+    with open(journal_path, 'r+b') as f:
+        f.truncate(valid_end)
+    
+    result = {'index': info['index'], 'path': segment_path, 'rows': 0,
+              'first_timestamp': None, 'last_timestamp': None}
+    
+    if info['backend'] == 'csv':
+        durable = closed or checkpoint or {'bytes': info['header_bytes'], 'rows': 0,
+                                           'first_timestamp': None, 'last_timestamp': None}
+        if segment_path.exists() and not closed and os.path.getsize(segment_path) > durable['bytes']:
+            with open(segment_path, 'r+b') as f:
+                f.truncate(durable['bytes'])
+        result.update(rows=durable['rows'], first_timestamp=durable['first_timestamp'],
+                      last_timestamp=durable['last_timestamp'])
+    elif not closed:
+        # Second pass: stream the journalled rows into a fresh segment
+        writer = create_stream_writer(info['backend'], segment_path, info['schema'], info['metadata'],
+                                      **info['options'])
+        for kind, body, _ in iter_records(journal_path, segment_offset):
+            if kind != 'rows' or not body:
+                continue
+            for row in body:
+                writer.write_row(row)
+            if result['first_timestamp'] is None:
+                result['first_timestamp'] = body[0][0]
+            result['last_timestamp'] = body[-1][0]
+            result['rows'] += len(body)
+        writer.close()
+    else:
+        result.update(rows=closed['rows'], first_timestamp=closed['first_timestamp'],
+                      last_timestamp=closed['last_timestamp'])
+    
+    for key in ('first_timestamp', 'last_timestamp'):
+        if result[key] is not None:
+            result[key] = format_timestamp(result[key])
+    result['bytes'] = os.path.getsize(segment_path) if segment_path.exists() else 0
+    return result
+
+
+def recover_session(session_folder: Path) -> Optional[Dict[str, Any]]:
+    """
+    Recover a session left 'running' by a crash
+    
+    Repairs each journalled stream, truncates torn last rows of plain CSV files and
+    unfinished gzip members / zstd frames of compressed ones, rebuilds the segment manifest
+    and marks the session 'recovered' with an end time taken from the last durable sample.
+    
+    Returns:
+        Updated session metadata, or None if the session did not need recovery
+    """
+    session_folder = Path(session_folder)
+    metadata_path = session_folder / "session_metadata.json"
+    if not metadata_path.exists():
+        return None
+    
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    if metadata.get('status') != 'running':
+        return None
+    
+    data_folder = session_folder / "csv_data"
+    journalled = set()
+    last_timestamps = []
+    
+    for journal_path in sorted(data_folder.glob(f"*{JOURNAL_EXTENSION}")):
+        try:
+            info = recover_stream(journal_path)
+        except Exception as e:
+            log.warning("Recovery", f"Could not repair {journal_path.name}: {e}")
+            continue
+        journal_path.unlink()
+        if info is None:
+            continue
+        
+        name = info['path'].name
+        journalled.add(name)
+        entry = metadata.setdefault('files', {}).setdefault(name, {
+            'path': str(info['path']), 'type': 'data', 'description': 'Recovered stream segment'
+        })
+        segment = dict(entry.get('segment', {}))
+        segment.update({key: info[key] for key in ('index', 'rows', 'first_timestamp', 'last_timestamp', 'bytes')})
+        segment['status'] = 'recovered'
+        entry['segment'] = segment
+        if info['last_timestamp']:
+            last_timestamps.append(info['last_timestamp'])
+    
+    # Plain CSV files without a journal: cut a torn last row
+    for csv_path in data_folder.glob("*.csv"):
+        if csv_path.name not in journalled:
+            truncate_torn_row(csv_path)
+            timestamp = last_row_timestamp(csv_path)
+            if timestamp:
+                last_timestamps.append(timestamp)
+    
+    # Compressed CSV segments without a journal: cut the unfinished member/frame
+    for path in sorted(data_folder.glob("*.csv.*")):
+        compression = COMPRESSED_CSV_SUFFIXES.get(path.suffix)
+        if compression is None or path.name in journalled:
+            continue
+        try:
+            timestamp = truncate_torn_member(path, compression)
+        except Exception as e:
+            log.warning("Recovery", f"Could not repair {path.name}: {e}")
+            continue
+        entry = metadata.get('files', {}).get(path.name)
+        if entry and 'segment' in entry:
+            # A member without data rows (e.g. only the header) leaves the manifest's timestamp
+            segment = dict(entry['segment'])
+            timestamp = timestamp or segment.get('last_timestamp')
+            if segment.get('status') == 'open':
+                segment.update(status='recovered', last_timestamp=timestamp, bytes=os.path.getsize(path))
+            entry['segment'] = segment
+        if timestamp:
+            last_timestamps.append(timestamp)
+    
+    # Close the session at its last durable sample
+    start = datetime.datetime.fromisoformat(metadata['start_time'])
+    end = start
+    if last_timestamps:
+        end = datetime.datetime.strptime(max(last_timestamps), "%Y-%m-%d %H:%M:%S.%f")
+    duration = max(end - start, datetime.timedelta(0))
+    metadata.update({
+        'end_time': end.isoformat(),
+        'duration_seconds': duration.total_seconds(),
+        'duration_formatted': str(duration).split('.')[0],
+        'status': 'recovered',
+        'recovered_at': datetime.datetime.now().isoformat()
+    })
+    
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    return metadata
+
+
+def truncate_torn_row(csv_path: Path) -> bool:
+    """Cut a plain CSV file after its last complete line (reads only the tail)"""
+    size = os.path.getsize(csv_path)
+    if size == 0:
+        return False
+    
+    with open(csv_path, 'r+b') as f:
+        start = max(size - TAIL_WINDOW, 0)
+        f.seek(start)
+        tail = f.read()
+        if tail.endswith(b'\n'):
+            return False
+        last_newline = tail.rfind(b'\n')
+        if last_newline < 0 and start > 0:
+            return False  # a single row longer than the window - leave it alone
+        f.truncate(start + last_newline + 1)
+    return True
+
+
+def truncate_torn_member(path: Path, compression: str) -> Optional[str]:
+    """
+    Cut a compressed CSV segment after its last complete gzip member / zstd frame
+    
+    Scans back from the end for the start of a member that decodes completely (the tail
+    window doubles until one is found), so only the tail of the file is read.
+    
+    Returns:
+        Timestamp of the last row in that member, or None if it holds no data rows
+    """
+    magic = MEMBER_MAGIC[compression]
+    size = os.path.getsize(path)
+    window = TAIL_WINDOW
+    with open(path, 'r+b') as f:
+        while True:
+            start = max(size - window, 0)
+            f.seek(start)
+            data = f.read(size - start)
+            
+            position = len(data)
+            while True:
+                position = data.rfind(magic, 0, position)
+                if position < 0:
+                    break
+                member = _decode_member(data, position, compression)
+                if member is not None:
+                    text, end = member
+                    if start + end < size:
+                        f.truncate(start + end)
+                    return _last_line_timestamp(text.splitlines())
+            
+            if start == 0:
+                # Not a single complete member: keep nothing but an empty file
+                f.truncate(0)
+                return None
+            window *= 2
+
+
+def _decode_member(data: bytes, offset: int, compression: str) -> Optional[Tuple[bytes, int]]:
+    """Decode the member/frame starting at offset, returning (text, end offset) or None if it is incomplete"""
+    if compression == 'gzip':
+        decoder = zlib.decompressobj(wbits=31)
+    else:
+        import zstandard
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+    try:
+        text = decoder.decompress(data[offset:])
+    except Exception:
+        return None
+    if not decoder.eof:
+        return None
+    return text, len(data) - len(decoder.unused_data)
+
+
+def _last_line_timestamp(lines: List[bytes]) -> Optional[str]:
+    """Timestamp (first field) of the last line if it is a data row"""
+    timestamp = lines[-1].split(b',', 1)[0].decode('utf-8', 'replace') if lines else ''
+    try:
+        datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S.%f")
+    except ValueError:
+        return None
+    return timestamp
+
+
+def last_row_timestamp(csv_path: Path) -> Optional[str]:
+    """Timestamp (first field) of the last data row of a plain CSV file, read from the tail"""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        f.seek(max(size - TAIL_WINDOW, 0))
+        lines = f.read().splitlines()
+    if len(lines) < 2 and size <= TAIL_WINDOW:
+        return None  # header only
+    return _last_line_timestamp(lines)
+
+
+def main():
+    """Write a journal with a torn tail and find the last valid checkpoint"""
+    import tempfile
+    
+    print("=" * 60)
+    print("JOURNAL TEST: Torn tail detection")
+    print("=" * 60)
+    
+    path = Path(tempfile.mkdtemp()) / f"test{JOURNAL_EXTENSION}"
+    journal = StreamJournal(path)
+    for i in range(1000):
+        journal.append('checkpoint', {'bytes': i * 100, 'rows': i})
+    journal.close(remove=False)
+    
+    # Tear the last record in half
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    
+    offset, kind, body, end = find_last_record(path, {'checkpoint'})
+    print(f"1. Last valid {kind}: rows {body['rows']} (record at byte {offset})")
+    
+    valid_end = offset
+    for _, _, valid_end in iter_records(path, offset):
+        pass
+    print(f"2. Valid data ends at byte {valid_end} of {os.path.getsize(path)}")
+    path.unlink()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,46 @@
 """
-CSV data logger for AWE test rig
-Handles real-time logging of sensor data during test sessions
+Session data logger for AWE test rig
+Handles real-time logging of sensor data during test sessions (CSV, Parquet or HDF5 streams)
 """
 
-import csv
 import time
 import threading
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-from core.state import get_global_state
+from core.state import get_global_state, resync_event_clock
+from core.timer import get_scheduler
 from data.session_manager import get_session_manager
+from data.storage import (SegmentedStreamWriter, create_stream_writer, resolve_backend,
+                          resolve_text_compression, stream_extension)
+from data.background_writer import BackgroundWriter
+from data.events import EVENTS_SUFFIX, EventLog
 from config.device_config import get_device_config
 from utils.logger import log
 import os
 
 
+# Native mode: stream written for each publishing device
+DEVICE_STREAMS = {
+    'ni_daq': 'daq',
+    'pico_tc08': 'temperatures',
+    'bga244': 'gas_analysis',
+    'cvm24p': 'cell_voltages'
+}
+
+# Snapshot mode: value logged for a device the supervisor marked stale (instead of its frozen last reading)
+STALE_VALUE = float('nan')
+
+# File name suffix per stream
+STREAM_FILE_SUFFIXES = {
+    'main_sensors': 'sensors',
+    'daq': 'daq',
+    'temperatures': 'temperatures',
+    'gas_analysis': 'gas_analysis',
+    'cell_voltages': 'cell_voltages',
+    'events': EVENTS_SUFFIX
+}
+
+
 class CSVLogger:
     """Real-time CSV data logger for test sessions"""
     
@@ -30,10 +55,23 @@ class CSVLogger:
         self.log_thread = None
         self.stop_event = threading.Event()
         
-        # File paths and writers
+        # Storage backend (csv, parquet, hdf5) - selectable per session
+        self.storage_config = self.device_config.get_storage_config()
+        self.backend = None
+        
+        # Logging mode: 'snapshot' samples state every log_interval, 'native' writes every published sample
+        self.logging_config = self.device_config.get_logging_config()
+        self.mode = self.logging_config['mode']
+        
+        # All file I/O happens on the background writer; sampling threads only enqueue
+        self.background_writer: Optional[BackgroundWriter] = None
+        
+        # File paths and stream writers
         self.csv_files = {}
-        self.csv_writers = {}
-        self.file_handles = {}
+        self.writers = {}
+        
+        # Actuator/mode changes of the current session (as-of queries while logging)
+        self.event_log = EventLog()
         
         # Data counters for statistics
         self.log_count = 0
@@ -41,6 +79,7 @@ class CSVLogger:
         
         # Column definitions for different data types - dynamically generated from devices.yaml
         self.column_definitions = self._build_column_definitions()
+        self.stream_schemas = self._build_stream_schemas()
     
     def _build_column_definitions(self) -> Dict[str, List[str]]:
         """Build column definitions using device names from devices.yaml"""
@@ -62,15 +101,60 @@ class CSVLogger:
                 'timestamp', 'elapsed_seconds'
             ] + [f'cell_{i+1:03d}_v' for i in range(120)],  # Keep cell voltage naming as-is
             
-            'actuator_states': [
-                'timestamp', 'elapsed_seconds',
-                'koh_storage', 'di_storage', 'stack_drain', 'h2_purge', 'o2_purge', 'h2_deoxo',
-                'pump_di_fill', 'pump_koh_fill'
+            # Change-only actuator/mode events (exact time in timestamp_ns)
+            'events': [
+                'timestamp', 'elapsed_seconds', 'timestamp_ns', 'event', 'value'
             ]
         }
     
-    def start_logging(self) -> bool:
-        """Start logging data to CSV files"""
+    def _build_stream_schemas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Typed column schema per stream (CSV decimals match the historic rounding)"""
+        temp_names = self.device_config.get_pico_tc08_channel_names()
+        bga_names = self.device_config.get_bga244_unit_names()
+        
+        def column(name, dtype, **extra):
+            return dict(name=name, dtype=dtype, **extra)
+        
+        time_columns = [column('timestamp', 'timestamp'), column('elapsed_seconds', 'float64', decimals=3)]
+        
+        # NI channel order in the sensors file: PT01-PT06, Current, Flowrate
+        ni_daq_names = self.column_definitions['main_sensors'][2:-len(temp_names)] if temp_names else \
+            self.column_definitions['main_sensors'][2:]
+        ni_decimals = [3] * 6 + [1, 2]
+        
+        daq_columns = [column(name, 'float32', decimals=ni_decimals[i] if i < len(ni_decimals) else 3)
+                       for i, name in enumerate(ni_daq_names)]
+        temp_columns = [column(name, 'float32', decimals=1) for name in temp_names]
+        
+        return {
+            'main_sensors': time_columns + daq_columns + temp_columns,
+            
+            # Native-mode device streams
+            'daq': time_columns + daq_columns,
+            'temperatures': time_columns + temp_columns,
+            
+            'gas_analysis': time_columns
+                + [column(f'{name}_pct', 'float32', decimals=3) for name in bga_names]
+                + [column(f'{name}_pgas', 'str') for name in bga_names]
+                + [column('purge', 'bool', csv_text=True)],
+            
+            'cell_voltages': time_columns
+                + [column(name, 'float32', decimals=3) for name in self.column_definitions['cell_voltages'][2:]],
+            
+            'events': [column('timestamp', 'timestamp'), column('elapsed_seconds', 'float64', decimals=6),
+                       column('timestamp_ns', 'int64'), column('event', 'str'), column('value', 'bool')]
+        }
+    
+    def start_logging(self, threaded: bool = True, backend: Optional[str] = None,
+                      mode: Optional[str] = None) -> bool:
+        """
+        Start logging data to the session's stream files
+        
+        Args:
+            threaded: False leaves log_once() to an external scheduler (snapshot mode)
+            backend: Storage backend for this session (defaults to system.storage.backend)
+            mode: 'snapshot' or 'native' (defaults to system.logging.mode)
+        """
         if self.logging:
             log.warning("DataLogger", "CSV logging already running")
             return True
@@ -84,9 +168,12 @@ class CSVLogger:
             return False
         
         try:
-            # Initialize CSV files
+            # Initialize stream files
+            self.mode = mode or self.logging_config['mode']
+            self.backend = resolve_backend(backend or self.storage_config['backend'])
+            self.background_writer = None  # The previous session's writer owns no files of this one
             if not self._initialize_csv_files():
-                log.error("DataLogger", "Failed to initialize CSV files")
+                log.error("DataLogger", "Failed to initialize data files")
                 return False
             
             # Start logging thread
@@ -94,9 +181,14 @@ class CSVLogger:
             self.stop_event.clear()
             self.log_count = 0
             self.start_time = time.time()
+            self._start_background_writer()
+            self._start_event_logging()
             
-            self.log_thread = threading.Thread(target=self._logging_worker, daemon=True)
-            self.log_thread.start()
+            if self.mode == 'native':
+                self._start_native_logging()
+            elif threaded:
+                self.log_thread = threading.Thread(target=self._logging_worker, daemon=True)
+                self.log_thread.start()
             
             # Prepare file details for logging
             file_details = []
@@ -104,8 +196,9 @@ class CSVLogger:
                 abs_path = Path(file_path).resolve()
                 file_details.append(f"• {file_type}: {abs_path}")
             
-            log.success("DataLogger", f"CSV logging started successfully", [
-                f"→ Log interval: {self.log_interval}s",
+            log.success("DataLogger", f"Data logging started successfully", [
+                f"→ Storage backend: {self.backend}",
+                f"→ Mode: {self.mode}" + ("" if self.mode == 'native' else f" ({self.log_interval}s interval)"),
                 f"→ Files created: {len(self.csv_files)}"
             ] + file_details)
             
@@ -131,15 +224,28 @@ class CSVLogger:
         
         if self.log_thread and self.log_thread.is_alive():
             self.log_thread.join(timeout=5.0)
+        if self.mode == 'native':
+            self._stop_native_logging()
+        self.state.remove_event_listener(self._on_event)
+        self._stop_background_writer()
         
         # Finalize and close files
         stats = self._finalize_files()
         
         log.success("DataLogger", "CSV logging stopped", [
-            f"→ Log entries: {self.log_count}",
+            f"→ Log entries: {stats.get('log_count', 0)}",
             f"→ Duration: {stats.get('duration_formatted', 'Unknown')}"
         ])
         
+        writer_stats = stats.get('writer', {})
+        if writer_stats.get('dropped_rows'):
+            log.warning("DataLogger", f"{writer_stats['dropped_rows']} sample rows dropped (writer queue full)", [
+                f"→ Overflow policy: {writer_stats['overflow_policy']}",
+                f"→ Max queue depth: {writer_stats['max_queue_depth']}/{writer_stats['queue_capacity']} rows"
+            ])
+        if writer_stats.get('write_errors'):
+            log.warning("DataLogger", f"{writer_stats['write_errors']} sample rows skipped (write errors)")
+        
         return stats
     
     def _initialize_csv_files(self) -> bool:
@@ -148,22 +254,39 @@ class CSVLogger:
             # Get base filename from session manager
             base_filename = self.session_manager.get_base_filename("data")
             
-            # Create CSV files for different data types
+            # Compressed, rotated or journalled streams are written as numbered segments (CSV compression only)
+            segment_config = dict(self.storage_config['segments'])
+            if self.backend == 'csv':
+                segment_config['text_compression'] = resolve_text_compression(segment_config['text_compression'])
+            else:
+                segment_config['text_compression'] = 'none'
+            segment_config['journal'] = self.logging_config['journal']
+            segmented = (segment_config['text_compression'] != 'none' or segment_config['journal']
+                         or segment_config['rotate_bytes'] > 0 or segment_config['rotate_seconds'] > 0)
+            
+            # Create stream files for different data types (one per device in native mode)
+            extension = stream_extension(self.backend, segment_config['text_compression'])
+            if self.mode == 'native':
+                streams = list(DEVICE_STREAMS.values()) + ['events']
+            else:
+                streams = ['main_sensors', 'gas_analysis', 'cell_voltages', 'events']
             file_configs = {
-                'main_sensors': f"{base_filename}_sensors.csv",
-                'gas_analysis': f"{base_filename}_gas_analysis.csv", 
-                'cell_voltages': f"{base_filename}_cell_voltages.csv",
-                'actuator_states': f"{base_filename}_actuators.csv"
+                stream: f"{base_filename}_{STREAM_FILE_SUFFIXES[stream]}" for stream in streams
             }
             
-            # Initialize each CSV file
-            for file_type, filename in file_configs.items():
-                # Register file with session manager
-                file_path = self.session_manager.register_file(
-                    filename, 
-                    "csv", 
-                    f"Real-time {file_type.replace('_', ' ')} data"
-                )
+            # Initialize each stream file
+            for file_type, stem in file_configs.items():
+                description = f"Real-time {file_type.replace('_', ' ')} data ({self.backend})"
+                
+                # Register file with session manager (segments register themselves as they open/close)
+                if segmented:
+                    file_path = self.session_manager.get_file_path(stem, "csv_data")
+                else:
+                    file_path = self.session_manager.register_file(
+                        stem + extension, 
+                        "csv" if self.backend == 'csv' else "data", 
+                        description
+                    )
                 
                 # Check if directory exists and is writable
                 file_path_obj = Path(file_path)
@@ -179,55 +302,132 @@ class CSVLogger:
                 if not os.access(parent_dir, os.W_OK):
                     raise Exception(f"No write permission to directory: {parent_dir}")
                 
-                # Open file and create CSV writer
-                file_handle = open(file_path, 'w', newline='', encoding='utf-8')
-                csv_writer = csv.writer(file_handle)
-                
-                # Write header row
-                headers = self.column_definitions[file_type]
-                csv_writer.writerow(headers)
-                file_handle.flush()
+                # Open stream writer (CSV writes its header row immediately)
+                if segmented:
+                    writer = SegmentedStreamWriter(
+                        self.backend, file_path, self.stream_schemas[file_type],
+                        self._stream_metadata(file_type),
+                        on_segment=self._segment_registrar(file_type, description),
+                        **segment_config, **self.storage_config['columnar']
+                    )
+                    file_path = str(writer.path)
+                else:
+                    writer = create_stream_writer(
+                        self.backend, file_path, self.stream_schemas[file_type],
+                        self._stream_metadata(file_type),
+                        **self.storage_config['columnar']
+                    )
                 
                 # Store references
                 self.csv_files[file_type] = file_path
-                self.file_handles[file_type] = file_handle
-                self.csv_writers[file_type] = csv_writer
+                self.writers[file_type] = writer
             
             return True
             
         except Exception as e:
-            log.error("DataLogger", f"Error initializing CSV files: {e}")
+            log.error("DataLogger", f"Error initializing data files: {e}")
             import traceback
             # Still print detailed traceback for debugging
             print(f"   → Error details: {traceback.format_exc()}")
             self._cleanup_files()
             return False
     
+    def _segment_registrar(self, file_type: str, description: str):
+        """Callback keeping each segment's manifest entry in session_metadata.json up to date"""
+        file_tag = "csv" if self.backend == 'csv' else "data"
+        
+        def register(path: Path, info: Dict[str, Any]):
+            self.session_manager.register_file(
+                path.name, file_tag, f"{description} - segment {info['index']}",
+                details={'stream': file_type, 'segment': info}
+            )
+        
+        return register
+    
+    def _stream_metadata(self, file_type: str) -> Dict[str, Any]:
+        """Session, schema and calibration details embedded in columnar stream files"""
+        device_sections = {
+            'main_sensors': ['ni_cdaq', 'pico_tc08'],
+            'daq': ['ni_cdaq'],
+            'temperatures': ['pico_tc08'],
+            'gas_analysis': ['bga244'],
+            'cell_voltages': ['cvm24p'],
+            'events': ['ni_cdaq']
+        }
+        session = self.session_manager.get_current_session() or {}
+        return {
+            'stream': file_type,
+            'session_id': session.get('session_id'),
+            'mode': self.mode,
+            'log_interval': self.log_interval if self.mode == 'snapshot' else None,
+            'calibration': self.device_config.get_calibration_config(),
+            'devices': {key: self.device_config.config.get(key, {}) for key in device_sections[file_type]}
+        }
+    
+    def _start_background_writer(self):
+        """Start the writer thread that owns the stream files"""
+        config = self.logging_config
+        self.background_writer = BackgroundWriter(
+            self.writers, self.start_time,
+            max_rows=config['queue_rows'],
+            overflow_policy=config['overflow_policy'],
+            block_timeout=config['block_timeout'],
+            flush_interval=config['flush_interval'],
+            flush_bytes=config['flush_bytes'],
+            fsync=config['fsync'],
+            spill_dir=str(Path(next(iter(self.csv_files.values()))).parent)
+        )
+        self.background_writer.start()
+    
+    def _stop_background_writer(self):
+        """Drain queued and spilled samples into the files, close them and stop the writer thread"""
+        if self.background_writer and not self.background_writer.close():
+            # Closing the files now would pull them from under the writer; it closes them when done
+            log.warning("DataLogger", "Stream writer still draining after stop", [
+                f"→ {self.background_writer.get_stats()['queue_depth']} rows queued",
+                "→ Files are closed by the writer thread when it finishes"
+            ])
+    
+    def _start_event_logging(self):
+        """Record the actuator/mode state at session start, then every change as it happens"""
+        resync_event_clock()  # Event and sample timestamps share the wall clock from here on
+        self.event_log = EventLog()
+        start_ns = int(self.start_time * 1e9)
+        for name, value in self.state.get_event_values().items():
+            self._on_event(start_ns, name, value)
+        self.state.add_event_listener(self._on_event)
+    
+    def _on_event(self, timestamp_ns: int, name: str, value: Any):
+        """Event listener - runs on the thread that changed the state, so it only enqueues"""
+        self.event_log.record(timestamp_ns, name, value)
+        self.background_writer.submit('events', [(timestamp_ns, [timestamp_ns, name, value])])
+    
+    def _start_native_logging(self):
+        """Subscribe to published samples"""
+        self.state.add_sample_listener(self._on_samples)
+    
+    def _stop_native_logging(self):
+        """Unsubscribe (the background writer then drains everything already queued)"""
+        self.state.remove_sample_listener(self._on_samples)
+    
+    def _on_samples(self, stream: str, samples):
+        """Sample listener - runs on the publishing service's thread, so it only enqueues"""
+        target = DEVICE_STREAMS.get(stream)
+        if target:
+            self.background_writer.submit(target, samples)
+    
     def _logging_worker(self):
         """Main logging worker thread"""
         # CSV logging worker starts silently
+        deadline = self._create_deadline()
         
         while self.logging and not self.stop_event.is_set():
             try:
-                # Get current timestamp
-                current_time = datetime.now()
-                timestamp_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]  # millisecond precision
-                elapsed_seconds = time.time() - self.start_time
-                
-                # Log different data types
-                self._log_main_sensors(timestamp_str, elapsed_seconds)
-                self._log_gas_analysis(timestamp_str, elapsed_seconds)
-                self._log_cell_voltages(timestamp_str, elapsed_seconds)
-                self._log_actuator_states(timestamp_str, elapsed_seconds)
-                
-                # Flush all files
-                for file_handle in self.file_handles.values():
-                    file_handle.flush()
-                
-                self.log_count += 1
+                self.log_once()
                 
-                # Wait for next interval
-                self.stop_event.wait(self.log_interval)
+                # Wait for the next tick on the shared deadline grid
+                if not deadline.wait(self.stop_event):
+                    break
                 
             except Exception as e:
                 print(f"❌ CSV logging error: {e}")
@@ -235,7 +435,26 @@ class CSVLogger:
         
         # CSV logging worker stops silently
     
-    def _log_main_sensors(self, timestamp: str, elapsed: float):
+    def _create_deadline(self):
+        """Deadline sequence for log ticks, phase-aligned to the configured acquisition task"""
+        scheduler_config = self.device_config.get_scheduler_config()
+        return get_scheduler().create_task('csv_logger', 1.0 / self.log_interval,
+                                           phase=scheduler_config['log_phase'],
+                                           align_to=scheduler_config['log_align_to'])
+    
+    def log_once(self):
+        """Queue one row for every stream from the current state snapshot (written by the background writer)"""
+        # Get current timestamp (epoch nanoseconds; CSV formats it with millisecond precision)
+        timestamp_ns = time.time_ns()
+        
+        # Log different data types
+        self._log_main_sensors(timestamp_ns)
+        self._log_gas_analysis(timestamp_ns)
+        self._log_cell_voltages(timestamp_ns)
+        
+        self.log_count += 1
+    
+    def _log_main_sensors(self, timestamp: int):
         """Log main sensor data (pressure, current, flowrate, temperature)"""
         try:
             # Get current sensor values
@@ -250,22 +469,21 @@ class CSVLogger:
             while len(temp_vals) < 8:
                 temp_vals.append(0.0)
             
+            # Stalled devices would repeat their last reading; log them as missing instead
+            if self.state.is_device_stale('ni_daq'):
+                pressure_vals, current_val, flowrate_val = [STALE_VALUE] * 6, STALE_VALUE, STALE_VALUE
+            if self.state.is_device_stale('pico_tc08'):
+                temp_vals = [STALE_VALUE] * 8
+            
             # Create row data in exact header order: PT01-PT06, Current, Flowrate, TC01-TC08
-            row = [
-                timestamp, round(elapsed, 3),
-                round(pressure_vals[0], 3), round(pressure_vals[1], 3), round(pressure_vals[2], 3), 
-                round(pressure_vals[3], 3), round(pressure_vals[4], 3), round(pressure_vals[5], 3), 
-                round(current_val, 1), round(flowrate_val, 2),
-                round(temp_vals[0], 1), round(temp_vals[1], 1), round(temp_vals[2], 1), round(temp_vals[3], 1),
-                round(temp_vals[4], 1), round(temp_vals[5], 1), round(temp_vals[6], 1), round(temp_vals[7], 1)
-            ]
+            values = pressure_vals[:6] + [current_val, flowrate_val] + temp_vals[:8]
             
-            self.csv_writers['main_sensors'].writerow(row)
+            self.background_writer.submit('main_sensors', [(timestamp, values)])
             
         except Exception as e:
             print(f"⚠️  Error logging main sensors: {e}")
     
-    def _log_gas_analysis(self, timestamp: str, elapsed: float):
+    def _log_gas_analysis(self, timestamp: int):
         """Log gas analysis data from BGA244 units with primary gas only"""
         try:
             # Get enhanced gas data from state (if available)
@@ -273,7 +491,7 @@ class CSVLogger:
             purge_mode = self.state.purge_mode
             
             # Create row data with primary gas only
-            row = [timestamp, round(elapsed, 3)]
+            row = []
             
             # Lists to collect primary gas data
             primary_percentages = []
@@ -289,7 +507,7 @@ class CSVLogger:
                     primary_gas = gas_reading.get('primary_gas', 'H2')
                     primary_pct = gas_reading.get('primary_gas_concentration', 0.0)
                     
-                    primary_percentages.append(round(primary_pct, 3))
+                    primary_percentages.append(primary_pct)
                     primary_gas_types.append(primary_gas)
             else:
                 # Fallback to legacy data format
@@ -321,20 +539,23 @@ class CSVLogger:
                     # Extract primary gas concentration
                     primary_pct = gas_readings.get(primary_gas, 0.0)
                     
-                    primary_percentages.append(round(primary_pct, 3))
+                    primary_percentages.append(primary_pct)
                     primary_gas_types.append(primary_gas)
             
+            if self.state.is_device_stale('bga244'):
+                primary_percentages = [STALE_VALUE] * len(primary_percentages)
+            
             # Build row: timestamp, elapsed, bga1_pct, bga2_pct, bga3_pct, bga1_pgas, bga2_pgas, bga3_pgas, purge
             row.extend(primary_percentages)
             row.extend(primary_gas_types)
             row.append(purge_mode)
             
-            self.csv_writers['gas_analysis'].writerow(row)
+            self.background_writer.submit('gas_analysis', [(timestamp, row)])
             
         except Exception as e:
             print(f"⚠️  Error logging gas analysis: {e}")
     
-    def _log_cell_voltages(self, timestamp: str, elapsed: float):
+    def _log_cell_voltages(self, timestamp: int):
         """Log cell voltage data from CVM24P"""
         try:
             # Get cell voltage data
@@ -343,93 +564,93 @@ class CSVLogger:
             # Ensure we have 120 voltage values
             while len(cell_voltages) < 120:
                 cell_voltages.append(0.0)
+            if self.state.is_device_stale('cvm24p'):
+                cell_voltages = [STALE_VALUE] * 120
             
             # Create row data
-            row = [timestamp, round(elapsed, 3)] + [round(v, 3) for v in cell_voltages]
-            
-            self.csv_writers['cell_voltages'].writerow(row)
+            self.background_writer.submit('cell_voltages', [(timestamp, cell_voltages[:120])])
             
         except Exception as e:
             print(f"⚠️  Error logging cell voltages: {e}")
     
-    def _log_actuator_states(self, timestamp: str, elapsed: float):
-        """Log actuator states (valves and pumps)"""
-        try:
-            # Get actuator states
-            valve_states = self.state.valve_states[:6]
-            pump_state = self.state.pump_state
-            koh_pump_state = self.state.koh_pump_state
-            
-            # Ensure we have 6 valve states
-            while len(valve_states) < 6:
-                valve_states.append(False)
-            
-            # Create row data (convert boolean to int for CSV)
-            row = [
-                timestamp, round(elapsed, 3),
-                int(valve_states[0]), int(valve_states[1]), int(valve_states[2]), int(valve_states[3]), int(valve_states[4]), int(valve_states[5]),
-                int(pump_state), int(koh_pump_state)
-            ]
-            
-            self.csv_writers['actuator_states'].writerow(row)
-            
-        except Exception as e:
-            print(f"⚠️  Error logging actuator states: {e}")
-    
     def _finalize_files(self) -> Dict[str, Any]:
-        """Close all CSV files and generate statistics"""
+        """Close all stream files and generate statistics"""
         stats = {
-            'log_count': self.log_count,
+            'log_count': self._entry_count(),
             'files_created': len(self.csv_files),
-            'file_paths': self.csv_files.copy()
+            'file_paths': self.csv_files.copy(),
+            'storage_backend': self.backend,
+            'mode': self.mode
         }
+        if self.background_writer:
+            stats['writer'] = self.background_writer.get_stats()
         
         if self.start_time:
             duration = time.time() - self.start_time
             stats['duration_seconds'] = duration
             stats['duration_formatted'] = f"{int(duration//60):02d}:{int(duration%60):02d}"
-            stats['average_rate'] = self.log_count / duration if duration > 0 else 0
+            stats['average_rate'] = stats['log_count'] / duration if duration > 0 else 0
         
-        # Close all file handles
-        for file_handle in self.file_handles.values():
-            try:
-                file_handle.close()
-            except Exception as e:
-                print(f"⚠️  Error closing file: {e}")
+        # Close all writers (columnar writers write their last row group here); the background
+        # writer closes the ones it owns when its thread exits
+        if not self.background_writer:
+            for writer in self.writers.values():
+                try:
+                    writer.close()
+                except Exception as e:
+                    print(f"⚠️  Error closing file: {e}")
         
         # Clear references
         self.csv_files.clear()
-        self.csv_writers.clear()
-        self.file_handles.clear()
+        self.writers.clear()
         
         return stats
     
     def _cleanup_files(self):
         """Cleanup files in case of error during initialization"""
-        for file_handle in self.file_handles.values():
-            try:
-                file_handle.close()
-            except:
-                pass
+        self.state.remove_event_listener(self._on_event)
+        if self.background_writer:
+            self._stop_background_writer()
+        else:
+            for writer in self.writers.values():
+                try:
+                    writer.close()
+                except:
+                    pass
         
         self.csv_files.clear()
-        self.csv_writers.clear()
-        self.file_handles.clear()
+        self.writers.clear()
+    
+    def _entry_count(self) -> int:
+        """Snapshot ticks, or rows written in native mode"""
+        if self.mode == 'native' and self.background_writer:
+            return self.background_writer.written_rows
+        return self.log_count
+    
+    def get_state_at(self, timestamp_ns: int) -> Dict[str, Any]:
+        """Actuator and mode values in force at a time during the current session"""
+        return self.event_log.state_at(timestamp_ns)
     
     def get_status(self) -> Dict[str, Any]:
         """Get current logging status"""
         status = {
             'logging': self.logging,
             'log_interval': self.log_interval,
-            'log_count': self.log_count,
-            'files_active': len(self.csv_files)
+            'log_count': self._entry_count(),
+            'files_active': len(self.csv_files),
+            'storage_backend': self.backend,
+            'mode': self.mode
         }
         
+        # Throughput, queue depth and overflow counters of the background writer
+        if self.background_writer:
+            status.update(self.background_writer.get_stats())
+        
         if self.start_time:
             duration = time.time() - self.start_time
             status['duration_seconds'] = duration
             status['duration_formatted'] = f"{int(duration//60):02d}:{int(duration%60):02d}"
-            status['average_rate'] = self.log_count / duration if duration > 0 else 0
+            status['average_rate'] = status['log_count'] / duration if duration > 0 else 0
         
         return status
     
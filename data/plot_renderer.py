@@ -0,0 +1,161 @@
+"""
+Plot rendering for AWE test rig post-processing
+Renders plot jobs with matplotlib's object-oriented Agg API, in a process pool or in-process
+
+Kept free of application imports so spawned worker processes start quickly.
+"""
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# A plot job is a plain dict (picklable for the pool):
+#   name, title, ylabel, output, xlim, ylim, legend, dpi, figsize
+#   x: array reference; series: [{'y': array reference, 'x' (optional per-series override),
+#                                  'color', 'linewidth', 'linestyle', 'label'}, ...]
+# Array references are {'array': ndarray} in-process, or {'file': .npy path, 'index': column}
+# for the pool (workers memory-map the file instead of receiving a pickled copy).
+
+DEFAULT_FIGSIZE = (10, 6)
+DEFAULT_DPI = 300
+
+
+def plot_pixel_width(job: Dict[str, Any]) -> float:
+    """Width of a job's plot area in output pixels (default subplot margins)"""
+    margins = matplotlib.rcParams['figure.subplot.right'] - matplotlib.rcParams['figure.subplot.left']
+    return job.get('figsize', DEFAULT_FIGSIZE)[0] * margins * job.get('dpi', DEFAULT_DPI)
+
+
+def share_arrays(arrays: Dict[str, np.ndarray], folder: Path) -> Dict[str, str]:
+    """
+    Write 2D arrays as .npy files for worker processes to memory-map
+    
+    Args:
+        arrays: Stream name -> 2D float array (rows x referenced columns)
+        folder: Directory for the files (removed by the caller when rendering is done)
+    
+    Returns:
+        Stream name -> file path
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, values in arrays.items():
+        path = folder / f"{name}.npy"
+        np.save(path, np.ascontiguousarray(values))
+        paths[name] = str(path)
+    return paths
+
+
+def _resolve(reference: Dict[str, Any], mapped: Dict[str, np.ndarray]) -> np.ndarray:
+    if 'array' in reference:
+        return reference['array']
+    path = reference['file']
+    if path not in mapped:
+        mapped[path] = np.load(path, mmap_mode='r')
+    return mapped[path][:, reference['index']]
+
+
+def render_plot(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render one plot job to a JPEG (runs in a worker process or in-process)
+    
+    Returns:
+        {'name', 'title', 'output', 'ok', 'seconds', 'error'}
+    """
+    started = time.perf_counter()
+    result = {'name': job['name'], 'title': job['title'], 'output': job['output'], 'ok': False, 'error': None}
+    try:
+        mapped: Dict[str, np.ndarray] = {}
+        fig = Figure(figsize=job.get('figsize', DEFAULT_FIGSIZE))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        
+        x = _resolve(job['x'], mapped)
+        for series in job['series']:
+            series_x = _resolve(series['x'], mapped) if 'x' in series else x
+            ax.plot(series_x, _resolve(series['y'], mapped), color=series.get('color'),
+                    linewidth=series.get('linewidth', 2), linestyle=series.get('linestyle', '-'),
+                    label=series.get('label'))
+        
+        ax.set_xlim(*job['xlim'])
+        ax.set_ylim(*job['ylim'])
+        ax.set_xlabel('Time (s)')
+        ax.set_ylabel(job['ylabel'])
+        ax.set_title(job['title'])
+        ax.grid(True, alpha=0.3)
+        if job.get('legend', True) and job['series']:
+            ax.legend()
+        
+        fig.savefig(job['output'], format='jpeg', dpi=job.get('dpi', DEFAULT_DPI), bbox_inches='tight')
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def render_plots(jobs: List[Dict[str, Any]], workers: int = 0) -> List[Dict[str, Any]]:
+    """
+    Render plot jobs, in parallel worker processes when workers != 1
+    
+    Args:
+        jobs: Plot jobs (array references should point at shared files for the pool)
+        workers: Process count (0 = one per job, up to CPU count - 1; 1 = render in-process)
+    
+    Returns:
+        Results in job order
+    """
+    if not jobs:
+        return []
+    if workers <= 0:
+        workers = min(len(jobs), max((os.cpu_count() or 2) - 1, 1))
+    if workers == 1:
+        return [render_plot(job) for job in jobs]
+    
+    try:
+        # Spawned workers do not inherit the app's threads, device handles or GUI backend
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            return list(pool.map(render_plot, jobs))
+    except Exception as e:
+        print(f"⚠️  Plot worker pool failed ({e}) - rendering in-process")
+        return [render_plot(job) for job in jobs]
+
+
+def main():
+    """Render four synthetic plots in-process and in a pool and compare wall time"""
+    import tempfile
+    
+    print("=" * 60)
+    print("PLOT RENDERER TEST: Pool vs in-process")
+    print("=" * 60)
+    
+    folder = Path(tempfile.mkdtemp())
+    elapsed = np.arange(0, 3600, 0.1)
+    values = np.column_stack([elapsed] + [np.sin(elapsed / (50 + i)) for i in range(4)])
+    paths = share_arrays({'demo': values}, folder)
+    
+    jobs = [{
+        'name': f"demo_{i}", 'title': f"Demo {i}", 'ylabel': 'Value', 'output': str(folder / f"demo_{i}.jpg"),
+        'xlim': (0, 3600), 'ylim': (-1.1, 1.1), 'x': {'file': paths['demo'], 'index': 0},
+        'series': [{'y': {'file': paths['demo'], 'index': i + 1}, 'color': 'blue', 'label': f"ch{i}"}]
+    } for i in range(4)]
+    
+    for workers in (1, 0):
+        started = time.perf_counter()
+        results = render_plots(jobs, workers)
+        timings = ", ".join(f"{result['seconds']:.2f}" for result in results)
+        print(f"   workers={workers or 'auto'}: {time.perf_counter() - started:.2f} s wall (per plot {timings} s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
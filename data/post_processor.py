@@ -5,10 +5,12 @@ Can run independently or as part of the test application
 """
 
 import os
+import shutil
 import sys
+import tempfile
+import time
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import matplotlib
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 import json
@@ -16,12 +18,30 @@ import argparse
 from datetime import datetime
 import numpy as np
 
+# POSIX only: peak resident memory for the out-of-core report
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Expected size in memory of a compressed CSV relative to its size on disk
+COMPRESSED_EXPANSION = 5
+
 # Add parent directory to path for imports when running standalone
 if __name__ == "__main__":
     sys.path.append(str(Path(__file__).parent.parent))
 
+from core.decimation import StreamingMinMax, decimate, target_points
 from core.state import get_global_state
 from data.session_manager import get_session_manager
+from data.session_catalog import catalog_summary
+from data.alignment import TimeSeries, align_streams
+from data.events import load_event_log
+from data.session_stats import build_summary, create_stream_stats, numeric_columns, summarize_frames, write_summary
+from data.plot_renderer import plot_pixel_width, render_plot, render_plots, share_arrays
+from data.storage import find_stream_files, iter_stream_chunks
+from data.stream_cache import load_stream
 from config.device_config import get_device_config
 from utils.logger import log
 
@@ -29,6 +49,17 @@ from utils.logger import log
 class DataPostProcessor:
     """Post-processing engine for AWE test rig data analysis"""
     
+    # Loaded stream name -> data file name suffix
+    STREAM_SUFFIXES = {
+        'sensors': 'sensors',
+        'gas_analysis': 'gas_analysis',
+        'cell_voltages': 'cell_voltages',
+        'actuators': 'actuators',
+        # Native-rate sessions split the sensors file per device
+        'daq': 'daq',
+        'temperatures': 'temperatures'
+    }
+    
     def __init__(self, session_folder: str, active_channels: Optional[Dict[str, Any]] = None):
         """
         Initialize post-processor
@@ -39,10 +70,7 @@ class DataPostProcessor:
         """
         self.session_folder = Path(session_folder)
         self.csv_folder = self.session_folder / "csv_data"
-        self.plots_folder = self.session_folder / "plots"
-        
-        # Ensure plots folder exists
-        self.plots_folder.mkdir(exist_ok=True)
+        self.plots_folder = self.session_folder / "plots"  # Created when plots are rendered
         
         # Active channels configuration
         self.active_channels = active_channels or self._load_channel_config()
@@ -57,6 +85,17 @@ class DataPostProcessor:
         self.data = {}
         self.max_time = 0
         
+        # Actuator/mode events (as-of state queries), None for sessions without an event stream
+        self.event_log = None
+        
+        # Out-of-core mode: self.data holds header-only frames; plots and statistics come from
+        # aggregators filled chunk by chunk (see load_streaming)
+        self.out_of_core = False
+        self.decimated: Dict[str, Tuple[List[str], np.ndarray, np.ndarray]] = {}
+        self.stream_stats = {}
+        self.stats_seconds = 0.0  # time spent in the statistics updates (the summary's compute_seconds)
+        self.memory_report: Dict[str, Any] = {}
+        
     def _build_plot_config(self) -> Dict[str, Any]:
         """Build plot configuration using device names from devices.yaml"""
         # Get device names from configuration
@@ -134,34 +173,156 @@ class DataPostProcessor:
             'flowrate': [0]  # Flowrate channel
         }
     
-    def load_csv_data(self) -> bool:
-        """Load all CSV data files"""
-        # Loading CSV data silently
+    def _find_stream_files(self) -> Dict[str, List[Path]]:
+        """Data files per stream (timestamped names, extension per storage backend; compressed/rotated
+        streams are a list of segments)"""
+        actual_files = {}
+        for file_type, expected_suffix in self.STREAM_SUFFIXES.items():
+            data_files = find_stream_files(self.csv_folder, expected_suffix)
+            if data_files:
+                actual_files[file_type] = data_files
+        return actual_files
+    
+    def estimate_memory_mb(self) -> float:
+        """Approximate memory needed to load every stream fully (compressed files expand)"""
+        total = 0
+        for paths in self._find_stream_files().values():
+            for path in paths:
+                expansion = COMPRESSED_EXPANSION if path.suffix.lower() in ('.gz', '.zst') else 1
+                total += path.stat().st_size * expansion
+        return total / (1024 * 1024)
+    
+    def load_data(self) -> bool:
+        """
+        Load the session in memory, or stream it chunk by chunk if it would not fit
         
-        # Expected CSV files
-        csv_files = {
-            'sensors': 'sensors.csv',
-            'gas_analysis': 'gas_analysis.csv', 
-            'cell_voltages': 'cell_voltages.csv',
-            'actuators': 'actuators.csv'
-        }
+        Controlled by system.post_processing.out_of_core ("auto" compares estimate_memory_mb()
+        with in_memory_limit_mb).
+        """
+        config = self.device_config.get_post_processing_config()
+        mode = config['out_of_core']
+        if mode == 'auto':
+            estimate = self.estimate_memory_mb()
+            mode = estimate > config['in_memory_limit_mb']
+            if mode:
+                print(f"   → Session needs ~{estimate:.0f} MB in memory (limit {config['in_memory_limit_mb']} MB) - "
+                      f"processing out of core")
+        return self.load_streaming() if mode else self.load_csv_data()
+    
+    def load_streaming(self, chunk_rows: Optional[int] = None) -> bool:
+        """
+        Out-of-core load: one pass over each stream in fixed-size chunks
         
-        # Find actual CSV files (they have timestamps in names)
-        actual_files = {}
-        for file_type, expected_suffix in csv_files.items():
-            for csv_file in self.csv_folder.glob(f"*_{expected_suffix}"):
-                actual_files[file_type] = csv_file
-                break
+        Only the current chunk and the aggregators are in memory: a min/max envelope per
+        stream for plotting (core.decimation.StreamingMinMax, sized to the plot width) and
+        the summary statistics (data.session_stats.StreamStats). self.data gets header-only
+        frames so the plot builders see each stream's columns. Peak usage is recorded in
+        self.memory_report.
         
+        Args:
+            chunk_rows: Rows per chunk (defaults to system.post_processing.chunk_rows)
+        """
+        config = self.device_config.get_post_processing_config()
+        chunk_rows = chunk_rows or config['chunk_rows']
+        decimation = self.device_config.get_plot_decimation_config()
+        stats_config = self.device_config.get_stats_config()
+        n_out = target_points(plot_pixel_width({}), decimation['points_per_pixel'])
+        
+        actual_files = self._find_stream_files()
         if not actual_files:
             print(f"❌ No CSV files found in {self.csv_folder}")
             return False
         
-        # Load each CSV file
-        for file_type, csv_path in actual_files.items():
+        self.out_of_core = True
+        self.stats_seconds = 0.0
+        peak_chunk_bytes = 0
+        for file_type, paths in actual_files.items():
             try:
-                print(f"   → Loading {file_type}: {csv_path.name}")
-                df = pd.read_csv(csv_path)
+                print(f"   → Streaming {file_type}: {paths[0].name} ({chunk_rows} rows per chunk)")
+                header = None
+                envelope = None
+                stats = None
+                rows = 0
+                for chunk in iter_stream_chunks(paths, chunk_rows=chunk_rows):
+                    if header is None:
+                        header = chunk.iloc[:0]
+                        columns = numeric_columns(chunk)
+                        if 'elapsed_seconds' not in chunk.columns or not columns:
+                            break
+                        envelope = StreamingMinMax(n_out)
+                        stats = create_stream_stats(file_type, columns, stats_config)
+                    peak_chunk_bytes = max(peak_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+                    elapsed = chunk['elapsed_seconds'].to_numpy(dtype=np.float64)
+                    values = chunk[columns].to_numpy(dtype=np.float64)
+                    envelope.update(elapsed, values)
+                    started = time.perf_counter()
+                    stats.update(elapsed, values)
+                    self.stats_seconds += time.perf_counter() - started
+                    rows += len(chunk)
+                
+                if header is None or not rows:
+                    print(f"   ⚠️  {file_type} is empty")
+                    continue
+                self.data[file_type] = header
+                if envelope is not None:
+                    x, y = envelope.result()
+                    self.decimated[file_type] = (columns, x, y)
+                    self.stream_stats[file_type] = stats
+                    self.max_time = max(self.max_time, stats.last_time or 0)
+                print(f"   ✅ Streamed {rows} rows from {file_type}")
+            except Exception as e:
+                print(f"   ❌ Error streaming {file_type}: {e}")
+                continue
+        
+        # Native-rate sessions: NI DAQ stream stands in for the sensors file (temperatures kept separate)
+        if 'sensors' not in self.data and 'daq' in self.data:
+            self.data['sensors'] = self.data.pop('daq')
+            for store in (self.decimated, self.stream_stats):
+                if 'daq' in store:
+                    store['sensors'] = store.pop('daq')
+        
+        try:
+            self.event_log = load_event_log(self.csv_folder)
+        except Exception as e:
+            print(f"   ❌ Error loading events: {e}")
+        
+        aggregator_bytes = sum(x.nbytes + y.nbytes for _, x, y in self.decimated.values())
+        aggregator_bytes += sum(stats.nbytes for stats in self.stream_stats.values())
+        self.memory_report = {
+            'chunk_rows': chunk_rows,
+            'peak_chunk_mb': round(peak_chunk_bytes / (1024 * 1024), 1),
+            'aggregators_mb': round(aggregator_bytes / (1024 * 1024), 1),
+            'peak_rss_mb': self._peak_rss_mb()
+        }
+        print(f"✅ Data streamed successfully, max time: {self.max_time:.1f}s")
+        return len(self.data) > 0
+    
+    @staticmethod
+    def _peak_rss_mb() -> Optional[float]:
+        """Process peak resident memory in MB (None where not available)"""
+        if not RESOURCE_AVAILABLE:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    
+    def load_csv_data(self) -> bool:
+        """Load all session data files (CSV, Parquet or HDF5)"""
+        # Loading CSV data silently
+        
+        csv_files = self.STREAM_SUFFIXES
+        actual_files = self._find_stream_files()
+        if not actual_files:
+            print(f"❌ No CSV files found in {self.csv_folder}")
+            return False
+        
+        # Load each CSV file (typed parse, or the parsed sidecar from an earlier run)
+        use_cache = self.device_config.get_post_processing_config()['stream_cache']
+        for file_type, csv_paths in actual_files.items():
+            try:
+                segments = f" (+{len(csv_paths) - 1} segments)" if len(csv_paths) > 1 else ""
+                print(f"   → Loading {file_type}: {csv_paths[0].name}{segments}")
+                df = load_stream(self.session_folder, csv_files[file_type], use_cache=use_cache)
                 
                 if df.empty:
                     print(f"   ⚠️  {file_type} is empty")
@@ -180,320 +341,372 @@ class DataPostProcessor:
                 print(f"   ❌ Error loading {file_type}: {e}")
                 continue
         
+        # Native-rate sessions: NI DAQ stream stands in for the sensors file (temperatures kept separate)
+        if 'sensors' not in self.data and 'daq' in self.data:
+            self.data['sensors'] = self.data.pop('daq')
+        
+        try:
+            self.event_log = load_event_log(self.csv_folder)
+            if self.event_log:
+                print(f"   ✅ Loaded {len(self.event_log)} actuator/mode events")
+        except Exception as e:
+            print(f"   ❌ Error loading events: {e}")
+        
         print(f"✅ Data loaded successfully, max time: {self.max_time:.1f}s")
         return len(self.data) > 0
     
-    def generate_pressure_plot(self) -> bool:
-        """Generate pressure vs time plot"""
+    def align_streams(self, specs: Dict[str, Dict[str, Any]], timeline: Any) -> pd.DataFrame:
+        """
+        Merge loaded streams onto one timeline (see data.alignment.align_streams)
+        
+        Args:
+            specs: Loaded stream name -> {'strategy', 'tolerance' (s), 'columns'?, 'how'?}
+            timeline: Stream name, rate in Hz or array of elapsed seconds
+        
+        Returns:
+            Aligned DataFrame (elapsed_seconds plus the requested columns)
+        """
+        if self.out_of_core:
+            raise RuntimeError("Stream alignment needs the full streams - not available out of core")
+        names = set(specs) | ({timeline} if isinstance(timeline, str) else set())
+        series = {}
+        for name in names:
+            if name not in self.data:
+                raise KeyError(f"Stream '{name}' not loaded")
+            columns = specs.get(name, {}).get('columns')
+            series[name] = TimeSeries.from_frame(name, self.data[name], columns)
+        return align_streams(series, specs, timeline)
+    
+    def current_voltage_frame(self, tolerance: float = 0.1) -> pd.DataFrame:
+        """
+        Stack current co-timed with each cell voltage sample
+        
+        Current is averaged over the tolerance window ending at each voltage sample, so a
+        250 Hz current stream is matched to what the 10 Hz voltage reading integrated over.
+        
+        Args:
+            tolerance: Averaging window in seconds
+        """
+        if 'cell_voltages' not in self.data:
+            raise KeyError("Stream 'cell_voltages' not loaded")
+        cell_columns = [column for column in self.data['cell_voltages'].columns if column.startswith('cell_')]
+        return self.align_streams({
+            'cell_voltages': {'strategy': 'asof', 'tolerance': None, 'columns': cell_columns},
+            'sensors': {'strategy': 'window', 'tolerance': tolerance, 'how': 'mean', 'columns': ['Current']}
+        }, timeline='cell_voltages')
+    
+    def _series(self, stream: str, column: str, **style) -> Dict[str, Any]:
+        """Plot series referencing a loaded column (resolved to data by _attach_data)"""
+        return dict(style, y={'stream': stream, 'column': column})
+    
+    def _plot_job(self, name: str, config: Dict[str, Any], stream: str, series: List[Dict[str, Any]],
+                  legend: bool = True) -> Dict[str, Any]:
+        """Plot job for data.plot_renderer (x axis is the stream's elapsed time)"""
+        return {
+            'name': name,
+            'title': config['title'],
+            'ylabel': config['ylabel'],
+            'output': str(self.plots_folder / f"{name}.jpg"),
+            'xlim': (0, max(self.max_time * 1.1, 120)),
+            'ylim': config['y_limits'],
+            'legend': legend,
+            'x': {'stream': stream, 'column': 'elapsed_seconds'},
+            'series': series
+        }
+    
+    def _pressure_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Pressure vs time plot job"""
         if 'sensors' not in self.data:
             print("❌ No sensor data available for pressure plot")
-            return False
+            return None
         
-        try:
-            # Generating pressure plot
-            
-            df = self.data['sensors']
-            config = self.plot_config['pressure']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Plot pressure channels that are active - use dynamic names from device_config
-            pressure_column_names = self.device_config.get_pressure_channel_names()
-            colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
-            active_pressure = self.active_channels.get('pressure', [0, 1, 2, 3, 4, 5])
-            
-            for i, col_name in enumerate(pressure_column_names):
-                if i in active_pressure and col_name in df.columns:
-                    ax.plot(df['elapsed_seconds'], df[col_name], 
-                           color=colors[i % len(colors)], linewidth=2, label=col_name)
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "pressure.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Pressure plot saved: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error generating pressure plot: {e}")
-            return False
+        df = self.data['sensors']
+        
+        # Plot pressure channels that are active - use dynamic names from device_config
+        pressure_column_names = self.device_config.get_pressure_channel_names()
+        colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
+        active_pressure = self.active_channels.get('pressure', [0, 1, 2, 3, 4, 5])
+        
+        series = [self._series('sensors', col_name, color=colors[i % len(colors)], linewidth=2, label=col_name)
+                  for i, col_name in enumerate(pressure_column_names)
+                  if i in active_pressure and col_name in df.columns]
+        return self._plot_job('pressure', self.plot_config['pressure'], 'sensors', series)
     
-    def generate_gas_purity_plot(self) -> bool:
-        """Generate gas purity vs time plot"""
+    def _gas_purity_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Gas purity vs time plot job"""
         if 'gas_analysis' not in self.data:
             print("❌ No gas analysis data available for purity plot")
-            return False
+            return None
         
-        try:
-            # Generating gas purity plot
-            
-            df = self.data['gas_analysis']
-            config = self.plot_config['gas_purity']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Plot BGA channels that are active - use dynamic names from device_config
-            bga_names = self.device_config.get_bga244_unit_names()
-            gas_columns = [f'{name}_pct' for name in bga_names]
-            colors = ['blue', 'red', 'green']
-            active_gas = self.active_channels.get('gas', [0, 1, 2])
-            
-            for i, col in enumerate(gas_columns):
-                if i in active_gas and col in df.columns:
-                    ax.plot(df['elapsed_seconds'], df[col], 
-                           color=colors[i], linewidth=2, label=bga_names[i])
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "gas_purity.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Gas purity plot saved: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error generating gas purity plot: {e}")
-            return False
+        df = self.data['gas_analysis']
+        
+        # Plot BGA channels that are active - use dynamic names from device_config
+        bga_names = self.device_config.get_bga244_unit_names()
+        gas_columns = [f'{name}_pct' for name in bga_names]
+        colors = ['blue', 'red', 'green']
+        active_gas = self.active_channels.get('gas', [0, 1, 2])
+        
+        series = [self._series('gas_analysis', col, color=colors[i], linewidth=2, label=bga_names[i])
+                  for i, col in enumerate(gas_columns)
+                  if i in active_gas and col in df.columns]
+        return self._plot_job('gas_purity', self.plot_config['gas_purity'], 'gas_analysis', series)
     
-    def generate_temperature_plot(self) -> bool:
-        """Generate temperature vs time plot"""
-        if 'sensors' not in self.data:
+    def _temperature_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Temperature vs time plot job"""
+        if 'sensors' not in self.data and 'temperatures' not in self.data:
             print("❌ No sensor data available for temperature plot")
-            return False
+            return None
         
-        try:
-            # Generating temperature plot
-            
-            df = self.data['sensors']
-            config = self.plot_config['temperature']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Plot temperature channels that are active - use dynamic names from device_config
-            temp_column_names = self.device_config.get_pico_tc08_channel_names()
-            colors = plt.cm.tab10(np.linspace(0, 1, 8))
-            active_temp = self.active_channels.get('temperature', list(range(8)))
-            
-            for i, col_name in enumerate(temp_column_names):
-                if i in active_temp and col_name in df.columns:
-                    # Different line styles for different channel groups
-                    linestyle = '-' if i < 4 else '--'
-                    linewidth = 2 if i < 4 else 1.5
-                    
-                    ax.plot(df['elapsed_seconds'], df[col_name], 
-                           color=colors[i], linewidth=linewidth, linestyle=linestyle,
-                           label=col_name)
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "temperature.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Temperature plot saved: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error generating temperature plot: {e}")
-            return False
+        stream = 'temperatures' if 'temperatures' in self.data else 'sensors'
+        df = self.data[stream]
+        
+        # Plot temperature channels that are active - use dynamic names from device_config
+        temp_column_names = self.device_config.get_pico_tc08_channel_names()
+        colors = [tuple(color) for color in matplotlib.colormaps['tab10'](np.linspace(0, 1, 8))]
+        active_temp = self.active_channels.get('temperature', list(range(8)))
+        
+        series = []
+        for i, col_name in enumerate(temp_column_names):
+            if i in active_temp and col_name in df.columns:
+                # Different line styles for different channel groups
+                series.append(self._series(stream, col_name, color=colors[i % len(colors)],
+                                           linewidth=2 if i < 4 else 1.5, linestyle='-' if i < 4 else '--',
+                                           label=col_name))
+        return self._plot_job('temperature', self.plot_config['temperature'], stream, series)
     
-    def generate_cell_voltage_plot(self) -> bool:
-        """Generate cell voltage vs time plot"""
+    def _cell_voltage_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Cell voltage vs time plot job"""
         if 'cell_voltages' not in self.data:
             print("❌ No cell voltage data available for voltage plot")
-            return False
+            return None
         
-        try:
-            # Generating cell voltage plot
-            
-            df = self.data['cell_voltages']
-            config = self.plot_config['cell_voltage']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Get active voltage channels
-            active_voltage = self.active_channels.get('voltage', list(range(120)))
-            
-            # Limit to reasonable number of channels for visibility
-            if len(active_voltage) > 20:
-                print(f"   → Limiting to first 20 voltage channels for plot clarity")
-                active_voltage = active_voltage[:20]
-            
-            colors = plt.cm.tab20(np.linspace(0, 1, len(active_voltage)))
-            
-            for i, channel_idx in enumerate(active_voltage):
-                col_name = f'cell_{channel_idx+1:03d}_v'
-                if col_name in df.columns:
-                    ax.plot(df['elapsed_seconds'], df[col_name], 
-                           color=colors[i], linewidth=1.5, 
-                           label=f'Cell {channel_idx+1}')
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            
-            # Only show legend if reasonable number of channels
-            if len(active_voltage) <= 10:
-                ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "cell_voltage.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Cell voltage plot saved: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error generating cell voltage plot: {e}")
-            return False
+        df = self.data['cell_voltages']
+        
+        # All active voltage channels (decimation keeps 120 cells over a long session cheap to draw)
+        active_voltage = self.active_channels.get('voltage', list(range(120)))
+        
+        colors = [tuple(color) for color in matplotlib.colormaps['tab20'](np.linspace(0, 1, len(active_voltage)))]
+        
+        linewidth = 1.5 if len(active_voltage) <= 20 else 0.8
+        
+        series = []
+        for i, channel_idx in enumerate(active_voltage):
+            col_name = f'cell_{channel_idx+1:03d}_v'
+            if col_name in df.columns:
+                series.append(self._series('cell_voltages', col_name, color=colors[i], linewidth=linewidth,
+                                           label=f'Cell {channel_idx+1}'))
+        
+        # Only show legend if reasonable number of channels
+        return self._plot_job('cell_voltage', self.plot_config['cell_voltage'], 'cell_voltages', series,
+                              legend=len(active_voltage) <= 10)
     
-    def generate_current_plot(self) -> bool:
-        """Generate current vs time plot"""
+    def _current_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Current vs time plot job"""
         if 'sensors' not in self.data:
             print("❌ No sensor data available for current plot")
-            return False
+            return None
         
-        try:
-            # Generating current plot
-            
-            df = self.data['sensors']
-            config = self.plot_config['current']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Plot current if active
-            active_current = self.active_channels.get('current', [0])
-            
-            if 0 in active_current and 'Current' in df.columns:
-                ax.plot(df['elapsed_seconds'], df['Current'], 
-                       color='blue', linewidth=2, label='Stack Current')
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "current.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Current plot saved: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error generating current plot: {e}")
-            return False
+        # Plot current if active
+        active_current = self.active_channels.get('current', [0])
+        series = []
+        if 0 in active_current and 'Current' in self.data['sensors'].columns:
+            series.append(self._series('sensors', 'Current', color='blue', linewidth=2, label='Stack Current'))
+        return self._plot_job('current', self.plot_config['current'], 'sensors', series)
     
-    def generate_flowrate_plot(self) -> bool:
-        """Generate flowrate vs time plot"""
+    def _flowrate_plot_job(self) -> Optional[Dict[str, Any]]:
+        """Flowrate vs time plot job"""
         if 'sensors' not in self.data:
             print("❌ No sensor data available for flowrate plot")
+            return None
+        
+        # Plot flowrate if active
+        active_flowrate = self.active_channels.get('flowrate', [0])
+        series = []
+        if 0 in active_flowrate and 'Flowrate' in self.data['sensors'].columns:
+            series.append(self._series('sensors', 'Flowrate', color='red', linewidth=2, label='Mass Flowrate'))
+        return self._plot_job('flowrate', self.plot_config['flowrate'], 'sensors', series)
+    
+    def _plot_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs for every plot with data, in report order"""
+        builders = [self._pressure_plot_job, self._gas_purity_plot_job, self._temperature_plot_job,
+                    self._cell_voltage_plot_job, self._current_plot_job, self._flowrate_plot_job]
+        return [job for job in (builder() for builder in builders) if job]
+    
+    def _attach_data(self, jobs: List[Dict[str, Any]], share_folder: Optional[Path] = None):
+        """
+        Resolve the jobs' column references to decimated data
+        
+        Each stream's referenced columns are decimated together (core.decimation) to about
+        points_per_pixel points per pixel of the widest plot using them, so a multi-day
+        session draws as fast as a short one. In-process rendering gets the arrays directly;
+        for the worker pool each stream is written once to a .npy file that the workers
+        memory-map. Stream arrays hold the y columns followed by the x column(s): one shared
+        x for min/max decimation, one per y column for LTTB.
+        """
+        decimation = self.device_config.get_plot_decimation_config()
+        
+        columns: Dict[str, List[str]] = {}
+        pixel_width: Dict[str, float] = {}
+        for job in jobs:
+            for series in job['series']:
+                stream_columns = columns.setdefault(series['y']['stream'], [])
+                if series['y']['column'] not in stream_columns:
+                    stream_columns.append(series['y']['column'])
+            stream = job['x']['stream']
+            pixel_width[stream] = max(pixel_width.get(stream, 0), plot_pixel_width(job))
+        
+        arrays = {}
+        for stream, names in columns.items():
+            if stream in self.decimated:
+                # Out of core: the envelope was built while streaming
+                stream_columns, x, y = self.decimated[stream]
+                y = y[:, [stream_columns.index(name) for name in names]]
+            else:
+                df = self.data[stream]
+                x, y = decimate(df['elapsed_seconds'].to_numpy(dtype=np.float64),
+                                df[names].to_numpy(dtype=np.float64),
+                                target_points(pixel_width[stream], decimation['points_per_pixel']),
+                                decimation['method'])
+            arrays[stream] = np.column_stack([y, x.reshape(len(x), -1)])
+        paths = share_arrays(arrays, share_folder) if share_folder else {}
+        
+        def reference(stream: str, index: int) -> Dict[str, Any]:
+            if share_folder:
+                return {'file': paths[stream], 'index': index}
+            return {'array': arrays[stream][:, index]}
+        
+        for job in jobs:
+            stream = job['x']['stream']
+            if stream not in arrays:
+                job['x'] = {'array': np.empty(0)}
+                continue
+            x_index = len(columns[stream])
+            per_column_x = arrays[stream].shape[1] > x_index + 1
+            job['x'] = reference(stream, x_index)
+            for series in job['series']:
+                index = columns[stream].index(series['y']['column'])
+                series['y'] = reference(stream, index)
+                if per_column_x:
+                    series['x'] = reference(stream, x_index + index)
+    
+    def _render_single(self, job: Optional[Dict[str, Any]]) -> bool:
+        """Render one plot job in-process"""
+        if job is None:
             return False
+        self._attach_data([job])
+        result = render_plot(job)
+        if result['ok']:
+            print(f"✅ {result['title']} plot saved: {result['output']} ({result['seconds']:.2f} s)")
+        else:
+            print(f"❌ Error generating {result['title']} plot: {result['error']}")
+        return result['ok']
+    
+    def generate_pressure_plot(self) -> bool:
+        """Generate pressure vs time plot"""
+        return self._render_single(self._pressure_plot_job())
+    
+    def generate_gas_purity_plot(self) -> bool:
+        """Generate gas purity vs time plot"""
+        return self._render_single(self._gas_purity_plot_job())
+    
+    def generate_temperature_plot(self) -> bool:
+        """Generate temperature vs time plot"""
+        return self._render_single(self._temperature_plot_job())
+    
+    def generate_cell_voltage_plot(self) -> bool:
+        """Generate cell voltage vs time plot"""
+        return self._render_single(self._cell_voltage_plot_job())
+    
+    def generate_current_plot(self) -> bool:
+        """Generate current vs time plot"""
+        return self._render_single(self._current_plot_job())
+    
+    def generate_flowrate_plot(self) -> bool:
+        """Generate flowrate vs time plot"""
+        return self._render_single(self._flowrate_plot_job())
+    
+    def generate_plots(self, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Render all plots, in parallel worker processes unless workers == 1
+        
+        Args:
+            workers: Process count (defaults to system.post_processing.plot_workers, 0 = auto)
+        
+        Returns:
+            Per-plot results with render time (data.plot_renderer.render_plot)
+        """
+        if workers is None:
+            workers = self.device_config.get_post_processing_config()['plot_workers']
         
+        jobs = self._plot_jobs()
+        if not jobs:
+            return []
+        self.plots_folder.mkdir(exist_ok=True)
+        
+        share_folder = Path(tempfile.mkdtemp(prefix="awe_plots_")) if workers != 1 else None
         try:
-            # Generating flowrate plot
-            
-            df = self.data['sensors']
-            config = self.plot_config['flowrate']
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Plot flowrate if active
-            active_flowrate = self.active_channels.get('flowrate', [0])
-            
-            if 0 in active_flowrate and 'Flowrate' in df.columns:
-                ax.plot(df['elapsed_seconds'], df['Flowrate'], 
-                       color='red', linewidth=2, label='Mass Flowrate')
-            
-            ax.set_xlim(0, max(self.max_time * 1.1, 120))
-            ax.set_ylim(config['y_limits'])
-            ax.set_xlabel('Time (s)')
-            ax.set_ylabel(config['ylabel'])
-            ax.set_title(config['title'])
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Save as JPEG
-            output_path = self.plots_folder / "flowrate.jpg"
-            plt.savefig(output_path, format='jpeg', dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            print(f"✅ Flowrate plot saved: {output_path}")
-            return True
-            
+            self._attach_data(jobs, share_folder)
+            return render_plots(jobs, workers)
+        finally:
+            if share_folder:
+                shutil.rmtree(share_folder, ignore_errors=True)
+    
+    def generate_summary(self) -> Optional[Path]:
+        """Write summary.json (per-channel statistics and cell health) from the loaded streams"""
+        try:
+            if self.out_of_core:
+                percentiles = self.device_config.get_stats_config()['percentiles']
+                started = time.perf_counter()
+                streams = {stream: stats.result(percentiles) for stream, stats in self.stream_stats.items()}
+                summary = build_summary(self.session_folder, streams,
+                                        self.stats_seconds + time.perf_counter() - started)
+                summary['memory'] = self.memory_report
+            else:
+                summary = summarize_frames(self.session_folder, self.data)
+            path = write_summary(self.session_folder, summary)
+            catalog_summary(self.session_folder, summary)
+            print(f"✅ Session summary saved: {path} ({summary['compute_seconds']:.2f} s)")
+            return path
         except Exception as e:
-            print(f"❌ Error generating flowrate plot: {e}")
-            return False
+            print(f"❌ Error generating session summary: {e}")
+            return None
     
     def process_session(self) -> bool:
         """Process complete session data and generate all plots"""
         log.info("PostProcessor", f"Generating plots for session: {self.session_folder.name}")
         
-        # Load CSV data
-        if not self.load_csv_data():
+        # Load CSV data (streamed chunk by chunk if the session would not fit in memory)
+        if not self.load_data():
             log.error("PostProcessor", "Failed to load CSV data")
             return False
         
         # Generate all plots
-        plots_generated = 0
-        
-        if self.generate_pressure_plot():
-            plots_generated += 1
-            
-        if self.generate_gas_purity_plot():
-            plots_generated += 1
-            
-        if self.generate_temperature_plot():
-            plots_generated += 1
-            
-        if self.generate_cell_voltage_plot():
-            plots_generated += 1
-            
-        if self.generate_current_plot():
-            plots_generated += 1
-            
-        if self.generate_flowrate_plot():
-            plots_generated += 1
+        started = time.perf_counter()
+        results = self.generate_plots()
+        wall_time = time.perf_counter() - started
+        plots_generated = sum(1 for result in results if result['ok'])
         
         plot_details = []
-        if self.data_files:
-            for plot_type in ["Pressure", "Gas Purity", "Temperature", "Voltages", "Current", "Flowrate"]:
-                if plots_generated > 0:  # At least some plots were generated
-                    plot_details.append(f"• {plot_type} → ✅ saved")
+        for result in results:
+            if result['ok']:
+                plot_details.append(f"• {result['title']} → ✅ {result['seconds']:.2f} s")
+            else:
+                plot_details.append(f"• {result['title']} → ❌ {result['error']}")
+        
+        log.success("PostProcessor", f"{plots_generated}/{len(results)} plots generated in {wall_time:.1f} s",
+                    plot_details)
         
-        log.success("PostProcessor", f"All {plots_generated} plots generated", plot_details)
+        if self.device_config.get_stats_config()['enabled']:
+            self.generate_summary()
+        
+        if self.out_of_core:
+            report = self.memory_report
+            peak_rss = f"{report['peak_rss_mb']} MB" if report['peak_rss_mb'] is not None else "n/a"
+            log.info("PostProcessor", "Processed out of core", [
+                f"→ Chunk: {report['chunk_rows']} rows, peak {report['peak_chunk_mb']} MB",
+                f"→ Aggregators: {report['aggregators_mb']} MB",
+                f"→ Process peak RSS: {peak_rss}"
+            ])
         
         return plots_generated > 0
 
@@ -516,11 +729,21 @@ def process_session_data(session_folder: str, active_channels: Optional[Dict[str
 def main():
     """Main function for standalone execution"""
     parser = argparse.ArgumentParser(description='AWE Test Rig Data Post-Processor')
-    parser.add_argument('session_folder', help='Path to session folder containing CSV data')
+    parser.add_argument('session_folder', nargs='?', help='Path to session folder containing CSV data')
     parser.add_argument('--channels', help='JSON file with active channel configuration (optional)')
+    parser.add_argument('--all', metavar='SESSIONS_ROOT',
+                        help='Batch mode: process every changed session under this folder (see data/batch_processor.py)')
+    parser.add_argument('--force', action='store_true', help='Batch mode: reprocess unchanged sessions too')
     
     args = parser.parse_args()
     
+    if args.all:
+        from data.batch_processor import process_all_sessions
+        report = process_all_sessions(Path(args.all), force=args.force)
+        return 1 if report['counts']['failed'] else 0
+    if not args.session_folder:
+        parser.error("session_folder is required unless --all is given")
+    
     # Validate session folder
     session_path = Path(args.session_folder)
     if not session_path.exists():
@@ -0,0 +1,430 @@
+"""
+Session archiving for AWE test rig
+Packs old session folders into compressed, checksummed containers that can still be read without extracting
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+# Add parent directory to path for imports when running standalone
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.storage import PYARROW_AVAILABLE, iter_stream_chunks, read_stream
+from utils.logger import log
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+# Container per session inside the archive folder: <archive>/<session_id>.zip
+# (ZIP rather than tar: its central directory lets one member be read without scanning the rest)
+ARCHIVE_EXTENSION = '.zip'
+
+# Per-container manifest member and per-archive-folder manifest file
+MANIFEST_MEMBER = "MANIFEST.json"
+ARCHIVE_MANIFEST = "manifest.json"
+
+# Subfolders left out of containers (regenerable sidecars)
+SKIPPED_FOLDERS = ('cache',)
+
+# CSV streams (plain or compressed) that are converted to Parquet when convert_csv is on
+CSV_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+
+# Members that are already compressed and would not shrink further
+STORED_SUFFIXES = ('.parquet', '.h5', '.gz', '.zst', '.jpg', '.jpeg', '.png', '.zip')
+
+# Rows per chunk when converting CSV streams (bounds worker memory)
+CONVERT_CHUNK_ROWS = 50000
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _csv_stem(name: str) -> Optional[str]:
+    """Name without its CSV extension, or None if the file is not a CSV stream"""
+    for suffix in sorted(CSV_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return None
+
+
+def _convert_csv(source: Path, target: Path, compression_level: int) -> int:
+    """
+    Write a CSV stream as a zstd Parquet file, chunk by chunk
+    
+    Returns:
+        Number of rows converted
+    """
+    rows = 0
+    writer = None
+    try:
+        for df in iter_stream_chunks([source], chunk_rows=CONVERT_CHUNK_ROWS):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema, compression='zstd',
+                                          compression_level=compression_level)
+            elif not table.schema.equals(writer.schema, check_metadata=False):
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError):
+        # Later chunks contradict the first chunk's types: convert the whole file in one pass
+        if writer is not None:
+            writer.close()
+            writer = None
+        df = read_stream(source)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), target, compression='zstd',
+                       compression_level=compression_level)
+        return len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    if writer is None:
+        # Header-only file
+        df = read_stream(source)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), target, compression='zstd',
+                       compression_level=compression_level)
+    return rows
+
+
+def verify_container(container: Path) -> List[str]:
+    """
+    Check every member of a session container against its manifest
+    
+    Returns:
+        Problems found (empty if the container is intact)
+    """
+    problems = []
+    with zipfile.ZipFile(container) as zf:
+        try:
+            manifest = json.loads(zf.read(MANIFEST_MEMBER))
+        except KeyError:
+            return [f"{MANIFEST_MEMBER} missing"]
+        names = set(zf.namelist())
+        for entry in manifest['files']:
+            member = entry['member']
+            if member not in names:
+                problems.append(f"{member}: missing")
+                continue
+            digest = hashlib.sha256()
+            try:
+                with zf.open(member) as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+            except zipfile.BadZipFile as e:
+                problems.append(f"{member}: {e}")
+                continue
+            if digest.hexdigest() != entry['sha256']:
+                problems.append(f"{member}: checksum mismatch")
+            elif 'rows' in entry and PYARROW_AVAILABLE:
+                with zf.open(member) as f:
+                    rows = pq.ParquetFile(f).metadata.num_rows
+                if rows != entry['rows']:
+                    problems.append(f"{member}: {rows} rows, expected {entry['rows']}")
+    return problems
+
+
+def archive_session(session_folder: str, archive_dir: str, convert_csv: bool = True,
+                    compression_level: int = 9, remove_source: bool = True) -> Dict[str, Any]:
+    """
+    Pack one session folder into <archive_dir>/<session>.zip and verify it
+    
+    CSV streams become zstd Parquet members (when convert_csv and pyarrow is installed),
+    already-compressed files are stored as they are and everything else is deflated. The
+    container's MANIFEST.json lists each original file with its size and SHA-256 and each
+    member with its SHA-256 (and row count for converted streams). The source folder is
+    only removed after the written container passes verify_container.
+    
+    Returns:
+        {'session', 'status' ('archived' | 'failed'), 'container', 'sha256', 'original_bytes',
+         'archived_bytes', 'files', 'seconds', 'error'}
+    """
+    started = time.perf_counter()
+    session_folder = Path(session_folder)
+    archive_dir = Path(archive_dir)
+    container = archive_dir / f"{session_folder.name}{ARCHIVE_EXTENSION}"
+    temp_container = archive_dir / f"{container.name}.tmp"
+    result = {'session': session_folder.name, 'status': 'failed', 'container': str(container),
+              'error': None, 'files': 0}
+    convert = convert_csv and PYARROW_AVAILABLE
+    
+    try:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        sources = sorted(path for path in session_folder.rglob('*') if path.is_file()
+                         and path.relative_to(session_folder).parts[0] not in SKIPPED_FOLDERS)
+        entries = []
+        with tempfile.TemporaryDirectory(prefix="awe_archive_") as scratch, \
+                zipfile.ZipFile(temp_container, 'w', allowZip64=True) as zf:
+            for source in sources:
+                relative = source.relative_to(session_folder).as_posix()
+                entry = {'path': relative, 'size': source.stat().st_size, 'source_sha256': _sha256(source)}
+                stem = _csv_stem(source.name)
+                if convert and stem is not None and relative.startswith("csv_data/"):
+                    converted = Path(scratch) / f"{stem}.parquet"
+                    entry['rows'] = _convert_csv(source, converted, compression_level)
+                    entry['member'] = f"{Path(relative).parent.as_posix()}/{converted.name}"
+                    payload = converted
+                else:
+                    entry['member'] = relative
+                    payload = source
+                entry['sha256'] = _sha256(payload) if payload is not source else entry['source_sha256']
+                if payload.name.lower().endswith(STORED_SUFFIXES):
+                    zf.write(payload, entry['member'], compress_type=zipfile.ZIP_STORED)
+                else:
+                    zf.write(payload, entry['member'], compress_type=zipfile.ZIP_DEFLATED,
+                             compresslevel=min(compression_level, 9))
+                if payload is not source:
+                    payload.unlink()
+                entries.append(entry)
+            
+            manifest = {
+                'session_id': session_folder.name,
+                'archived_at': datetime.now().isoformat(),
+                'original_bytes': sum(entry['size'] for entry in entries),
+                'files': entries
+            }
+            zf.writestr(MANIFEST_MEMBER, json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        
+        problems = verify_container(temp_container)
+        if problems:
+            raise RuntimeError(f"verification failed: {'; '.join(problems[:3])}")
+        with open(temp_container, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_container, container)
+        
+        result.update({'status': 'archived', 'sha256': _sha256(container), 'files': len(entries),
+                       'original_bytes': manifest['original_bytes'], 'archived_bytes': container.stat().st_size})
+        if remove_source:
+            shutil.rmtree(session_folder)
+    except MemoryError:
+        result['error'] = "out of memory"
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    finally:
+        if temp_container.exists():
+            temp_container.unlink()
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _archive_one(session_folder: str, archive_dir: str, convert_csv: bool, compression_level: int) -> Dict[str, Any]:
+    """Worker entry point (stdout from the readers is discarded)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return archive_session(session_folder, archive_dir, convert_csv, compression_level)
+
+
+def read_archive_manifest(archive_dir: Path) -> Dict[str, Any]:
+    """Archive-folder manifest: {session_id: container record}"""
+    try:
+        with open(Path(archive_dir) / ARCHIVE_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_archive_manifest(archive_dir: Path, results: Sequence[Dict[str, Any]]):
+    """Add archived sessions to the archive-folder manifest (written atomically)"""
+    manifest = read_archive_manifest(archive_dir)
+    for result in results:
+        if result['status'] == 'archived':
+            manifest[result['session']] = {
+                'container': Path(result['container']).name,
+                'sha256': result['sha256'],
+                'original_bytes': result['original_bytes'],
+                'archived_bytes': result['archived_bytes'],
+                'files': result['files'],
+                'archived_at': datetime.now().isoformat()
+            }
+    temp_path = Path(archive_dir) / (ARCHIVE_MANIFEST + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, Path(archive_dir) / ARCHIVE_MANIFEST)
+
+
+def archive_sessions(session_folders: Sequence[Path], archive_dir: Path, workers: int = 0,
+                     convert_csv: bool = True, compression_level: int = 9) -> List[Dict[str, Any]]:
+    """
+    Archive several sessions in parallel; one session failing leaves the others unaffected
+    
+    Args:
+        session_folders: Session folders to archive
+        archive_dir: Destination folder (containers and manifest.json)
+        workers: Worker processes (0 = CPU count, 1 = in this process)
+        convert_csv: Convert CSV streams to Parquet
+        compression_level: zstd level for converted streams / deflate level (max 9) for other files
+    
+    Returns:
+        One archive_session result per session
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    pending = [str(folder) for folder in session_folders]
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    results = []
+    if workers == 1 or len(pending) <= 1:
+        results = [_archive_one(folder, str(archive_dir), convert_csv, compression_level) for folder in pending]
+    elif pending:
+        # Spawned workers do not inherit the caller's threads or GUI state
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=mp.get_context('spawn')) as pool:
+            futures = {pool.submit(_archive_one, folder, str(archive_dir), convert_csv, compression_level): folder
+                       for folder in pending}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'session': Path(futures[future]).name, 'status': 'failed', 'seconds': 0.0,
+                                    'error': f"worker died: {e}"})
+    
+    _update_archive_manifest(archive_dir, results)
+    archived = [result for result in results if result['status'] == 'archived']
+    original = sum(result['original_bytes'] for result in archived)
+    packed = sum(result['archived_bytes'] for result in archived)
+    details = [f"→ {original / 1e6:.1f} MB → {packed / 1e6:.1f} MB"
+               f"{f' ({original / packed:.1f}x)' if packed else ''}"]
+    details += [f"❌ {result['session']}: {result['error']}" for result in results if result['status'] == 'failed']
+    log.info("Archive", f"Archived {len(archived)} of {len(results)} sessions", details)
+    return sorted(results, key=lambda result: result['session'])
+
+
+class ArchivedSession:
+    """Read-only view of a session container; members are read on demand, nothing is extracted"""
+    
+    def __init__(self, container: Path):
+        self.container = Path(container)
+        self._zip = zipfile.ZipFile(self.container)
+        self.manifest = json.loads(self._zip.read(MANIFEST_MEMBER))
+    
+    def close(self):
+        self._zip.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @property
+    def session_id(self) -> str:
+        return self.manifest['session_id']
+    
+    def members(self) -> List[str]:
+        """Member names in the container (without the manifest)"""
+        return [entry['member'] for entry in self.manifest['files']]
+    
+    def read_json(self, member: str) -> Optional[Dict[str, Any]]:
+        """A JSON member (e.g. session_metadata.json, summary.json), or None if absent"""
+        try:
+            return json.loads(self._zip.read(member))
+        except KeyError:
+            return None
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.read_json("session_metadata.json") or {'session_id': self.session_id}
+    
+    def stream_members(self, suffix: str) -> List[str]:
+        """A stream's members in segment order (e.g. suffix 'cell_voltages')"""
+        matches = []
+        for member in self.members():
+            name = Path(member).name
+            stem = _csv_stem(name) or name.rsplit('.', 1)[0]
+            base = stem.rsplit('.', 1)[0] if stem.rsplit('.', 1)[-1].isdigit() else stem
+            if member.startswith("csv_data/") and base.endswith(f"_{suffix}"):
+                matches.append(member)
+        return sorted(matches)
+    
+    def read_stream(self, suffix: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load a stream (all segments) straight from the container
+        
+        Parquet members are stored uncompressed in the ZIP, so pyarrow seeks within them
+        and reads only the requested columns.
+        """
+        members = self.stream_members(suffix)
+        if not members:
+            return None
+        frames = []
+        for member in members:
+            with self._zip.open(member) as f:
+                if member.endswith('.parquet'):
+                    frames.append(pq.read_table(f, columns=columns).to_pandas())
+                else:
+                    compression = 'gzip' if member.endswith('.gz') else 'zstd' if member.endswith('.zst') else None
+                    frames.append(pd.read_csv(f, usecols=columns, compression=compression))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    
+    def extract(self, destination: Path) -> Path:
+        """Restore the session as a folder under destination (streams stay Parquet if converted)"""
+        target = Path(destination) / self.session_id
+        for member in self.members():
+            self._zip.extract(member, target)
+        return target
+
+
+def main():
+    """Command-line archive tools: archive, verify, list and extract"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AWE Test Rig session archive")
+    commands = parser.add_subparsers(dest='command', required=True)
+    archive = commands.add_parser('archive', help='Archive session folders')
+    archive.add_argument('sessions', nargs='+', help='Session folders')
+    archive.add_argument('--to', required=True, help='Archive folder')
+    archive.add_argument('--workers', type=int, default=0, help='Worker processes (0 = CPU count)')
+    archive.add_argument('--keep-csv', action='store_true', help='Do not convert CSV streams to Parquet')
+    verify = commands.add_parser('verify', help='Check containers against their manifests')
+    verify.add_argument('containers', nargs='+')
+    listing = commands.add_parser('list', help='List a container')
+    listing.add_argument('container')
+    extract = commands.add_parser('extract', help='Restore a container as a session folder')
+    extract.add_argument('container')
+    extract.add_argument('destination')
+    args = parser.parse_args()
+    
+    if args.command == 'archive':
+        results = archive_sessions([Path(folder) for folder in args.sessions], Path(args.to), args.workers,
+                                   convert_csv=not args.keep_csv)
+        return 1 if any(result['status'] == 'failed' for result in results) else 0
+    if args.command == 'verify':
+        failed = 0
+        for container in args.containers:
+            problems = verify_container(Path(container))
+            failed += bool(problems)
+            print(f"   {'✅' if not problems else '❌'} {Path(container).name}"
+                  f"{': ' + '; '.join(problems) if problems else ''}")
+        return 1 if failed else 0
+    with ArchivedSession(Path(args.container)) as session:
+        if args.command == 'list':
+            for entry in session.manifest['files']:
+                rows = f" ({entry['rows']} rows)" if 'rows' in entry else ""
+                print(f"   {entry['member']}  {entry['size']} bytes{rows}")
+        else:
+            print(f"✅ Extracted to {session.extract(Path(args.destination))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
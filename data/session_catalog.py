@@ -0,0 +1,451 @@
+"""
+Session catalog for AWE test rig
+SQLite index of session metadata, file manifests and summary statistics for instant listing and search
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# Add parent directory to path for imports when running standalone
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.session_archive import ARCHIVE_EXTENSION, ArchivedSession
+
+# Catalog database inside the sessions folder
+CATALOG_FILE = "catalog.sqlite"
+
+# Bump when the schema changes (older catalogs are rebuilt from the session folders)
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    session_name TEXT,
+    folder_path TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_seconds REAL,
+    status TEXT,
+    operator TEXT,
+    file_count INTEGER,
+    total_bytes INTEGER,
+    metadata TEXT,
+    updated_at TEXT,
+    archive_path TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions (start_time);
+CREATE INDEX IF NOT EXISTS sessions_name ON sessions (session_name);
+CREATE INDEX IF NOT EXISTS sessions_duration ON sessions (duration_seconds);
+CREATE INDEX IF NOT EXISTS sessions_status ON sessions (status, start_time);
+
+CREATE TABLE IF NOT EXISTS files (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    file_type TEXT,
+    path TEXT,
+    size_bytes INTEGER,
+    description TEXT,
+    details TEXT,
+    PRIMARY KEY (session_id, filename)
+);
+
+CREATE TABLE IF NOT EXISTS channel_stats (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    stream TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    count INTEGER,
+    min REAL,
+    max REAL,
+    mean REAL,
+    std REAL,
+    seconds_below REAL,
+    seconds_above REAL,
+    drift_per_hour REAL,
+    percentiles TEXT,
+    PRIMARY KEY (session_id, stream, channel)
+);
+CREATE INDEX IF NOT EXISTS stats_max ON channel_stats (stream, max);
+CREATE INDEX IF NOT EXISTS stats_min ON channel_stats (stream, min);
+CREATE INDEX IF NOT EXISTS stats_channel_max ON channel_stats (channel, max);
+"""
+
+# Statistics that may be used in threshold queries (column names, never user text, go into SQL)
+QUERY_STATS = ('min', 'max', 'mean', 'std', 'seconds_below', 'seconds_above', 'drift_per_hour')
+
+# Comparison operators accepted by find_sessions
+QUERY_OPERATORS = ('>', '>=', '<', '<=')
+
+
+class SessionCatalog:
+    """SQLite catalog of sessions (one connection shared by threads under a lock)
+    
+    Listing and threshold searches are index range scans, so they stay fast however many
+    sessions exist; the session folders remain the source of truth and rebuild() recreates
+    the catalog from them.
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                for table in ('channel_stats', 'files', 'sessions'):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def session_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    # Updates
+    def upsert_session(self, metadata: Dict[str, Any], archive_path: Optional[str] = None):
+        """Insert or update a session and its file manifest from its metadata (archive_path for archived sessions)"""
+        files = metadata.get('files', {})
+        file_rows = []
+        total_bytes = 0
+        for filename, entry in files.items():
+            size = _file_size(entry.get('path'))
+            total_bytes += size or 0
+            details = {key: value for key, value in entry.items()
+                       if key not in ('path', 'type', 'description')}
+            file_rows.append((metadata['session_id'], filename, entry.get('type'), entry.get('path'), size,
+                              entry.get('description'), json.dumps(details)))
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO sessions (session_id, session_name, folder_path, start_time, end_time,
+                                         duration_seconds, status, operator, file_count, total_bytes,
+                                         metadata, updated_at, archive_path)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (session_id) DO UPDATE SET
+                       session_name=excluded.session_name, folder_path=excluded.folder_path,
+                       start_time=excluded.start_time, end_time=excluded.end_time,
+                       duration_seconds=excluded.duration_seconds, status=excluded.status,
+                       operator=excluded.operator, file_count=excluded.file_count,
+                       total_bytes=excluded.total_bytes, metadata=excluded.metadata,
+                       updated_at=excluded.updated_at, archive_path=excluded.archive_path""",
+                (metadata['session_id'], metadata.get('session_name'), metadata.get('folder_path'),
+                 metadata.get('start_time'), metadata.get('end_time'), metadata.get('duration_seconds'),
+                 metadata.get('status'), metadata.get('metadata', {}).get('operator'), len(files), total_bytes,
+                 json.dumps(metadata), datetime.now().isoformat(), archive_path))
+            self._conn.execute("DELETE FROM files WHERE session_id = ?", (metadata['session_id'],))
+            self._conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", file_rows)
+    
+    def upsert_summary(self, session_id: str, summary: Dict[str, Any]):
+        """Replace a session's per-channel statistics with those of a summary.json document"""
+        rows = []
+        for stream, stream_summary in summary.get('streams', {}).items():
+            for channel, stats in stream_summary.get('channels', {}).items():
+                rows.append((session_id, stream, channel, stats.get('count'), stats.get('min'), stats.get('max'),
+                             stats.get('mean'), stats.get('std'), stats.get('seconds_below'),
+                             stats.get('seconds_above'), stats.get('drift_per_hour'),
+                             json.dumps(stats.get('percentiles', {}))))
+        with self._lock, self._conn:
+            # Statistics only attach to cataloged sessions (index_folder adds the session first)
+            if not self._conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone():
+                return
+            self._conn.execute("DELETE FROM channel_stats WHERE session_id = ?", (session_id,))
+            self._conn.executemany("INSERT INTO channel_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    
+    def remove_session(self, session_id: str):
+        """Drop a session (e.g. moved to the archive)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def mark_archived(self, session_id: str, archive_path: Path):
+        """Point a cataloged session at its archive container (its statistics stay queryable)"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if not row:
+                return
+            metadata = {**json.loads(row['metadata']), 'archive_path': str(archive_path)}
+            self._conn.execute("UPDATE sessions SET metadata = ?, archive_path = ?, updated_at = ? WHERE session_id = ?",
+                               (json.dumps(metadata), str(archive_path), datetime.now().isoformat(), session_id))
+    
+    def index_folder(self, session_folder: Path) -> bool:
+        """Catalog one session folder from its session_metadata.json and summary.json"""
+        session_folder = Path(session_folder)
+        metadata = _read_json(session_folder / "session_metadata.json") or {
+            'session_id': session_folder.name,
+            'folder_path': str(session_folder),
+            'status': 'unknown',
+            'start_time': datetime.fromtimestamp(session_folder.stat().st_mtime).isoformat(),
+            'files': {}
+        }
+        
+        # Folders get renamed and copied between machines: the folder, not the stored id/path, identifies it
+        metadata = {**metadata, 'session_id': session_folder.name, 'folder_path': str(session_folder)}
+        self.upsert_session(metadata)
+        summary = _read_json(session_folder / "summary.json")
+        if summary:
+            self.upsert_summary(session_folder.name, summary)
+        return True
+    
+    def index_archive(self, container: Path) -> bool:
+        """Catalog one archived session from the metadata and summary inside its container"""
+        with ArchivedSession(container) as archived:
+            metadata = {**archived.metadata, 'session_id': archived.session_id, 'archive_path': str(container)}
+            summary = archived.read_json("summary.json")
+        self.upsert_session(metadata, archive_path=str(container))
+        if summary:
+            self.upsert_summary(archived.session_id, summary)
+        return True
+    
+    def rebuild(self, sessions_dir: Path) -> int:
+        """Recreate the catalog from every session folder and archive container; returns the number of sessions"""
+        with self._lock, self._conn:
+            for table in ('channel_stats', 'files', 'sessions'):
+                self._conn.execute(f"DELETE FROM {table}")
+        count = 0
+        for session_folder in sorted(Path(sessions_dir).iterdir()):
+            if not session_folder.is_dir() or session_folder.name == "archive":
+                continue
+            try:
+                count += self.index_folder(session_folder)
+            except Exception as e:
+                print(f"⚠️  Could not catalog {session_folder.name}: {e}")
+        
+        archive_dir = Path(sessions_dir) / "archive"
+        for archived in sorted(archive_dir.iterdir()) if archive_dir.is_dir() else []:
+            try:
+                if archived.suffix == ARCHIVE_EXTENSION:
+                    count += self.index_archive(archived)
+                elif archived.is_dir():
+                    # Folder moved into archive/ as it was
+                    count += self.index_folder(archived)
+                    self.mark_archived(archived.name, archived)
+            except Exception as e:
+                print(f"⚠️  Could not catalog archived {archived.name}: {e}")
+        return count
+    
+    # Queries
+    def list_sessions(self, limit: int = 10, status: Optional[str] = None, name: Optional[str] = None,
+                      start_after: Optional[str] = None, start_before: Optional[str] = None,
+                      min_duration: Optional[float] = None, max_duration: Optional[float] = None
+                      ) -> List[Dict[str, Any]]:
+        """
+        Sessions newest first, optionally filtered
+        
+        Args:
+            limit: Maximum number of sessions
+            status: Exact status (running, completed, stopped, error, recovered, ...)
+            name: Session name prefix
+            start_after / start_before: ISO start time bounds (dates like '2025-08-01' work)
+            min_duration / max_duration: Duration bounds in seconds
+        
+        Returns:
+            Session metadata dicts (as stored in session_metadata.json)
+        """
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if name:
+            clauses.append("session_name >= ? AND session_name < ?")
+            params += [name, name + '￿']
+        if start_after:
+            clauses.append("start_time >= ?")
+            params.append(start_after)
+        if start_before:
+            clauses.append("start_time < ?")
+            params.append(start_before)
+        if min_duration is not None:
+            clauses.append("duration_seconds >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            clauses.append("duration_seconds <= ?")
+            params.append(max_duration)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT metadata FROM sessions {where} ORDER BY start_time DESC LIMIT ?",
+                                      params + [limit]).fetchall()
+        return [json.loads(row['metadata']) for row in rows]
+    
+    def session_folders(self, status: str) -> List[Path]:
+        """Folders of the live (not archived) sessions with the given status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT folder_path FROM sessions WHERE status = ? AND archive_path IS NULL "
+                                      "ORDER BY start_time", (status,)).fetchall()
+        return [Path(row['folder_path']) for row in rows if row['folder_path']]
+    
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one session, or None if it is not cataloged"""
+        with self._lock:
+            row = self._conn.execute("SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row['metadata']) if row else None
+    
+    def open_session(self, session_id: str) -> Optional[Union[Path, ArchivedSession]]:
+        """
+        Open a session wherever it lives
+        
+        Returns:
+            The session folder for live sessions, an ArchivedSession (read on demand, not
+            extracted) for archived ones, or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT folder_path, archive_path FROM sessions WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+        if row is None:
+            return None
+        if row['archive_path'] and Path(row['archive_path']).suffix == ARCHIVE_EXTENSION:
+            return ArchivedSession(Path(row['archive_path']))
+        return Path(row['archive_path'] or row['folder_path'])
+    
+    def get_files(self, session_id: str) -> List[Dict[str, Any]]:
+        """File manifest of a session"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM files WHERE session_id = ? ORDER BY filename",
+                                      (session_id,)).fetchall()
+        return [dict(row, details=json.loads(row['details'] or '{}')) for row in rows]
+    
+    def get_stats(self, session_id: str, stream: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-channel statistics of a session"""
+        query = "SELECT * FROM channel_stats WHERE session_id = ?"
+        params = [session_id]
+        if stream:
+            query += " AND stream = ?"
+            params.append(stream)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY stream, channel", params).fetchall()
+        return [dict(row, percentiles=json.loads(row['percentiles'] or '{}')) for row in rows]
+    
+    def find_sessions(self, stream: str, stat: str, operator: str, value: float,
+                      channel: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Sessions where any channel's statistic passes a threshold, e.g. cell max > 2.2 V
+        
+        Args:
+            stream: Stream name (e.g. 'cell_voltages')
+            stat: One of QUERY_STATS
+            operator: One of QUERY_OPERATORS
+            value: Threshold
+            channel: Restrict to one channel
+        
+        Returns:
+            [{'session_id', 'start_time', 'status', 'channels': [(channel, stat value), ...]}], newest first
+        """
+        if stat not in QUERY_STATS or operator not in QUERY_OPERATORS:
+            raise ValueError(f"Unsupported query {stat} {operator} (stats: {QUERY_STATS}, operators: {QUERY_OPERATORS})")
+        query = (f"SELECT c.session_id, c.channel, c.{stat} AS value, s.start_time, s.status "
+                 f"FROM channel_stats c JOIN sessions s USING (session_id) "
+                 f"WHERE c.stream = ? AND c.{stat} {operator} ?")
+        params: List[Any] = [stream, value]
+        if channel:
+            query += " AND c.channel = ?"
+            params.append(channel)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            entry = sessions.setdefault(row['session_id'], {'session_id': row['session_id'],
+                                                            'start_time': row['start_time'],
+                                                            'status': row['status'], 'channels': []})
+            entry['channels'].append((row['channel'], row['value']))
+        return sorted(sessions.values(), key=lambda entry: entry['start_time'] or '', reverse=True)
+
+
+def _file_size(path: Optional[str]) -> Optional[int]:
+    try:
+        return Path(path).stat().st_size if path else None
+    except OSError:
+        return None
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def catalog_summary(session_folder: Path, summary: Dict[str, Any]) -> bool:
+    """
+    Record a session's summary statistics in the catalog of the sessions folder containing it
+    
+    Does nothing if that folder has no catalog yet (SessionManager creates it on start-up).
+    
+    Returns:
+        True if the catalog was updated
+    """
+    session_folder = Path(session_folder)
+    db_path = session_folder.parent / CATALOG_FILE
+    if not db_path.exists():
+        return False
+    catalog = SessionCatalog(db_path)
+    try:
+        if catalog.get_session(session_folder.name) is None:
+            return catalog.index_folder(session_folder)
+        catalog.upsert_summary(session_folder.name, summary)
+        return True
+    finally:
+        catalog.close()
+
+
+def main():
+    """Command-line catalog tools: rebuild, list and threshold search"""
+    import argparse
+    
+    default_dir = Path(__file__).parent / "sessions"
+    parser = argparse.ArgumentParser(description="AWE Test Rig session catalog")
+    parser.add_argument('--sessions-dir', default=str(default_dir), help='Sessions folder (default: data/sessions)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('rebuild', help='Recreate the catalog from the session folders')
+    listing = commands.add_parser('list', help='List sessions newest first')
+    listing.add_argument('--limit', type=int, default=20)
+    listing.add_argument('--status')
+    listing.add_argument('--name', help='Session name prefix')
+    listing.add_argument('--after', help='Start time lower bound (e.g. 2025-08-01)')
+    listing.add_argument('--before', help='Start time upper bound')
+    listing.add_argument('--min-duration', type=float, help='Seconds')
+    search = commands.add_parser('find', help='Sessions where any channel passes a threshold')
+    search.add_argument('stream', help='e.g. cell_voltages')
+    search.add_argument('stat', choices=QUERY_STATS)
+    search.add_argument('operator', choices=QUERY_OPERATORS)
+    search.add_argument('value', type=float)
+    search.add_argument('--channel')
+    args = parser.parse_args()
+    
+    sessions_dir = Path(args.sessions_dir)
+    catalog = SessionCatalog(sessions_dir / CATALOG_FILE)
+    started = time.perf_counter()
+    if args.command == 'rebuild':
+        count = catalog.rebuild(sessions_dir)
+        print(f"✅ Cataloged {count} sessions in {time.perf_counter() - started:.2f} s → {catalog.db_path}")
+    elif args.command == 'list':
+        sessions = catalog.list_sessions(args.limit, args.status, args.name, args.after, args.before,
+                                         args.min_duration)
+        for session in sessions:
+            print(f"   {session.get('start_time', '')[:19]}  {session.get('status', ''):<10} "
+                  f"{session.get('duration_formatted', ''):>9}  {session['session_id']}")
+        print(f"{len(sessions)} sessions ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    else:
+        matches = catalog.find_sessions(args.stream, args.stat, args.operator, args.value, args.channel)
+        for match in matches:
+            worst = sorted(match['channels'], key=lambda channel: channel[1], reverse=args.operator.startswith('>'))
+            shown = ", ".join(f"{channel}={value:g}" for channel, value in worst[:5])
+            more = f" (+{len(worst) - 5})" if len(worst) > 5 else ""
+            print(f"   {match['session_id']}: {shown}{more}")
+        print(f"{len(matches)} sessions ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
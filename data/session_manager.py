@@ -6,9 +6,14 @@ Handles creation of timestamped test session folders and file organization
 import os
 import json
 import datetime
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from core.state import get_global_state
+from data.journal import recover_session
+from data.session_archive import archive_sessions
+from data.session_catalog import CATALOG_FILE, SessionCatalog
+from config.device_config import get_device_config
 from utils.logger import log
 
 
@@ -34,8 +39,19 @@ class SessionManager:
         self.current_session_path = None
         self.session_start_time = None
         
+        # Files are also registered from the logger's writer thread (segment manifest)
+        self._metadata_lock = threading.RLock()
+        
         # Ensure directories exist
         self._ensure_directories()
+        
+        # Index of all sessions (listing and cross-session queries); built from the folders on first use
+        self.catalog = SessionCatalog(self.sessions_dir / CATALOG_FILE)
+        if not self.catalog.session_count():
+            self.rebuild_catalog()
+        
+        # Repair sessions left running by a crash or power loss
+        self.recover_unfinished_sessions()
     
     def _ensure_directories(self):
         """Create necessary directory structure"""
@@ -49,6 +65,47 @@ class SessionManager:
         
         log.success("SessionMgr", "Directory structure ready")
     
+    def recover_unfinished_sessions(self) -> List[Dict[str, Any]]:
+        """
+        Recover sessions whose metadata still says 'running' (no clean end_session)
+        
+        Candidates come from the catalog (every session is cataloged as 'running' when it
+        starts), so only their metadata is opened.
+        
+        Returns:
+            Metadata of each recovered session
+        """
+        recovered = []
+        for session_dir in self.catalog.session_folders('running'):
+            if not session_dir.is_dir():
+                continue
+            try:
+                metadata = recover_session(session_dir)
+            except Exception as e:
+                print(f"⚠️  Error recovering session {session_dir.name}: {e}")
+                continue
+            if metadata:
+                recovered.append(metadata)
+                self._catalog_session(metadata)
+                log.warning("SessionMgr", f"Recovered unfinished session {session_dir.name}", [
+                    f"→ Data kept up to: {metadata['end_time']}",
+                    f"→ Duration: {metadata['duration_formatted']}"
+                ])
+        return recovered
+    
+    def rebuild_catalog(self) -> int:
+        """Recreate the session catalog from the session folders; returns the number of sessions"""
+        count = self.catalog.rebuild(self.sessions_dir)
+        log.info("SessionMgr", f"Session catalog rebuilt: {count} sessions", [f"→ {self.catalog.db_path}"])
+        return count
+    
+    def _catalog_session(self, metadata: Dict[str, Any]):
+        """Mirror session metadata into the catalog (the JSON file stays authoritative)"""
+        try:
+            self.catalog.upsert_session(metadata)
+        except Exception as e:
+            print(f"⚠️  Error updating session catalog: {e}")
+    
     def start_new_session(self, session_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Start a new test session with timestamped folder
@@ -144,14 +201,18 @@ class SessionManager:
         timestamp = self.session_start_time.strftime("%Y-%m-%d_%H-%M-%S")
         return timestamp
     
-    def register_file(self, filename: str, file_type: str, description: str = "") -> str:
+    def register_file(self, filename: str, file_type: str, description: str = "",
+                      details: Optional[Dict[str, Any]] = None) -> str:
         """
         Register a file as part of the current session
         
+        Registering the same filename again updates its entry (e.g. a segment being closed).
+        
         Args:
             filename: Name of the file
             file_type: Type of file (csv, config, log, etc.)
             description: Optional description of the file
+            details: Optional extra fields stored with the entry (e.g. segment manifest info)
             
         Returns:
             Full path to the registered file
@@ -173,15 +234,20 @@ class SessionManager:
         full_path = self.get_file_path(filename, subdir)
         
         # Register in session metadata
-        self.current_session["files"][filename] = {
-            "path": str(full_path),
-            "type": file_type,
-            "description": description,
-            "created": datetime.datetime.now().isoformat()
-        }
-        
-        # Update metadata file
-        self._save_session_metadata()
+        with self._metadata_lock:
+            previous = self.current_session["files"].get(filename, {})
+            entry = {
+                "path": str(full_path),
+                "type": file_type,
+                "description": description,
+                "created": previous.get("created", datetime.datetime.now().isoformat())
+            }
+            if details:
+                entry.update(details)
+            self.current_session["files"][filename] = entry
+            
+            # Update metadata file
+            self._save_session_metadata()
         
         return str(full_path)
     
@@ -272,25 +338,38 @@ class SessionManager:
         metadata_path = self.current_session_path / "session_metadata.json"
         
         try:
-            with open(metadata_path, 'w', encoding='utf-8') as f:
+            with self._metadata_lock, open(metadata_path, 'w', encoding='utf-8') as f:
                 json.dump(self.current_session, f, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"⚠️  Error saving session metadata: {e}")
+        
+        with self._metadata_lock:
+            self._catalog_session(self.current_session)
     
     def get_current_session(self) -> Optional[Dict[str, Any]]:
         """Get current session information"""
         return self.current_session.copy() if self.current_session else None
     
-    def list_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def list_recent_sessions(self, limit: int = 10, **filters) -> List[Dict[str, Any]]:
         """
-        List recent test sessions
+        List recent test sessions (newest first, from the session catalog)
         
         Args:
             limit: Maximum number of sessions to return
+            **filters: Optional SessionCatalog.list_sessions filters (status, name, start_after,
+                       start_before, min_duration, max_duration)
             
         Returns:
             List of session metadata dictionaries
         """
+        try:
+            return self.catalog.list_sessions(limit, **filters)
+        except Exception as e:
+            print(f"⚠️  Error querying session catalog, scanning folders: {e}")
+            return self._scan_recent_sessions(limit)
+    
+    def _scan_recent_sessions(self, limit: int) -> List[Dict[str, Any]]:
+        """List recent sessions by reading every folder's metadata (catalog fallback)"""
         sessions = []
         
         try:
@@ -328,34 +407,48 @@ class SessionManager:
         
         return sessions
     
-    def archive_old_sessions(self, days_old: int = 30) -> int:
+    def archive_old_sessions(self, days_old: Optional[int] = None) -> int:
         """
         Archive sessions older than specified days
         
+        Each session is packed into archive/<session>.zip (CSV streams as compressed Parquet,
+        checksum manifest inside, several sessions in parallel) and its folder is removed only
+        once the container verifies. Archived sessions stay in the catalog and can be opened
+        without extracting (self.catalog.open_session).
+        
         Args:
-            days_old: Move sessions older than this many days to archive
+            days_old: Archive sessions older than this many days (defaults to system.archive.after_days)
             
         Returns:
             Number of sessions archived
         """
-        archived_count = 0
+        config = get_device_config().get_archive_config()
+        days_old = config['after_days'] if days_old is None else days_old
         cutoff_time = datetime.datetime.now() - datetime.timedelta(days=days_old)
+        archive_dir = self.sessions_dir / "archive"
         
         try:
-            archive_dir = self.sessions_dir / "archive"
-            
-            for session_dir in self.sessions_dir.iterdir():
-                if session_dir.is_dir() and session_dir.name != "archive":
-                    # Check if session is old enough
-                    if datetime.datetime.fromtimestamp(session_dir.stat().st_mtime) < cutoff_time:
-                        # Move to archive
-                        archive_path = archive_dir / session_dir.name
-                        session_dir.rename(archive_path)
-                        archived_count += 1
-                        print(f"📦 Archived session: {session_dir.name}")
-        
+            candidates = [session_dir for session_dir in self.sessions_dir.iterdir()
+                          if session_dir.is_dir() and session_dir.name != "archive"
+                          and session_dir != self.current_session_path
+                          and datetime.datetime.fromtimestamp(session_dir.stat().st_mtime) < cutoff_time]
         except Exception as e:
             print(f"⚠️  Error archiving sessions: {e}")
+            return 0
+        if not candidates:
+            return 0
+        
+        results = archive_sessions(candidates, archive_dir, config['workers'], config['convert_csv'],
+                                   config['compression_level'])
+        archived_count = 0
+        for result in results:
+            if result['status'] == 'archived':
+                self.catalog.mark_archived(result['session'], result['container'])
+                archived_count += 1
+                print(f"📦 Archived session: {result['session']} "
+                      f"({result['original_bytes'] / 1e6:.1f} MB → {result['archived_bytes'] / 1e6:.1f} MB)")
+            else:
+                print(f"⚠️  Error archiving session {result['session']}: {result['error']}")
         
         return archived_count
 
@@ -0,0 +1,425 @@
+"""
+Session statistics for AWE test rig
+Per-channel and per-cell summary statistics in one vectorized pass (chunk by chunk), written to summary.json
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports when running standalone
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.storage import find_stream_files, iter_stream_chunks, read_stream_columns
+from config.device_config import get_device_config
+
+# Written into the session folder
+SUMMARY_FILE = "summary.json"
+
+# Streams summarized (file name suffix); native-rate sessions have daq/temperatures instead of sensors
+SUMMARY_STREAMS = ['sensors', 'daq', 'temperatures', 'gas_analysis', 'cell_voltages']
+
+# Stream whose columns are compared cell-to-cell
+CELL_STREAM = 'cell_voltages'
+
+# Columns that are time bases, not measurements
+TIME_COLUMNS = ('timestamp', 'elapsed_seconds', 'timestamp_ns')
+
+
+class StreamStats:
+    """Mergeable statistics for every numeric column of one stream
+    
+    Each update() takes a chunk of rows and folds it into running sums, so a stream of
+    any length is summarized in bounded memory:
+      - count, mean, std (shifted sums), min, max
+      - percentiles from a per-channel histogram whose range doubles when a value falls
+        outside it (bins merge pairwise, so earlier counts stay exact up to bin width)
+      - seconds above/below thresholds (each row holds until the next one)
+      - drift: least-squares slope against elapsed time
+      - optionally, cell-to-cell spread (max - min and std across columns) per time window
+    """
+    
+    def __init__(self, name: str, columns: List[str], thresholds: Optional[Dict[str, Tuple[Any, Any]]] = None,
+                 bins: int = 2048, spread_window: Optional[float] = None):
+        """
+        Args:
+            name: Stream name
+            columns: Numeric columns, in the order of the values passed to update()
+            thresholds: Column -> (low, high); either may be None
+            bins: Histogram bins per channel (percentile resolution is range / bins)
+            spread_window: Seconds per cell-to-cell spread window (None = no spread)
+        """
+        self.name = name
+        self.columns = list(columns)
+        self.bins = bins
+        self.spread_window = spread_window
+        channels = len(self.columns)
+        
+        thresholds = thresholds or {}
+        self.low = np.array([(thresholds.get(column) or (None, None))[0] for column in self.columns], dtype=float)
+        self.high = np.array([(thresholds.get(column) or (None, None))[1] for column in self.columns], dtype=float)
+        
+        self.rows = 0
+        self.count = np.zeros(channels, dtype=np.int64)
+        self.minimum = np.full(channels, np.nan)
+        self.maximum = np.full(channels, np.nan)
+        self.seconds_below = np.zeros(channels)
+        self.seconds_above = np.zeros(channels)
+        
+        # Sums of values shifted by the first finite values (keeps the variance numerically stable)
+        self.shift = np.full(channels, np.nan)
+        self.sum = np.zeros(channels)
+        self.sum_squares = np.zeros(channels)
+        
+        # Regression sums against time since the first row
+        self.start_time = None
+        self.last_time = None
+        self.last_values = None  # Last row so far; its duration is known once the next row arrives
+        self.sum_t = np.zeros(channels)
+        self.sum_tt = np.zeros(channels)
+        self.sum_ty = np.zeros(channels)
+        
+        self.histogram = np.zeros((channels, bins), dtype=np.int64)
+        self.histogram_low = np.full(channels, np.nan)
+        self.histogram_width = np.full(channels, np.nan)
+        
+        # Spread window index -> [sum of ranges, max range, sum of stds, rows]
+        self.spread: Dict[int, List[float]] = {}
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the running sums, histogram and spread windows"""
+        arrays = sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+        return arrays + 4 * 8 * len(self.spread)
+    
+    def update(self, elapsed: np.ndarray, values: np.ndarray):
+        """
+        Fold in a chunk of rows
+        
+        Args:
+            elapsed: Elapsed seconds per row (rows,)
+            values: Measurements (rows, channels), NaN where missing
+        """
+        elapsed = np.asarray(elapsed, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(elapsed):
+            return
+        
+        # Each row holds until the next one: dt[i] is credited to the row before row i
+        # (the previous chunk's last row for the first), so a dropout counts toward the
+        # value last seen before it
+        if self.start_time is None:
+            self.start_time = elapsed[0]
+            held, dt = values[:-1], np.diff(elapsed)
+        else:
+            held, dt = np.vstack([self.last_values[None, :], values[:-1]]), np.diff(elapsed, prepend=self.last_time)
+        self.last_time = elapsed[-1]
+        self.last_values = values[-1].copy()
+        self.rows += len(elapsed)
+        
+        valid = ~np.isnan(values)
+        self.count += valid.sum(axis=0)
+        
+        with np.errstate(invalid='ignore'):
+            chunk_min = np.fmin.reduce(values, axis=0)
+            chunk_max = np.fmax.reduce(values, axis=0)
+        self.minimum = np.fmin(self.minimum, chunk_min)
+        self.maximum = np.fmax(self.maximum, chunk_max)
+        
+        # Shifted moments
+        first = np.isnan(self.shift)
+        self.shift[first] = chunk_min[first]
+        shifted = np.where(valid, values - np.nan_to_num(self.shift)[None, :], 0.0)
+        self.sum += shifted.sum(axis=0)
+        self.sum_squares += (shifted * shifted).sum(axis=0)
+        
+        # Regression sums
+        t = np.where(valid, (elapsed - self.start_time)[:, None], 0.0)
+        self.sum_t += t.sum(axis=0)
+        self.sum_tt += (t * t).sum(axis=0)
+        self.sum_ty += (t * shifted).sum(axis=0)
+        
+        # Time outside thresholds
+        with np.errstate(invalid='ignore'):
+            self.seconds_below += np.where(held < self.low[None, :], dt[:, None], 0.0).sum(axis=0)
+            self.seconds_above += np.where(held > self.high[None, :], dt[:, None], 0.0).sum(axis=0)
+        
+        self._update_histogram(values, valid, chunk_min, chunk_max)
+        if self.spread_window:
+            self._update_spread(elapsed, values, valid)
+    
+    def _update_histogram(self, values: np.ndarray, valid: np.ndarray, chunk_min: np.ndarray,
+                          chunk_max: np.ndarray):
+        # First finite values set each channel's range
+        start = np.isnan(self.histogram_low) & ~np.isnan(chunk_min)
+        if start.any():
+            span = chunk_max[start] - chunk_min[start]
+            self.histogram_low[start] = chunk_min[start]
+            self.histogram_width[start] = np.maximum(span, 1e-9 * np.maximum(np.abs(chunk_min[start]), 1.0)) / self.bins
+        
+        # Channels whose range must grow (rare after the first chunks)
+        with np.errstate(invalid='ignore'):
+            grow = (chunk_min < self.histogram_low) | (chunk_max > self.histogram_low + self.histogram_width * self.bins)
+        for channel in np.flatnonzero(grow):
+            self._grow_range(channel, chunk_min[channel], chunk_max[channel])
+        
+        channels = len(self.columns)
+        with np.errstate(invalid='ignore'):
+            index = np.floor((values - self.histogram_low[None, :]) / self.histogram_width[None, :])
+        index = np.clip(np.nan_to_num(index), 0, self.bins - 1).astype(np.int64)
+        flat = (index + np.arange(channels)[None, :] * self.bins)[valid]
+        self.histogram += np.bincount(flat, minlength=channels * self.bins).reshape(channels, self.bins)
+    
+    def _grow_range(self, channel: int, low: float, high: float):
+        """Double a channel's histogram range until [low, high] fits, merging bins pairwise"""
+        counts = self.histogram[channel]
+        while True:
+            top = self.histogram_low[channel] + self.histogram_width[channel] * self.bins
+            if low >= self.histogram_low[channel] and high <= top:
+                break
+            merged = counts.reshape(-1, 2).sum(axis=1)
+            counts = np.zeros_like(counts)
+            if low < self.histogram_low[channel]:
+                # Grow downwards: old range becomes the upper half
+                counts[self.bins // 2:] = merged
+                self.histogram_low[channel] -= self.histogram_width[channel] * self.bins
+            else:
+                counts[:self.bins // 2] = merged
+            self.histogram_width[channel] *= 2
+        self.histogram[channel] = counts
+    
+    def _update_spread(self, elapsed: np.ndarray, values: np.ndarray, valid: np.ndarray):
+        rows = valid.sum(axis=1) >= 2
+        if not rows.any():
+            return
+        with np.errstate(invalid='ignore'):
+            spread = np.fmax.reduce(values[rows], axis=1) - np.fmin.reduce(values[rows], axis=1)
+            deviation = np.nanstd(values[rows], axis=1)
+        windows, inverse = np.unique(np.floor(elapsed[rows] / self.spread_window).astype(np.int64),
+                                     return_inverse=True)
+        range_sum = np.bincount(inverse, weights=spread)
+        std_sum = np.bincount(inverse, weights=deviation)
+        rows_per_window = np.bincount(inverse)
+        range_max = np.full(len(windows), -np.inf)
+        np.maximum.at(range_max, inverse, spread)
+        
+        for i, window in enumerate(windows.tolist()):
+            entry = self.spread.setdefault(window, [0.0, -np.inf, 0.0, 0])
+            entry[0] += range_sum[i]
+            entry[1] = max(entry[1], range_max[i])
+            entry[2] += std_sum[i]
+            entry[3] += int(rows_per_window[i])
+    
+    def percentiles(self, percentiles: Iterable[float]) -> np.ndarray:
+        """Percentiles per channel from the histogram (channels, len(percentiles)), linear within a bin"""
+        percentiles = np.asarray(list(percentiles), dtype=float)
+        cumulative = np.cumsum(self.histogram, axis=1)
+        result = np.full((len(self.columns), len(percentiles)), np.nan)
+        for channel in np.flatnonzero(self.count):
+            targets = percentiles / 100.0 * cumulative[channel, -1]
+            bins = np.minimum(np.searchsorted(cumulative[channel], targets, side='left'), self.bins - 1)
+            before = np.where(bins > 0, cumulative[channel, bins - 1], 0)
+            inside = np.where(self.histogram[channel, bins] > 0,
+                              (targets - before) / np.maximum(self.histogram[channel, bins], 1), 0.5)
+            values = self.histogram_low[channel] + (bins + inside) * self.histogram_width[channel]
+            result[channel] = np.clip(values, self.minimum[channel], self.maximum[channel])
+        return result
+    
+    def result(self, percentiles: Iterable[float] = (1, 5, 50, 95, 99)) -> Dict[str, Any]:
+        """Summary dict: per-channel statistics plus cell-to-cell spread windows"""
+        percentiles = list(percentiles)
+        count = np.maximum(self.count, 1)
+        mean_shifted = self.sum / count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.maximum(self.sum_squares / count - mean_shifted ** 2, 0.0)
+            denominator = self.count * self.sum_tt - self.sum_t ** 2
+            slope = (self.count * self.sum_ty - self.sum_t * self.sum) / denominator
+        slope = np.where((self.count > 1) & (denominator > 0), slope, np.nan)
+        mean = mean_shifted + np.nan_to_num(self.shift)
+        quantiles = self.percentiles(percentiles)
+        
+        channels = {}
+        for i, column in enumerate(self.columns):
+            if not self.count[i]:
+                channels[column] = {'count': 0}
+                continue
+            channels[column] = {
+                'count': int(self.count[i]),
+                'min': _number(self.minimum[i]),
+                'max': _number(self.maximum[i]),
+                'mean': _number(mean[i]),
+                'std': _number(np.sqrt(variance[i])),
+                'percentiles': {f"p{p:g}": _number(q) for p, q in zip(percentiles, quantiles[i])},
+                'seconds_below': _number(self.seconds_below[i]) if not np.isnan(self.low[i]) else None,
+                'seconds_above': _number(self.seconds_above[i]) if not np.isnan(self.high[i]) else None,
+                'drift_per_hour': _number(slope[i] * 3600.0)
+            }
+        
+        summary = {
+            'rows': int(self.rows),
+            'duration_seconds': _number((self.last_time or 0.0) - (self.start_time or 0.0)),
+            'channels': channels
+        }
+        if self.spread_window:
+            summary['spread'] = {
+                'window_seconds': self.spread_window,
+                'windows': [{'start': window * self.spread_window,
+                             'mean_range': _number(entry[0] / entry[3]),
+                             'max_range': _number(entry[1]),
+                             'mean_std': _number(entry[2] / entry[3])}
+                            for window, entry in sorted(self.spread.items())]
+            }
+        return summary
+
+
+def _number(value: float, digits: int = 6) -> Optional[float]:
+    """JSON-safe float (None for NaN/inf)"""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Measurement columns of a frame (numbers, not time bases or flags)"""
+    return [column for column in df.columns if column not in TIME_COLUMNS
+            and pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+
+
+def _thresholds(stream: str, columns: List[str], config: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """Per-column (low, high): a column entry overrides its stream's entry"""
+    limits = config['thresholds']
+    thresholds = {}
+    for column in columns:
+        entry = limits.get(column, limits.get(stream))
+        if entry:
+            thresholds[column] = (entry.get('low'), entry.get('high'))
+    return thresholds
+
+
+def create_stream_stats(stream: str, columns: List[str], config: Optional[Dict[str, Any]] = None) -> StreamStats:
+    """StreamStats configured from system.stats (thresholds, histogram bins, spread window)"""
+    config = config or get_device_config().get_stats_config()
+    return StreamStats(stream, columns, _thresholds(stream, columns, config), config['histogram_bins'],
+                       config['spread_window_seconds'] if stream == CELL_STREAM else None)
+
+
+def health_summary(streams: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Stack-level highlights from the cell voltage statistics (empty without a cell stream)"""
+    cells = {name: stats for name, stats in streams.get(CELL_STREAM, {}).get('channels', {}).items()
+             if stats.get('count')}
+    if not cells:
+        return {}
+    
+    def extreme(key: str, pick) -> Dict[str, Any]:
+        candidates = [(stats[key], name) for name, stats in cells.items() if stats.get(key) is not None]
+        if not candidates:
+            return {}
+        value, name = pick(candidates)
+        return {'cell': name, 'value': value}
+    
+    spread_windows = streams[CELL_STREAM].get('spread', {}).get('windows', [])
+    max_ranges = [window['max_range'] for window in spread_windows if window['max_range'] is not None]
+    return {
+        'cells': len(cells),
+        'highest_cell': extreme('max', max),
+        'lowest_cell': extreme('min', min),
+        'highest_mean': extreme('mean', max),
+        'lowest_mean': extreme('mean', min),
+        'fastest_drift': extreme('drift_per_hour', lambda candidates: max(candidates, key=lambda c: abs(c[0]))),
+        'cells_above_high': sorted(name for name, stats in cells.items() if stats.get('seconds_above')),
+        'cells_below_low': sorted(name for name, stats in cells.items() if stats.get('seconds_below')),
+        'max_cell_spread': max(max_ranges) if max_ranges else None
+    }
+
+
+def build_summary(session_folder: Path, streams: Dict[str, Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    """summary.json document"""
+    return {
+        'session': Path(session_folder).name,
+        'generated_at': datetime.now().isoformat(),
+        'compute_seconds': round(seconds, 3),
+        'health': health_summary(streams),
+        'streams': streams
+    }
+
+
+def summarize_frames(session_folder: Path, frames: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Summary of streams already in memory (e.g. the post-processor's loaded data)"""
+    started = time.perf_counter()
+    config = get_device_config().get_stats_config()
+    streams = {}
+    for stream, df in frames.items():
+        columns = numeric_columns(df)
+        if 'elapsed_seconds' not in df.columns or not columns:
+            continue
+        stats = create_stream_stats(stream, columns, config)
+        stats.update(df['elapsed_seconds'].to_numpy(), df[columns].to_numpy(dtype=np.float64))
+        streams[stream] = stats.result(config['percentiles'])
+    return build_summary(session_folder, streams, time.perf_counter() - started)
+
+
+def summarize_session(session_folder: Path, chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summary of a session straight from its stream files, chunk by chunk
+    
+    Args:
+        session_folder: Session folder (streams are in its csv_data/ subfolder)
+        chunk_rows: Rows per chunk (defaults to system.post_processing.chunk_rows)
+    """
+    started = time.perf_counter()
+    config = get_device_config().get_stats_config()
+    chunk_rows = chunk_rows or get_device_config().get_post_processing_config()['chunk_rows']
+    streams = {}
+    for stream in SUMMARY_STREAMS:
+        paths = find_stream_files(Path(session_folder) / "csv_data", stream)
+        if not paths or 'elapsed_seconds' not in read_stream_columns(paths[0]):
+            continue
+        stats = None
+        for chunk in iter_stream_chunks(paths, chunk_rows=chunk_rows):
+            if stats is None:
+                columns = numeric_columns(chunk)
+                if not columns:
+                    break
+                stats = create_stream_stats(stream, columns, config)
+            stats.update(chunk['elapsed_seconds'].to_numpy(), chunk[stats.columns].to_numpy(dtype=np.float64))
+        if stats is not None:
+            streams[stream] = stats.result(config['percentiles'])
+    return build_summary(session_folder, streams, time.perf_counter() - started)
+
+
+def write_summary(session_folder: Path, summary: Dict[str, Any]) -> Path:
+    """Write summary.json into the session folder"""
+    path = Path(session_folder) / SUMMARY_FILE
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+
+def main():
+    """Summarize a session from its files and print the stack health highlights"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Write summary.json for a session")
+    parser.add_argument("session_folder", help="Session folder containing csv_data/")
+    parser.add_argument("--chunk-rows", type=int, help="Rows per chunk")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("SESSION STATS")
+    print("=" * 60)
+    
+    summary = summarize_session(Path(args.session_folder), args.chunk_rows)
+    path = write_summary(Path(args.session_folder), summary)
+    for stream, stats in summary['streams'].items():
+        print(f"   {stream}: {stats['rows']} rows, {len(stats['channels'])} channels")
+    print(f"   Health: {json.dumps(summary['health'], indent=2)}")
+    print(f"✅ {path} ({summary['compute_seconds']:.2f} s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,739 @@
+"""
+Session stream storage backends for AWE test rig
+Writes logged streams as CSV or typed columnar files (Parquet/HDF5) and reads any of them back
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from data.journal import JOURNAL_EXTENSION, StreamJournal
+from utils.logger import log
+
+# Optional columnar backends
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# File extension per backend
+BACKEND_EXTENSIONS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'hdf5': '.h5'
+}
+
+# Extra extension per CSV compression
+TEXT_COMPRESSION_EXTENSIONS = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+# Schema dtypes: 'timestamp' is int64 nanoseconds since the Unix epoch in columnar files
+NUMPY_DTYPES = {
+    'timestamp': np.int64,
+    'int64': np.int64,
+    'float32': np.float32,
+    'float64': np.float64,
+    'bool': np.bool_
+}
+
+
+# Rows sampled to pick explicit dtypes for a CSV stream (no schema is embedded in CSV files)
+CSV_SAMPLE_ROWS = 1000
+
+# CSV columns whose dtype is fixed by the logger schema rather than sampled
+CSV_FIXED_DTYPES = {
+    'timestamp': 'str',
+    'timestamp_ns': 'int64'
+}
+
+
+def get_available_backends() -> List[str]:
+    """Get storage backends usable in this environment"""
+    backends = ['csv']
+    if PYARROW_AVAILABLE:
+        backends.append('parquet')
+    if H5PY_AVAILABLE:
+        backends.append('hdf5')
+    return backends
+
+
+def resolve_backend(backend: str) -> str:
+    """Return backend if its library is installed, otherwise fall back to CSV with a warning"""
+    if backend in get_available_backends():
+        return backend
+    
+    if backend not in BACKEND_EXTENSIONS:
+        log.warning("Storage", f"Unknown storage backend '{backend}' - using CSV")
+    else:
+        missing = 'pyarrow' if backend == 'parquet' else 'h5py'
+        log.warning("Storage", f"{backend} backend unavailable ({missing} not installed) - using CSV")
+    return 'csv'
+
+
+def resolve_text_compression(compression: str) -> str:
+    """Return compression if usable for CSV streams, falling back to gzip (zstd missing) or none"""
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        log.warning("Storage", "zstd compression unavailable (zstandard not installed) - using gzip")
+        return 'gzip'
+    if compression not in TEXT_COMPRESSION_EXTENSIONS:
+        log.warning("Storage", f"Unknown CSV compression '{compression}' - writing uncompressed")
+        return 'none'
+    return compression
+
+
+def stream_extension(backend: str, text_compression: str = 'none') -> str:
+    """File extension for a stream file, e.g. '.csv.gz'"""
+    extension = BACKEND_EXTENSIONS[backend]
+    if backend == 'csv':
+        extension += TEXT_COMPRESSION_EXTENSIONS[text_compression]
+    return extension
+
+
+def format_timestamp(timestamp_ns: int) -> str:
+    """Format epoch nanoseconds like the CSV timestamp column (millisecond precision)"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+class CSVStreamWriter:
+    """Text CSV stream (one row per write, values rounded per column), optionally gzip/zstd compressed
+    
+    Rows are formatted into a text buffer and encoded to the file in chunks. For compressed
+    streams every commit() ends the gzip member / zstd frame, so the file is valid up to
+    the last commit even if the process dies right after it.
+    """
+    
+    # Buffered text size that triggers a write to the file
+    DRAIN_CHARS = 65536
+    
+    def __init__(self, path: Path, schema: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                 text_compression: str = 'none'):
+        self.path = Path(path)
+        self.schema = schema
+        self.text_compression = text_compression
+        self.rows_written = 0
+        
+        # Keep the raw handle so bytes_written reports what actually reached the disk
+        self._raw = open(self.path, 'wb')
+        self._stream = self._open_stream()
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow([column['name'] for column in schema])
+        self._drain()
+        
+        # Per-column formatter
+        self._formatters = [self._formatter(column) for column in schema]
+    
+    def _open_stream(self):
+        """Start a gzip member / zstd frame on the raw file (or write the raw file directly)"""
+        if self.text_compression == 'gzip':
+            return gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        if self.text_compression == 'zstd':
+            return zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        return self._raw
+    
+    @staticmethod
+    def _formatter(column: Dict[str, Any]):
+        dtype = column['dtype']
+        if dtype == 'timestamp':
+            return format_timestamp
+        if dtype == 'bool':
+            return (lambda v: bool(v)) if column.get('csv_text') else (lambda v: int(v))
+        if 'decimals' in column:
+            decimals = column['decimals']
+            return lambda v: round(v, decimals)
+        return lambda v: v
+    
+    def write_row(self, row: Sequence[Any]):
+        """Append one row"""
+        self._writer.writerow([fmt(value) for fmt, value in zip(self._formatters, row)])
+        self.rows_written += 1
+        if self._buffer.tell() >= self.DRAIN_CHARS:
+            self._drain()
+    
+    def _drain(self):
+        """Encode buffered text into the (compressed) file stream"""
+        text = self._buffer.getvalue()
+        if text:
+            if self._stream is None:
+                self._stream = self._open_stream()
+            self._stream.write(text.encode('utf-8'))
+            self._buffer.seek(0)
+            self._buffer.truncate()
+    
+    @property
+    def bytes_written(self) -> int:
+        if self._raw.closed:
+            return os.path.getsize(self.path)
+        return self._raw.tell()
+    
+    def flush(self):
+        self._drain()
+        if self._stream is not None:
+            self._stream.flush()
+    
+    def commit(self, fsync: bool = False):
+        """Make written rows visible to readers (and durable with fsync)"""
+        self._drain()
+        if self._stream is not self._raw and self._stream is not None:
+            # End the member/frame so the file decodes completely up to this point
+            # (the next one starts with the next write)
+            self._stream.close()
+            self._stream = None
+        self._raw.flush()
+        if fsync:
+            os.fsync(self._raw.fileno())
+    
+    def close(self):
+        self._drain()
+        if self._stream is not self._raw and self._stream is not None:
+            self._stream.close()
+        self._raw.close()
+
+
+class _ColumnarStreamWriter:
+    """Shared row buffering for columnar writers (rows are written in groups)"""
+    
+    def __init__(self, path: Path, schema: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                 row_group_size: int = 1000, compression: str = "zstd"):
+        self.path = Path(path)
+        self.schema = schema
+        self.metadata = dict(metadata or {})
+        self.metadata['schema'] = schema
+        self.row_group_size = max(int(row_group_size), 1)
+        self.compression = compression
+        self.rows_written = 0
+        self._pending: List[Sequence[Any]] = []
+    
+    def write_row(self, row: Sequence[Any]):
+        """Buffer one row, writing a row group once enough rows are pending"""
+        self._pending.append(row)
+        if len(self._pending) >= self.row_group_size:
+            self.flush()
+    
+    def _columns(self) -> List[np.ndarray]:
+        """Transpose pending rows into typed column arrays"""
+        columns = list(zip(*self._pending))
+        arrays = []
+        for column, values in zip(self.schema, columns):
+            dtype = NUMPY_DTYPES.get(column['dtype'])
+            arrays.append(np.asarray(values, dtype=dtype) if dtype else np.asarray(values, dtype=object))
+        return arrays
+    
+    def flush(self):
+        """Write pending rows as one row group"""
+        if not self._pending:
+            return
+        self._write_group(self._columns())
+        self.rows_written += len(self._pending)
+        self._pending = []
+    
+    def _write_group(self, arrays: List[np.ndarray]):
+        raise NotImplementedError
+    
+    @property
+    def bytes_written(self) -> int:
+        """Bytes on disk (whole row groups only)"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def commit(self, fsync: bool = False):
+        """Columnar files commit whole row groups as they fill (flush() forces a short one)"""
+        pass
+    
+    def close(self):
+        self.flush()
+
+
+class ParquetStreamWriter(_ColumnarStreamWriter):
+    """Parquet stream: one row group per flush, schema/calibration metadata in the file footer"""
+    
+    ARROW_TYPES = {
+        'timestamp': lambda: pa.timestamp('ns'),
+        'int64': pa.int64,
+        'float32': pa.float32,
+        'float64': pa.float64,
+        'bool': pa.bool_,
+        'str': pa.string
+    }
+    
+    def __init__(self, path: Path, schema: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                 row_group_size: int = 1000, compression: str = "zstd"):
+        super().__init__(path, schema, metadata, row_group_size, compression)
+        self._arrow_schema = pa.schema(
+            [pa.field(column['name'], self.ARROW_TYPES[column['dtype']]()) for column in schema],
+            metadata={'awe_metadata': json.dumps(self.metadata, default=str)}
+        )
+        self._writer = pq.ParquetWriter(str(self.path), self._arrow_schema, compression=compression)
+    
+    def _write_group(self, arrays: List[np.ndarray]):
+        table = pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(arrays, self._arrow_schema)],
+            schema=self._arrow_schema
+        )
+        self._writer.write_table(table, row_group_size=len(table))
+    
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+class HDF5StreamWriter(_ColumnarStreamWriter):
+    """HDF5 stream: one chunked, compressed, resizable dataset per column, metadata in attributes"""
+    
+    def __init__(self, path: Path, schema: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                 row_group_size: int = 1000, compression: str = "gzip"):
+        # HDF5 ships gzip everywhere; other filters may be missing on the reading machine
+        super().__init__(path, schema, metadata, row_group_size, 'gzip' if compression != 'lzf' else 'lzf')
+        self._file = h5py.File(str(self.path), 'w')
+        self._file.attrs['awe_metadata'] = json.dumps(self.metadata, default=str)
+        
+        group = self._file.create_group('columns')
+        self._datasets = []
+        for column in schema:
+            dtype = NUMPY_DTYPES.get(column['dtype']) or h5py.string_dtype()
+            self._datasets.append(group.create_dataset(
+                column['name'].replace('/', '_'), shape=(0,), maxshape=(None,), dtype=dtype,
+                chunks=(self.row_group_size,), compression=self.compression
+            ))
+    
+    def _write_group(self, arrays: List[np.ndarray]):
+        start = self._datasets[0].shape[0]
+        end = start + len(arrays[0])
+        for dataset, values in zip(self._datasets, arrays):
+            dataset.resize((end,))
+            dataset[start:end] = values.astype(str).astype(object) if values.dtype == object else values
+    
+    def flush(self):
+        super().flush()
+        self._file.flush()
+    
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class SegmentedStreamWriter:
+    """Stream split into independently readable segment files, rotated by size or age
+    
+    Segments are named {base}.0001{ext}, {base}.0002{ext}, ... and each carries its own
+    header/schema. on_segment(path, info) is called when a segment opens and again when
+    it closes (info has index, rows, first/last timestamp and status) to keep a manifest.
+    
+    With journal=True each commit is also recorded in {base}.journal (data.journal), so
+    data.journal.recover_session() can repair the open segment after a crash. The journal
+    is deleted when the stream closes cleanly.
+    """
+    
+    # Rows between size checks (columnar sizes come from the file system)
+    SIZE_CHECK_ROWS = 100
+    
+    def __init__(self, backend: str, base_path: Path, schema: List[Dict[str, Any]],
+                 metadata: Optional[Dict[str, Any]] = None, text_compression: str = 'none',
+                 rotate_bytes: int = 0, rotate_seconds: float = 0,
+                 on_segment: Optional[Callable[[Path, Dict[str, Any]], None]] = None,
+                 journal: bool = False, **options):
+        self.backend = backend
+        self.base_path = Path(base_path)
+        self.schema = schema
+        self.metadata = metadata
+        self.text_compression = text_compression
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.on_segment = on_segment
+        self.options = options
+        self.extension = stream_extension(backend, text_compression)
+        
+        self.segments: List[Dict[str, Any]] = []
+        self.rows_written = 0
+        self._closed_bytes = 0
+        self._writer = None
+        self._opened = 0.0
+        
+        # Crash journal; columnar segments have no footer until closed, so their rows are journalled too
+        # (the journal holds a second copy of the open segment - segment rotation bounds its size)
+        self._journal = StreamJournal(self.base_path.with_name(self.base_path.name + JOURNAL_EXTENSION)) if journal else None
+        self._journal_rows: List[Sequence[Any]] = []
+        self._open_segment()
+    
+    @property
+    def path(self) -> Path:
+        """Current segment"""
+        return self._writer.path
+    
+    @property
+    def bytes_written(self) -> int:
+        return self._closed_bytes + self._writer.bytes_written
+    
+    def _open_segment(self):
+        index = len(self.segments) + 1
+        path = self.base_path.with_name(f"{self.base_path.name}.{index:04d}{self.extension}")
+        metadata = dict(self.metadata or {}, segment=index)
+        if self.backend == 'csv':
+            self._writer = CSVStreamWriter(path, self.schema, metadata, self.text_compression)
+        else:
+            self._writer = create_stream_writer(self.backend, path, self.schema, metadata, **self.options)
+        self._opened = time.monotonic()
+        
+        if self._journal:
+            # Commit the header first so recovery can always truncate back to it
+            self._writer.commit()
+            self._journal.append('segment', {
+                'index': index, 'path': path.name, 'backend': self.backend,
+                'text_compression': self.text_compression, 'schema': self.schema, 'metadata': metadata,
+                'options': self.options, 'header_bytes': self._writer.bytes_written
+            })
+            self._journal.sync()
+        
+        info = {'index': index, 'rows': 0, 'first_timestamp': None, 'last_timestamp': None, 'status': 'open'}
+        self.segments.append(info)
+        self._notify(path, info)
+    
+    def _close_segment(self):
+        path = self._writer.path
+        self._writer.close()
+        self._closed_bytes += self._writer.bytes_written
+        
+        info = self.segments[-1]
+        info['status'] = 'closed'
+        info['bytes'] = self._writer.bytes_written
+        if self._journal:
+            self._journal_rows = []
+            self._journal.append('closed', self._checkpoint(info))
+            self._journal.sync()
+        self._notify(path, info)
+    
+    def _notify(self, path: Path, info: Dict[str, Any]):
+        if self.on_segment:
+            info = dict(info)
+            for key in ('first_timestamp', 'last_timestamp'):
+                if info[key] is not None:
+                    info[key] = format_timestamp(info[key])
+            try:
+                self.on_segment(path, info)
+            except Exception as e:
+                print(f"⚠️  Segment callback error: {e}")
+    
+    def _rotation_due(self, info: Dict[str, Any]) -> bool:
+        if self.rotate_seconds and time.monotonic() - self._opened >= self.rotate_seconds:
+            return True
+        if self.rotate_bytes and info['rows'] % self.SIZE_CHECK_ROWS == 0:
+            return self._writer.bytes_written >= self.rotate_bytes
+        return False
+    
+    def write_row(self, row: Sequence[Any]):
+        """Append one row, starting a new segment first if the current one is due"""
+        info = self.segments[-1]
+        if info['rows'] and self._rotation_due(info):
+            self._close_segment()
+            self._open_segment()
+            info = self.segments[-1]
+        
+        self._writer.write_row(row)
+        if self._journal and self.backend != 'csv':
+            self._journal_rows.append(row)
+        if info['first_timestamp'] is None:
+            info['first_timestamp'] = row[0]
+        info['last_timestamp'] = row[0]
+        info['rows'] += 1
+        self.rows_written += 1
+    
+    def flush(self):
+        self._writer.flush()
+    
+    def _checkpoint(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        return {'bytes': self._writer.bytes_written, 'rows': info['rows'],
+                'first_timestamp': info['first_timestamp'], 'last_timestamp': info['last_timestamp']}
+    
+    def commit(self, fsync: bool = False):
+        self._writer.commit(fsync)
+        if self._journal:
+            if self.backend == 'csv':
+                self._journal.append('checkpoint', self._checkpoint(self.segments[-1]))
+            elif self._journal_rows:
+                self._journal.append('rows', self._journal_rows)
+                self._journal_rows = []
+            self._journal.sync(fsync)
+    
+    def close(self):
+        self._close_segment()
+        if self._journal:
+            self._journal.close(remove=True)
+
+
+def create_stream_writer(backend: str, path: Path, schema: List[Dict[str, Any]],
+                         metadata: Optional[Dict[str, Any]] = None, **options):
+    """
+    Create a writer for one logged stream
+    
+    Args:
+        backend: 'csv', 'parquet' or 'hdf5' (must be resolved already)
+        path: Output file path (extension should match the backend)
+        schema: Column definitions [{'name', 'dtype', 'decimals'?}, ...]
+        metadata: Schema/calibration/session details embedded in columnar files
+        options: row_group_size and compression for columnar backends
+    """
+    if backend == 'parquet':
+        return ParquetStreamWriter(path, schema, metadata, **options)
+    if backend == 'hdf5':
+        return HDF5StreamWriter(path, schema, metadata, **options)
+    return CSVStreamWriter(path, schema, metadata)
+
+
+def find_stream_files(folder: Path, suffix: str) -> List[Path]:
+    """
+    Find a stream's files by name suffix (e.g. 'sensors') in any supported format
+    
+    Returns:
+        Segments in order for a segmented stream, else a single file (empty if none)
+    """
+    folder = Path(folder)
+    for extension in BACKEND_EXTENSIONS.values():
+        for compression in TEXT_COMPRESSION_EXTENSIONS.values() if extension == '.csv' else ['']:
+            full_extension = extension + compression
+            segments = sorted(folder.glob(f"*_{suffix}.[0-9][0-9][0-9][0-9]{full_extension}"))
+            if segments:
+                return segments
+            for path in sorted(folder.glob(f"*_{suffix}{full_extension}")):
+                return [path]
+    return []
+
+
+def find_stream_file(folder: Path, suffix: str) -> Optional[Path]:
+    """Find a stream file (first segment of a segmented stream) by name suffix"""
+    paths = find_stream_files(folder, suffix)
+    return paths[0] if paths else None
+
+
+def _read_hdf5(path: Path, columns: Optional[List[str]] = None, start: Optional[int] = None,
+               stop: Optional[int] = None) -> pd.DataFrame:
+    """Read rows [start, stop) of an HDF5 stream file"""
+    with h5py.File(str(path), 'r') as f:
+        schema = json.loads(f.attrs['awe_metadata'])['schema']
+        data = {}
+        for column in schema:
+            if columns is not None and column['name'] not in columns:
+                continue
+            values = f['columns'][column['name'].replace('/', '_')][start:stop]
+            if column['dtype'] == 'str':
+                values = values.astype(str)
+            elif column['dtype'] == 'timestamp':
+                values = pd.to_datetime(values, unit='ns')
+            data[column['name']] = values
+    return pd.DataFrame(data)
+
+
+def _hdf5_rows(path: Path) -> int:
+    with h5py.File(str(path), 'r') as f:
+        datasets = list(f['columns'].values())
+        return len(datasets[0]) if datasets else 0
+
+
+# Nanoseconds per hour (local UTC offsets are looked up once per hour of data)
+_HOUR_NS = 3_600_000_000_000
+
+
+def _local_times(timestamps: pd.Series) -> pd.Series:
+    """Zone-less epoch timestamps (UTC) as naive local times, like datetime.fromtimestamp"""
+    timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None) if timestamps.dt.tz else timestamps
+    valid = timestamps.notna().to_numpy()
+    epoch_ns = timestamps.to_numpy('datetime64[ns]').view('int64')
+    
+    # The UTC offset only changes at DST transitions, so one lookup per distinct hour is exact
+    # for whole-hour transitions and vectorizes the rest (a per-row tz_convert is ~100x slower)
+    hours, inverse = np.unique(epoch_ns[valid] // _HOUR_NS, return_inverse=True)
+    offsets = np.array([time.localtime(int(hour) * 3600).tm_gmtoff for hour in hours], dtype=np.int64)
+    local_ns = epoch_ns.copy()
+    local_ns[valid] += offsets[inverse] * 1_000_000_000
+    return pd.Series(local_ns.view('datetime64[ns]'), index=timestamps.index).where(valid)
+
+
+def _text_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnar timestamps as local-time text like the CSV column (format_timestamp)"""
+    if 'timestamp' in df.columns and pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = _local_times(df['timestamp']).dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+    return df
+
+
+def read_stream(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a stream file written by any backend into a DataFrame
+    
+    Columnar timestamps are returned as text like the CSV column so callers see one layout.
+    
+    Args:
+        path: Stream file (.csv, .parquet or .h5)
+        columns: Optional subset of columns to load
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    
+    if suffix == '.parquet':
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required to read Parquet session files")
+        return _text_timestamps(pd.read_parquet(path, columns=columns))
+    if suffix in ('.h5', '.hdf5'):
+        if not H5PY_AVAILABLE:
+            raise RuntimeError("h5py is required to read HDF5 session files")
+        return _text_timestamps(_read_hdf5(path, columns))
+    return read_csv_stream(path, columns)
+
+
+def iter_stream_chunks(paths: Sequence[Path], columns: Optional[List[str]] = None,
+                       chunk_rows: int = 100000) -> Iterator[pd.DataFrame]:
+    """
+    Read a stream's segments in order as DataFrames of at most chunk_rows rows
+    
+    Only one chunk is in memory at a time, whatever the stream's length.
+    
+    Args:
+        paths: Segment files in order (as returned by find_stream_files)
+        columns: Optional subset of columns to load
+        chunk_rows: Maximum rows per chunk
+    """
+    for path in paths:
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix == '.parquet':
+            if not PYARROW_AVAILABLE:
+                raise RuntimeError("pyarrow is required to read Parquet session files")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+                yield _text_timestamps(batch.to_pandas())
+        elif suffix in ('.h5', '.hdf5'):
+            if not H5PY_AVAILABLE:
+                raise RuntimeError("h5py is required to read HDF5 session files")
+            rows = _hdf5_rows(path)
+            for start in range(0, rows, chunk_rows):
+                yield _text_timestamps(_read_hdf5(path, columns, start, min(start + chunk_rows, rows)))
+        else:
+            yield from _iter_csv_chunks(path, columns, chunk_rows)
+
+
+def _iter_csv_chunks(path: Path, columns: Optional[List[str]], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Typed chunked CSV read; resumes with default inference where the file contradicts its sample"""
+    rows_read = 0
+    try:
+        with pd.read_csv(path, usecols=columns, dtype=_csv_dtypes(path, columns), chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                rows_read += len(chunk)
+                yield chunk
+        return
+    except (ValueError, TypeError):
+        pass
+    with pd.read_csv(path, usecols=columns, skiprows=range(1, rows_read + 1), chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            chunk.index += rows_read
+            yield chunk
+
+
+def read_stream_columns(path: Path) -> List[str]:
+    """Column names of a stream file without loading its data"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.parquet':
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required to read Parquet session files")
+        return list(pq.read_schema(path).names)
+    if suffix in ('.h5', '.hdf5'):
+        return [column['name'] for column in read_stream_metadata(path).get('schema', [])]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _csv_dtypes(path: Path, columns: Optional[List[str]]) -> Dict[str, str]:
+    """Explicit dtypes for a CSV stream, from its first rows (numbers are read as float64)"""
+    sample = pd.read_csv(path, usecols=columns, nrows=CSV_SAMPLE_ROWS)
+    dtypes = {}
+    for name, dtype in sample.dtypes.items():
+        if name in CSV_FIXED_DTYPES:
+            dtypes[name] = CSV_FIXED_DTYPES[name]
+        elif pd.api.types.is_bool_dtype(dtype):
+            dtypes[name] = 'bool'
+        elif pd.api.types.is_numeric_dtype(dtype):
+            dtypes[name] = 'float64'
+        else:
+            dtypes[name] = 'str'
+    return dtypes
+
+
+def read_csv_stream(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a (compressed) CSV stream with explicit dtypes, using the pyarrow parser when installed
+    
+    Dtypes come from a short sample so the full parse does no inference; a file that
+    contradicts its sample (e.g. text appearing in a numeric column) is re-read with
+    pandas' default inference.
+    
+    Args:
+        path: .csv, .csv.gz or .csv.zst file (compression is inferred from the name)
+        columns: Optional subset of columns to load
+    """
+    dtypes = _csv_dtypes(path, columns)
+    try:
+        return pd.read_csv(path, usecols=columns, dtype=dtypes, engine='pyarrow' if PYARROW_AVAILABLE else 'c')
+    except (ValueError, TypeError):
+        return pd.read_csv(path, usecols=columns)
+
+
+def read_stream_segments(paths: Sequence[Path], columns: Optional[List[str]] = None,
+                         max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read a stream's segments in parallel and concatenate them in order
+    
+    Threads suffice: decompression and the pandas/pyarrow parsers release the GIL.
+    
+    Args:
+        paths: Segment files in order (as returned by find_stream_files)
+        columns: Optional subset of columns to load
+        max_workers: Reader threads (defaults to one per segment, capped at the CPU count)
+    """
+    paths = list(paths)
+    if len(paths) == 1:
+        return read_stream(paths[0], columns)
+    
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(lambda path: read_stream(path, columns), paths))
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_stream_metadata(path: Path) -> Dict[str, Any]:
+    """Read embedded schema/calibration metadata (empty for CSV files)"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    
+    if suffix == '.parquet' and PYARROW_AVAILABLE:
+        metadata = pq.read_schema(path).metadata or {}
+        raw = metadata.get(b'awe_metadata')
+        return json.loads(raw) if raw else {}
+    if suffix in ('.h5', '.hdf5') and H5PY_AVAILABLE:
+        with h5py.File(str(path), 'r') as f:
+            raw = f.attrs.get('awe_metadata')
+            return json.loads(raw) if raw else {}
+    return {}
@@ -0,0 +1,152 @@
+"""
+Parsed-stream sidecar cache for AWE test rig sessions
+Keeps a binary (Arrow/Feather) copy of each parsed CSV stream so re-plotting a session skips CSV parsing
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import pandas as pd
+from data.storage import PYARROW_AVAILABLE, find_stream_files, read_stream_columns, read_stream_segments
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+# Cache location inside a session folder (next to csv_data/)
+CACHE_SUBFOLDER = Path("cache") / "streams"
+CACHE_EXTENSION = '.feather'
+
+# Bytes hashed from each end of a source file (with size and mtime this catches edits in place
+# without reading whole multi-GB files)
+HASH_WINDOW = 1 << 16
+
+# Columns never cached or loaded (the text timestamp duplicates elapsed_seconds for analysis)
+SKIPPED_COLUMNS = ('timestamp',)
+
+
+def source_fingerprint(path: Path) -> Dict[str, Any]:
+    """Size, mtime and head/tail hash identifying one source file's contents"""
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(HASH_WINDOW))
+        if stat.st_size > HASH_WINDOW:
+            f.seek(max(stat.st_size - HASH_WINDOW, HASH_WINDOW))
+            digest.update(f.read(HASH_WINDOW))
+    return {'name': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def _cache_key(paths: Sequence[Path]) -> str:
+    return json.dumps([source_fingerprint(path) for path in paths], sort_keys=True)
+
+
+def _read_cache(cache_path: Path, key: str, columns: Optional[List[str]]) -> Optional[pd.DataFrame]:
+    """Cached frame if the sidecar exists and was built from the same sources, else None"""
+    if not cache_path.exists():
+        return None
+    try:
+        table = feather.read_table(cache_path, memory_map=True)
+        if (table.schema.metadata or {}).get(b'awe_sources', b'').decode() != key:
+            return None
+        if columns is not None:
+            table = table.select([column for column in columns if column in table.column_names])
+        return table.to_pandas()
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable stream cache {cache_path.name}: {e}")
+        return None
+
+
+def _write_cache(cache_path: Path, key: str, df: pd.DataFrame):
+    """Write the sidecar atomically (a crash never leaves a half-written cache behind)"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'awe_sources': key.encode()})
+        temp_path = cache_path.with_suffix(cache_path.suffix + '.tmp')
+        feather.write_feather(table, temp_path, compression='uncompressed')
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        print(f"⚠️  Could not write stream cache {cache_path.name}: {e}")
+
+
+def load_stream(session_folder: Path, suffix: str, columns: Optional[List[str]] = None,
+                use_cache: bool = True) -> Optional[pd.DataFrame]:
+    """
+    Load a session stream (all segments), from its sidecar cache when the sources are unchanged
+    
+    CSV streams are parsed once with explicit dtypes (data.storage.read_csv_stream) and
+    cached under cache/streams/; Parquet/HDF5 streams are already typed binary files and
+    are read directly. The text timestamp column is not loaded.
+    
+    Args:
+        session_folder: Session folder (streams are in its csv_data/ subfolder)
+        suffix: Stream name suffix, e.g. 'cell_voltages'
+        columns: Optional subset of columns
+        use_cache: Read/write the sidecar (requires pyarrow)
+    
+    Returns:
+        DataFrame, or None if the session has no such stream
+    """
+    session_folder = Path(session_folder)
+    paths = find_stream_files(session_folder / "csv_data", suffix)
+    if not paths:
+        return None
+    
+    wanted = [column for column in (columns or read_stream_columns(paths[0])) if column not in SKIPPED_COLUMNS]
+    is_csv = '.csv' in paths[0].suffixes
+    if not (use_cache and is_csv and PYARROW_AVAILABLE):
+        return read_stream_segments(paths, wanted)
+    
+    cache_path = session_folder / CACHE_SUBFOLDER / f"{suffix}{CACHE_EXTENSION}"
+    key = _cache_key(paths)
+    df = _read_cache(cache_path, key, wanted)
+    if df is not None:
+        return df
+    
+    # Cache every column (except the skipped ones) so any later subset is a cache hit
+    all_columns = [column for column in read_stream_columns(paths[0]) if column not in SKIPPED_COLUMNS]
+    df = read_stream_segments(paths, all_columns)
+    _write_cache(cache_path, key, df)
+    return df[[column for column in wanted if column in df.columns]]
+
+
+def clear_stream_cache(session_folder: Path) -> int:
+    """Delete a session's stream sidecars, returning how many were removed"""
+    removed = 0
+    for path in (Path(session_folder) / CACHE_SUBFOLDER).glob(f"*{CACHE_EXTENSION}"):
+        path.unlink()
+        removed += 1
+    return removed
+
+
+def main():
+    """Load every stream of a session cold (parse + cache) and warm (cache hit)"""
+    import argparse
+    import time
+    
+    parser = argparse.ArgumentParser(description="Time cold vs cached stream loading for a session")
+    parser.add_argument("session_folder", help="Session folder containing csv_data/")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("STREAM CACHE TEST: Cold vs cached load")
+    print("=" * 60)
+    
+    clear_stream_cache(args.session_folder)
+    for suffix in ('sensors', 'gas_analysis', 'cell_voltages', 'daq', 'temperatures'):
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            df = load_stream(args.session_folder, suffix)
+            timings.append(time.perf_counter() - started)
+        if df is not None:
+            print(f"   {suffix}: {len(df)} rows, cold {timings[0] * 1000:.1f} ms, cached {timings[1] * 1000:.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Shared asyncio acquisition runtime for AWE test rig
+Hosts every polling loop as a coroutine on one event loop thread instead of a thread per service
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from core.timer import get_scheduler
+from utils.logger import log
+
+
+class AcquisitionRuntime:
+    """Single event loop running periodic acquisition tasks on the shared deadline scheduler
+    
+    Blocking vendor calls (nidaqmx, TC-08 DLL, serial) run on a bounded executor so they never
+    stall the loop. All tasks are children of one root coroutine; stop() cancels the whole tree.
+    """
+    
+    def __init__(self, executor_workers: int = 4):
+        self.executor_workers = max(int(executor_workers), 1)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+        
+        self._thread = None
+        self._executor = None
+        self._shutdown = None
+        self._ready = threading.Event()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        
+        # Per-task scheduling statistics
+        self.stats: Dict[str, Dict[str, Any]] = {}
+    
+    def start(self) -> bool:
+        """Start the event loop thread"""
+        if self.running:
+            return True
+        
+        self._ready.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="acq_io")
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="acquisition_runtime")
+        self._thread.start()
+        
+        if not self._ready.wait(timeout=5.0):
+            log.error("Runtime", "Event loop failed to start")
+            return False
+        
+        self.running = True
+        log.success("Runtime", f"Acquisition runtime started ({self.executor_workers} executor workers)")
+        return True
+    
+    def stop(self, timeout: float = 5.0):
+        """Cancel every task, wait for in-flight blocking calls and stop the loop"""
+        if not self.running:
+            return
+        
+        self.loop.call_soon_threadsafe(self._shutdown.set)
+        self._thread.join(timeout=timeout)
+        self._executor.shutdown(wait=True)
+        
+        self.running = False
+        self.loop = None
+        log.info("Runtime", "Acquisition runtime stopped")
+    
+    def _run_loop(self):
+        """Event loop thread body"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self._executor)
+        try:
+            self.loop.run_until_complete(self._root())
+        finally:
+            self.loop.close()
+    
+    async def _root(self):
+        """Root of the cancellation tree - owns every periodic task"""
+        self._shutdown = asyncio.Event()
+        self._ready.set()
+        await self._shutdown.wait()
+        
+        children = list(self._tasks.values())
+        for task in children:
+            task.cancel()
+        await asyncio.gather(*children, return_exceptions=True)
+        for name in self._tasks:
+            self.stats[name]['status'] = 'stopped'
+        self._tasks.clear()
+    
+    def _in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+    
+    def add_task(self, name: str, func: Callable, rate: float, blocking: bool = True,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 phase: float = 0.0, align_to: Optional[str] = None) -> bool:
+        """
+        Schedule func to run periodically (thread-safe)
+        
+        Args:
+            name: Unique task name (replaces an existing task with the same name)
+            func: Coroutine function, or plain callable (run on the executor if blocking)
+            rate: Runs per second
+            blocking: Run a plain callable on the executor instead of the loop thread
+            on_error: Called with the exception when func raises (the task then ends)
+            phase: Offset in seconds from the shared deadline grid
+            align_to: Scheduler task whose phase this task follows
+        
+        Returns:
+            True if the task was scheduled
+        """
+        if not self.running or rate <= 0:
+            return False
+        
+        deadline = get_scheduler().create_task(name, rate, phase=phase, align_to=align_to)
+        coro = self._add(name, func, deadline, blocking, on_error)
+        if self._in_loop_thread():
+            self.loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+        return True
+    
+    def remove_task(self, name: str, timeout: float = 5.0):
+        """Cancel a task and wait for its in-flight call to finish (thread-safe)"""
+        if not self.running or name not in self._tasks:
+            return
+        
+        if self._in_loop_thread():
+            self._tasks.pop(name).cancel()
+            return
+        
+        try:
+            asyncio.run_coroutine_threadsafe(self._remove(name), self.loop).result(timeout=timeout)
+        except Exception as e:
+            log.warning("Runtime", f"Task {name} did not stop cleanly: {e}")
+    
+    async def _add(self, name: str, func: Callable, deadline, blocking: bool, on_error):
+        await self._remove(name)
+        self.stats[name] = {
+            'runs': 0,
+            'max_duration': 0.0,
+            'last_error': None,
+            'status': 'running',
+            'deadline': deadline
+        }
+        self._tasks[name] = self.loop.create_task(self._periodic(name, func, deadline, blocking, on_error))
+    
+    async def _remove(self, name: str):
+        task = self._tasks.pop(name, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            self.stats[name]['status'] = 'stopped'
+    
+    async def _call(self, func: Callable, blocking: bool):
+        """Run one iteration, letting a cancelled executor call finish before returning"""
+        if asyncio.iscoroutinefunction(func):
+            return await func()
+        if not blocking:
+            return func()
+        
+        future = self.loop.run_in_executor(self._executor, func)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The hardware call cannot be interrupted - wait so the device is idle before teardown
+            await asyncio.wait({future})
+            raise
+    
+    async def _periodic(self, name: str, func: Callable, deadline, blocking: bool, on_error):
+        """Run func on the scheduler's absolute deadlines"""
+        stats = self.stats[name]
+        
+        while True:
+            started = time.perf_counter()
+            try:
+                await self._call(func, blocking)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Leave the task dead - the supervisor sees the stale heartbeat and reconnects
+                stats['last_error'] = str(e)
+                stats['status'] = 'failed'
+                log.error("Runtime", f"Task {name} failed: {e}")
+                if on_error:
+                    on_error(e)
+                return
+            
+            stats['runs'] += 1
+            stats['max_duration'] = max(stats['max_duration'], time.perf_counter() - started)
+            
+            await asyncio.sleep(deadline.tick())
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-task run statistics merged with their deadline statistics"""
+        stats = {}
+        for name, entry in self.stats.items():
+            stats[name] = {key: value for key, value in entry.items() if key != 'deadline'}
+            stats[name].update(entry['deadline'].get_stats())
+        return stats
+
+
+def main():
+    """Run two tasks on the runtime and report their achieved rates"""
+    print("=" * 60)
+    print("ACQUISITION RUNTIME TEST: Deadline scheduling on one loop")
+    print("=" * 60)
+    
+    runtime = AcquisitionRuntime(executor_workers=2)
+    runtime.start()
+    
+    runtime.add_task("fast", lambda: None, 100.0, blocking=False)
+    runtime.add_task("blocking", lambda: time.sleep(0.02), 10.0)
+    time.sleep(2.0)
+    
+    runtime.remove_task("blocking")
+    runtime.stop()
+    
+    for name, entry in runtime.get_stats().items():
+        print(f"   {name}: {entry['runs']} runs in 2s ({entry['measured_rate']:.1f}/{entry['rate']:g} Hz, "
+              f"overruns {entry['overruns']}, status {entry['status']})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
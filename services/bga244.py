@@ -6,13 +6,22 @@ Real hardware integration with 3 BGA244 units for gas concentration monitoring
 import serial
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 
 from core.state import get_global_state
+from core.timer import get_scheduler
 from config.device_config import get_device_config
 from utils.logger import log
 
 
+def gas_sample_values(enhanced_readings: List[Dict[str, Any]], purge_mode: bool) -> List[Any]:
+    """Gas analysis sample in logged column order: primary gas % per unit, primary gas per unit, purge"""
+    return ([reading['primary_gas_concentration'] for reading in enhanced_readings]
+            + [reading['primary_gas'] for reading in enhanced_readings]
+            + [purge_mode])
+
+
 class BGA244Device:
     """Individual BGA244 Gas Analyzer Interface"""
     
@@ -166,6 +175,10 @@ class BGA244Service:
         self.devices = {}
         self.purge_mode = False
         
+        # Heartbeat for the service supervisor
+        self.last_sample_time = None  # time.monotonic() of last successful poll
+        self.last_error = None
+        
         # Individual connection status for dashboard
         self.individual_connections = {
             'bga_1': False,
@@ -186,26 +199,16 @@ class BGA244Service:
             for unit_id in self.individual_connections:
                 self.individual_connections[unit_id] = False
             
-            # Connect each BGA to its configured port
-            for unit_id, unit_config in self.bga_config.get('units', {}).items():
-                port = unit_config.get('port')
-                if not port:
-                    log.error("BGA244", f"No port configured for {unit_config['name']}")
-                    continue
-                
-                device = BGA244Device(port, unit_id, unit_config)
-                if device.connect():
-                    gas_config = self.device_config.get_bga_gas_config(unit_id, self.purge_mode)
-                    if device.configure_gases(gas_config):
-                        self.devices[unit_id] = device
-                        self.individual_connections[unit_id] = True
-                        connected_count += 1
-                        log.success("BGA244", f"{unit_config['name']} connected to {port}")
-                    else:
-                        device.disconnect()
-                        log.error("BGA244", f"Gas configuration failed for {unit_config['name']}")
-                else:
-                    log.error("BGA244", f"{unit_config['name']} failed to connect to {port}")
+            # Connect each BGA to its configured port (concurrently - each unit blocks on serial I/O)
+            units = self.bga_config.get('units', {})
+            with ThreadPoolExecutor(max_workers=max(len(units), 1), thread_name_prefix="bga_connect") as executor:
+                results = list(executor.map(lambda item: self._connect_unit(*item), units.items()))
+            
+            for unit_id, device in results:
+                if device:
+                    self.devices[unit_id] = device
+                    self.individual_connections[unit_id] = True
+                    connected_count += 1
             
             # Update connection status
             if connected_count > 0:
@@ -224,6 +227,26 @@ class BGA244Service:
             self.state.update_connection_status('bga244', False)
             return False
     
+    def _connect_unit(self, unit_id: str, unit_config: dict):
+        """Connect and configure a single BGA unit, returning (unit_id, device or None)"""
+        port = unit_config.get('port')
+        if not port:
+            log.error("BGA244", f"No port configured for {unit_config['name']}")
+            return unit_id, None
+        
+        device = BGA244Device(port, unit_id, unit_config)
+        if device.connect():
+            gas_config = self.device_config.get_bga_gas_config(unit_id, self.purge_mode)
+            if device.configure_gases(gas_config):
+                log.success("BGA244", f"{unit_config['name']} connected to {port}")
+                return unit_id, device
+            else:
+                device.disconnect()
+                log.error("BGA244", f"Gas configuration failed for {unit_config['name']}")
+        else:
+            log.error("BGA244", f"{unit_config['name']} failed to connect to {port}")
+        return unit_id, None
+    
     def disconnect(self):
         """Disconnect from BGA244 analyzers"""
         log.info("BGA244", "Disconnecting from BGA244 analyzers")
@@ -244,8 +267,8 @@ class BGA244Service:
         
         log.success("BGA244", "BGA244 analyzers disconnected")
     
-    def start_polling(self) -> bool:
-        """Start polling gas analysis data"""
+    def start_polling(self, threaded: bool = True) -> bool:
+        """Start polling gas analysis data (threaded=False leaves poll_once() to an external scheduler)"""
         if self.polling:
             log.warning("BGA244", "BGA244 polling already running")
             return True
@@ -254,8 +277,10 @@ class BGA244Service:
             return False
         
         self.polling = True
-        self.poll_thread = threading.Thread(target=self._poll_data, daemon=True)
-        self.poll_thread.start()
+        self.last_sample_time = time.monotonic()
+        if threaded:
+            self.poll_thread = threading.Thread(target=self._poll_data, daemon=True)
+            self.poll_thread.start()
         
         log.success("BGA244", f"BGA244 polling started at {self.sample_rate} Hz")
         return True
@@ -291,68 +316,76 @@ class BGA244Service:
     
     def _poll_data(self):
         """Polling thread function"""
+        deadline = get_scheduler().create_task('bga244', self.sample_rate)
         while self.polling and self.connected:
             try:
-                # Initialize data structures
-                legacy_readings = []
-                enhanced_readings = []
+                self.poll_once()
                 
-                # Read from each BGA unit
-                for unit_id in ['bga_1', 'bga_2', 'bga_3']:
-                    if unit_id in self.devices:
-                        device = self.devices[unit_id]
-                        measurements = device.read_measurements()
-                        
-                        if measurements:
-                            # Get gas configuration
-                            gas_config = self.device_config.get_bga_gas_config(unit_id, self.purge_mode)
-                            
-                            # Build enhanced format
-                            enhanced_data = {
-                                'primary_gas': gas_config['primary_gas'],
-                                'secondary_gas': gas_config['secondary_gas'],
-                                'remaining_gas': gas_config['remaining_gas'],
-                                'primary_gas_concentration': measurements.get('primary', 0.0),
-                                'secondary_gas_concentration': measurements.get('secondary', 0.0),
-                                'remaining_gas_concentration': measurements.get('remaining', 0.0)
-                            }
-                            
-                            # Build legacy format
-                            legacy_data = {'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0}
-                            legacy_data[gas_config['primary_gas']] = measurements.get('primary', 0.0)
-                            legacy_data[gas_config['secondary_gas']] = measurements.get('secondary', 0.0)
-                            legacy_data[gas_config['remaining_gas']] = measurements.get('remaining', 0.0)
-                            
-                            enhanced_readings.append(enhanced_data)
-                            legacy_readings.append(legacy_data)
-                        else:
-                            # No data - add zeros
-                            enhanced_readings.append({
-                                'primary_gas': 'H2', 'secondary_gas': 'O2', 'remaining_gas': 'N2',
-                                'primary_gas_concentration': 0.0, 'secondary_gas_concentration': 0.0, 
-                                'remaining_gas_concentration': 0.0
-                            })
-                            legacy_readings.append({'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0})
-                    else:
-                        # Device not connected - add zeros
-                        enhanced_readings.append({
-                            'primary_gas': 'H2', 'secondary_gas': 'O2', 'remaining_gas': 'N2',
-                            'primary_gas_concentration': 0.0, 'secondary_gas_concentration': 0.0, 
-                            'remaining_gas_concentration': 0.0
-                        })
-                        legacy_readings.append({'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0})
-                
-                # Update state with both formats
-                self.state.update_sensor_values(gas_concentrations=legacy_readings)
-                self.state.enhanced_gas_data = enhanced_readings
-                
-                # Sleep for sample rate
-                time.sleep(1.0 / self.sample_rate)
+                # Sleep until the next absolute deadline
+                deadline.wait()
                 
             except Exception as e:
                 log.error("BGA244", f"BGA244 polling error: {e}")
+                self.last_error = str(e)
                 break
     
+    def poll_once(self):
+        """Read every connected BGA unit once and publish the results to state"""
+        # Initialize data structures
+        legacy_readings = []
+        enhanced_readings = []
+        
+        # Read from each BGA unit
+        for unit_id in ['bga_1', 'bga_2', 'bga_3']:
+            if unit_id in self.devices:
+                device = self.devices[unit_id]
+                measurements = device.read_measurements()
+                
+                if measurements:
+                    # Get gas configuration
+                    gas_config = self.device_config.get_bga_gas_config(unit_id, self.purge_mode)
+                    
+                    # Build enhanced format
+                    enhanced_data = {
+                        'primary_gas': gas_config['primary_gas'],
+                        'secondary_gas': gas_config['secondary_gas'],
+                        'remaining_gas': gas_config['remaining_gas'],
+                        'primary_gas_concentration': measurements.get('primary', 0.0),
+                        'secondary_gas_concentration': measurements.get('secondary', 0.0),
+                        'remaining_gas_concentration': measurements.get('remaining', 0.0)
+                    }
+                    
+                    # Build legacy format
+                    legacy_data = {'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0}
+                    legacy_data[gas_config['primary_gas']] = measurements.get('primary', 0.0)
+                    legacy_data[gas_config['secondary_gas']] = measurements.get('secondary', 0.0)
+                    legacy_data[gas_config['remaining_gas']] = measurements.get('remaining', 0.0)
+                    
+                    enhanced_readings.append(enhanced_data)
+                    legacy_readings.append(legacy_data)
+                else:
+                    # No data - add zeros
+                    enhanced_readings.append({
+                        'primary_gas': 'H2', 'secondary_gas': 'O2', 'remaining_gas': 'N2',
+                        'primary_gas_concentration': 0.0, 'secondary_gas_concentration': 0.0, 
+                        'remaining_gas_concentration': 0.0
+                    })
+                    legacy_readings.append({'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0})
+            else:
+                # Device not connected - add zeros
+                enhanced_readings.append({
+                    'primary_gas': 'H2', 'secondary_gas': 'O2', 'remaining_gas': 'N2',
+                    'primary_gas_concentration': 0.0, 'secondary_gas_concentration': 0.0, 
+                    'remaining_gas_concentration': 0.0
+                })
+                legacy_readings.append({'H2': 0.0, 'O2': 0.0, 'N2': 0.0, 'other': 0.0})
+        
+        # Update state with both formats
+        self.state.update_sensor_values(gas_concentrations=legacy_readings)
+        self.state.enhanced_gas_data = enhanced_readings
+        self.state.publish_samples('bga244', [(time.time_ns(), gas_sample_values(enhanced_readings, self.purge_mode))])
+        self.last_sample_time = time.monotonic()
+    
     def get_individual_connection_status(self) -> Dict[str, bool]:
         """Get individual connection status for each BGA unit"""
         return self.individual_connections.copy()
\ No newline at end of file
@@ -5,18 +5,177 @@ Controller manager for coordinating all hardware services and test sessions
 
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Optional, Dict, Any
 from core.state import get_global_state
-from core.timer import get_timer
+from core.timer import get_timer, get_scheduler
 from data.session_manager import get_session_manager, start_test_session, end_test_session
 from data.logger import get_csv_logger
+from config.device_config import get_device_config
 from .ni_daq import NIDAQService
 from .pico_tc08 import PicoTC08Service
 from .bga244 import BGA244Service
 from .cvm24p import CVM24PService
+from .acquisition_runtime import AcquisitionRuntime
+from .process_acquisition import ProcessAcquisition
 from utils.logger import log
 
 
+class ServiceSupervisor:
+    """Watches polling heartbeats and hot-reconnects stalled services with backoff"""
+    
+    def __init__(self, manager: 'ControllerManager', config: Dict[str, Any]):
+        self.manager = manager
+        self.state = manager.state
+        self.config = config
+        
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._reconnect_threads: Dict[str, threading.Thread] = {}
+        
+        # Per-service health record
+        self.health: Dict[str, Dict[str, Any]] = {
+            name: {
+                'status': 'unknown',  # ok, idle, stalled, reconnecting, down
+                'last_sample_age': None,
+                'expected_period': None,
+                'stalls': 0,
+                'reconnect_attempts': 0,
+                'next_attempt': 0.0,
+                'last_error': None
+            }
+            for name in manager.services
+        }
+    
+    def start(self):
+        """Start the supervisor thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._supervise_loop, daemon=True, name="supervisor")
+        self._thread.start()
+        log.info("Supervisor", f"Watching {len(self.health)} services", [
+            f"→ Stall after {self.config['stall_periods']:g} expected periods (min {self.config['min_stall_seconds']:g}s)",
+            f"→ Reconnect backoff {self.config['backoff_initial']:g}s → {self.config['backoff_max']:g}s"
+        ])
+    
+    def stop(self):
+        """Stop the supervisor and wait for in-flight reconnects"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        for thread in list(self._reconnect_threads.values()):
+            thread.join(timeout=5.0)
+        self._reconnect_threads.clear()
+    
+    def _supervise_loop(self):
+        """Background thread checking every service at a fixed interval"""
+        while not self._stop_event.wait(self.config['check_interval']):
+            try:
+                self.check_services()
+            except Exception as e:
+                log.error("Supervisor", f"Supervisor check failed: {e}")
+    
+    def check_services(self, now: Optional[float] = None):
+        """Run one health check pass over all services"""
+        now = time.monotonic() if now is None else now
+        
+        for name, info in self.manager.services.items():
+            record = self.health[name]
+            
+            if record['status'] == 'reconnecting':
+                continue
+            
+            service = info['service']
+            if not info['connected'] or service is None:
+                # Never came up (degraded start) or torn down after a stall
+                record['status'] = 'down'
+                self.state.set_device_stale(name, True)
+                self._maybe_reconnect(name, now)
+                continue
+            
+            if not service.polling:
+                # Connected without a polling loop (e.g. BGA244 with no analyzers found)
+                record['status'] = 'idle'
+                continue
+            
+            period = 1.0 / max(float(getattr(service, 'sample_rate', 1.0)), 1e-6)
+            stall_after = max(period * self.config['stall_periods'], self.config['min_stall_seconds'])
+            last_sample = getattr(service, 'last_sample_time', None)
+            age = (now - last_sample) if last_sample is not None else None
+            thread = (getattr(service, 'polling_thread', None) or getattr(service, 'poll_thread', None)
+                      or getattr(service, 'process', None))
+            thread_dead = thread is not None and not thread.is_alive()
+            
+            record['expected_period'] = period
+            record['last_sample_age'] = age
+            
+            if thread_dead or (age is not None and age > stall_after):
+                if record['status'] != 'stalled':
+                    record['stalls'] += 1
+                    record['status'] = 'stalled'
+                    record['last_error'] = getattr(service, 'last_error', None) or (
+                        "polling thread exited" if thread_dead else f"no sample for {age:.1f}s")
+                    self.state.set_device_stale(name, True)
+                    log.warning("Supervisor", f"{name} stalled - {record['last_error']}", [
+                        f"→ Expected period: {period:.2f}s",
+                        "→ Values marked stale, reconnecting this service only"
+                    ])
+                self._maybe_reconnect(name, now)
+            else:
+                if record['status'] != 'ok':
+                    self.state.set_device_stale(name, False)
+                record['status'] = 'ok'
+                record['reconnect_attempts'] = 0
+    
+    def _maybe_reconnect(self, name: str, now: float):
+        """Launch a reconnect for one service once its backoff delay has passed"""
+        record = self.health[name]
+        if now < record['next_attempt']:
+            return
+        
+        record['status'] = 'reconnecting'
+        record['reconnect_attempts'] += 1
+        delay = min(self.config['backoff_initial'] * (2 ** (record['reconnect_attempts'] - 1)),
+                    self.config['backoff_max'])
+        record['next_attempt'] = now + delay
+        
+        thread = threading.Thread(target=self._reconnect, args=(name,), daemon=True, name=f"reconnect_{name}")
+        self._reconnect_threads[name] = thread
+        thread.start()
+    
+    def _reconnect(self, name: str):
+        """Stop and restart a single service (other services and the test keep running)"""
+        record = self.health[name]
+        try:
+            if self.manager.services[name]['connected']:
+                self.manager._service_stoppers[name]()
+            
+            if self._stop_event.is_set():
+                return
+            
+            if self.manager._service_starters[name]({}):
+                log.success("Supervisor", f"{name} reconnected (attempt {record['reconnect_attempts']})")
+                record['status'] = 'ok'
+                record['last_error'] = None
+                self.state.set_device_stale(name, False)
+            else:
+                record['status'] = 'down'
+                log.warning("Supervisor", f"{name} reconnect failed - retrying in "
+                            f"{max(record['next_attempt'] - time.monotonic(), 0.0):.0f}s")
+        except Exception as e:
+            record['status'] = 'down'
+            record['last_error'] = str(e)
+            log.error("Supervisor", f"{name} reconnect error: {e}")
+        finally:
+            self._reconnect_threads.pop(name, None)
+    
+    def get_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get a copy of the per-service health records"""
+        return {name: record.copy() for name, record in self.health.items()}
+
+
 class ControllerManager:
     """Manages lifecycle of all hardware services and test sessions"""
     
@@ -26,8 +185,28 @@ class ControllerManager:
         self.session_manager = get_session_manager()
         self.csv_logger = get_csv_logger()
         self.services_running = False
+        self.services_starting = False
         self.test_running = False
         self.current_session = None
+        self._startup_lock = threading.Lock()
+        
+        # Startup behaviour from devices.yaml (parallel connects, per-service deadlines, degraded mode)
+        self.startup_config = get_device_config().get_startup_config()
+        self.last_startup_report = None
+        
+        # Stall detection and per-service reconnect (started with the services)
+        self.supervisor_config = get_device_config().get_supervisor_config()
+        self.supervisor = None
+        
+        # Optional shared event loop hosting all polling and logging tasks,
+        # or child processes running the services with shared-memory sample rings
+        self.runtime_config = get_device_config().get_runtime_config()
+        self.runtime = None
+        self.process_acquisition = None
+        
+        # End-of-test plots render off the UI thread (in worker processes)
+        self.post_processing_config = get_device_config().get_post_processing_config()
+        self.post_processing_thread = None
         
         # Actual service instances
         self.ni_daq_service = None
@@ -42,43 +221,256 @@ class ControllerManager:
             'bga244': {'connected': False, 'service': None},
             'cvm24p': {'connected': False, 'service': None}
         }
+        
+        # Start/stop entry points per service (startup order for sequential mode)
+        self._service_starters = {
+            'ni_daq': self._start_ni_daq,
+            'pico_tc08': self._start_pico_tc08,
+            'bga244': self._start_bga244,
+            'cvm24p': self._start_cvm24p
+        }
+        self._service_stoppers = {
+            'ni_daq': self._stop_ni_daq,
+            'pico_tc08': self._stop_pico_tc08,
+            'bga244': self._stop_bga244,
+            'cvm24p': self._stop_cvm24p
+        }
     
-    def start_all_services(self):
-        """Start all hardware services"""
+    def start_all_services(self, allow_degraded: Optional[bool] = None):
+        """
+        Start all hardware services
+        
+        Args:
+            allow_degraded: Keep the services that came up even if others failed
+                            (defaults to system.startup.allow_degraded in devices.yaml)
+        
+        Returns:
+            True if the rig is up (all services, or at least one in degraded mode)
+        """
         if self.services_running:
             log.warning("System", "Services already running")
             return False
         
-        log.info("System", "Starting all hardware services")
+        # Ignore repeated Connect clicks while a startup is in progress
+        if not self._startup_lock.acquire(blocking=False):
+            log.warning("System", "Service startup already in progress")
+            return False
+        
+        try:
+            self.services_starting = True
+            
+            if allow_degraded is None:
+                allow_degraded = self.startup_config['allow_degraded']
+            
+            parallel = self.startup_config['parallel']
+            log.info("System", f"Starting all hardware services ({'parallel' if parallel else 'sequential'})")
+            
+            if self.runtime_config['mode'] == 'asyncio':
+                self.runtime = AcquisitionRuntime(self.runtime_config['executor_workers'])
+                if not self.runtime.start():
+                    self.runtime = None
+            elif self.runtime_config['mode'] == 'processes':
+                self.process_acquisition = ProcessAcquisition(self.runtime_config['mirror_rate'],
+                                                              self.runtime_config['ring_capacity'])
+                self.process_acquisition.start()
+            
+            report = self._run_service_startup(parallel)
+            started = [name for name, entry in report['services'].items() if entry['success']]
+            failed = [name for name in self.services if name not in started]
+            
+            if not failed:
+                self.services_running = True
+                report['result'] = 'all'
+                log.success("System", f"All {len(started)} services started successfully",
+                            self._format_startup_report(report))
+            elif started and allow_degraded:
+                self.services_running = True
+                report['result'] = 'degraded'
+                log.warning("System", f"Running in degraded mode - {len(started)}/{len(self.services)} services started",
+                            [f"→ Unavailable: {', '.join(failed)}"] + self._format_startup_report(report))
+            else:
+                report['result'] = 'failed'
+                log.error("System", f"Only {len(started)}/{len(self.services)} services started - stopping all",
+                          self._format_startup_report(report))
+                for name in started:
+                    self._service_stoppers[name]()
+                self._stop_runtime()
+            
+            self.last_startup_report = report
+            
+            if self.services_running and self.supervisor_config['enabled']:
+                self.supervisor = ServiceSupervisor(self, self.supervisor_config)
+                self.supervisor.start()
+            
+            return self.services_running
+            
+        finally:
+            self.services_starting = False
+            self._startup_lock.release()
+    
+    def _run_service_startup(self, parallel: bool) -> Dict[str, Any]:
+        """Connect every service (concurrently or one by one) and time each phase"""
+        deadlines = self.startup_config['timeouts']
+        report = {
+            'mode': 'parallel' if parallel else 'sequential',
+            'services': {
+                name: {'success': False, 'timed_out': False, 'error': None, 'phases': {}, 'total_seconds': 0.0}
+                for name in self._service_starters
+            }
+        }
+        startup_begin = time.perf_counter()
+        
+        # Starter threads only return their outcome; every report entry is written here, so a
+        # connect finishing at its deadline is either a success or timed out (and discarded), never both
+        if not parallel:
+            for name, starter in self._service_starters.items():
+                phases = {}
+                report['services'][name].update(self._run_starter(starter, phases), phases=phases)
+        else:
+            executor = ThreadPoolExecutor(max_workers=len(self._service_starters), thread_name_prefix="startup")
+            phases = {name: {} for name in self._service_starters}
+            futures = {
+                name: executor.submit(self._run_starter, starter, phases[name])
+                for name, starter in self._service_starters.items()
+            }
+            
+            # All connects began together, so each deadline is measured from startup_begin
+            for name, future in futures.items():
+                entry = report['services'][name]
+                remaining = deadlines.get(name, 30.0) - (time.perf_counter() - startup_begin)
+                try:
+                    entry.update(future.result(timeout=max(remaining, 0.0)))
+                except FutureTimeoutError:
+                    if future.done():
+                        # Finished between the timeout and this check - keep it
+                        entry.update(future.result())
+                    else:
+                        entry['timed_out'] = True
+                        entry['error'] = f"no response within {deadlines.get(name, 30.0):g}s"
+                        entry['total_seconds'] = round(time.perf_counter() - startup_begin, 3)
+                        future.add_done_callback(lambda f, n=name: self._discard_late_service(n, f))
+                # A copy: a timed-out starter is still adding phases on its thread
+                entry['phases'] = dict(phases[name])
+            
+            # Do not wait for timed-out connects - their threads finish in the background
+            executor.shutdown(wait=False)
         
-        # Start each service using their actual implementations
-        success_count = 0
+        report['total_seconds'] = round(time.perf_counter() - startup_begin, 3)
+        return report
+    
+    def _run_starter(self, starter, phases: Dict[str, float]) -> Dict[str, Any]:
+        """Run one service starter, returning its outcome for the startup report (success, error, total_seconds)"""
+        begin = time.perf_counter()
+        error = None
+        try:
+            success = bool(starter(phases))
+        except Exception as e:
+            error = str(e)
+            success = False
+        return {'success': success, 'error': error, 'total_seconds': round(time.perf_counter() - begin, 3)}
+    
+    def _discard_late_service(self, name: str, future):
+        """Tear down a service whose connect completed after its startup deadline"""
+        try:
+            if future.result()['success']:
+                log.warning("System", f"{name} connected after its startup deadline - disconnecting")
+                self._service_stoppers[name]()
+        except Exception:
+            pass
+    
+    def _time_phase(self, phases: Dict[str, float], phase: str, func):
+        """Call func() and record its duration under phases[phase]"""
+        begin = time.perf_counter()
+        try:
+            return func()
+        finally:
+            phases[phase] = round(time.perf_counter() - begin, 3)
+    
+    def _format_startup_report(self, report: Dict[str, Any]) -> list:
+        """Build log sublines with per-service phase timings"""
+        lines = [f"→ Total startup: {report['total_seconds']:.2f}s ({report['mode']})"]
+        for name, entry in report['services'].items():
+            phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in entry['phases'].items())
+            status = "✅" if entry['success'] else ("⏱" if entry['timed_out'] else "❌")
+            line = f"• {name}: {status} {entry['total_seconds']:.2f}s"
+            if phases:
+                line += f" ({phases})"
+            if entry['error']:
+                line += f" - {entry['error']}"
+            lines.append(line)
+        return lines
+    
+    def _create_service(self, name: str, service_class):
+        """Create a service in this process, or its proxy when services run in child processes"""
+        if self.process_acquisition:
+            return self.process_acquisition.create_proxy(name)
+        return service_class()
+    
+    def _begin_polling(self, name: str, service, phases: Dict[str, float]) -> bool:
+        """Start a service's acquisition on its own thread, or as a task on the shared runtime"""
+        if self.runtime is None:
+            return self._time_phase(phases, 'start_polling', service.start_polling)
         
-        # NI DAQ Service
-        if self._start_ni_daq():
-            success_count += 1
+        if not self._time_phase(phases, 'start_polling', lambda: service.start_polling(threaded=False)):
+            return False
         
-        # Pico TC-08 Service  
-        if self._start_pico_tc08():
-            success_count += 1
+        poll = getattr(service, 'poll_once_async', None) or service.poll_once
         
-        # BGA244 Service
-        if self._start_bga244():
-            success_count += 1
+        def record_error(error):
+            service.last_error = str(error)
         
-        # CVM-24P Service
-        if self._start_cvm24p():
-            success_count += 1
+        return self.runtime.add_task(name, poll, service.sample_rate, on_error=record_error)
+    
+    def _end_polling(self, name: str):
+        """Remove a service's task from the shared runtime (no-op in thread mode)"""
+        if self.runtime:
+            self.runtime.remove_task(name)
+    
+    def _stop_runtime(self):
+        """Shut down the shared event loop and its executor, or the process state mirror"""
+        if self.runtime:
+            self.runtime.stop()
+            self.runtime = None
+        if self.process_acquisition:
+            self.process_acquisition.stop()
+            self.process_acquisition = None
+    
+    def _start_csv_logging(self, backend: Optional[str] = None) -> bool:
+        """Start session data logging, driven by the runtime when one is active"""
+        if self.runtime is None:
+            return self.csv_logger.start_logging(backend=backend)
         
-        # Check if all services started successfully
-        if success_count == 4:
-            self.services_running = True
-            log.success("System", f"All {success_count} services started successfully")
-            return True
-        else:
-            log.error("System", f"Only {success_count}/4 services started - stopping all")
-            self.stop_all_services()
+        if not self.csv_logger.start_logging(threaded=False, backend=backend):
             return False
+        if self.csv_logger.mode == 'native':
+            # Native logging is driven by published samples, not by a periodic tick
+            return True
+        scheduler_config = get_device_config().get_scheduler_config()
+        return self.runtime.add_task('csv_logger', self.csv_logger.log_once, 1.0 / self.csv_logger.log_interval,
+                                     phase=scheduler_config['log_phase'],
+                                     align_to=scheduler_config['log_align_to'])
+    
+    def _stop_csv_logging(self) -> Dict[str, Any]:
+        """Stop the logger's runtime task (if any) and finalize the CSV files"""
+        if self.runtime:
+            self.runtime.remove_task('csv_logger')
+        return self.csv_logger.stop_logging()
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-task scheduling statistics from the shared runtime (empty in thread mode)"""
+        return self.runtime.get_stats() if self.runtime else {}
+    
+    def get_scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get nominal vs measured rate and overruns for every deadline-paced loop"""
+        return get_scheduler().get_stats()
+    
+    def get_service_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get supervisor health records (heartbeat age, stalls, reconnects) per service"""
+        return self.supervisor.get_health() if self.supervisor else {}
+    
+    def get_startup_report(self) -> Optional[Dict[str, Any]]:
+        """Get the timing breakdown of the last service startup"""
+        return self.last_startup_report
     
     def stop_all_services(self):
         """Stop all hardware services"""
@@ -86,21 +478,30 @@ class ControllerManager:
             log.warning("System", "Services already stopped")
             return
         
+        # Stop supervision first so nothing is reconnected while shutting down
+        if self.supervisor:
+            self.supervisor.stop()
+            self.supervisor = None
+        
         # Stop each service using their actual implementations
         self._stop_ni_daq()
         self._stop_pico_tc08()
         self._stop_bga244()
         self._stop_cvm24p()
+        self._stop_runtime()
         
         self.services_running = False
+        for name in self.services:
+            self.state.set_device_stale(name, False)
         log.success("System", "All services stopped")
     
-    def start_test(self, session_name: Optional[str] = None) -> bool:
+    def start_test(self, session_name: Optional[str] = None, storage_backend: Optional[str] = None) -> bool:
         """
         Start a new test session with data logging
         
         Args:
             session_name: Optional custom name for the test session
+            storage_backend: Optional data file format for this session ('csv', 'parquet', 'hdf5')
             
         Returns:
             True if test started successfully
@@ -124,8 +525,9 @@ class ControllerManager:
             self.timer.reset()
             self.timer.start()
             
-            # Update test state
+            # Update test state (clears an earlier emergency stop)
             self.test_running = True
+            self.state.set_emergency_stop(False)
             self.state.update_test_status(running=True)
             
             # Register configuration snapshot
@@ -139,8 +541,8 @@ class ControllerManager:
             # Save current device configuration
             self._save_test_configuration(config_path)
             
-            # Start CSV data logging
-            logging_started = self.csv_logger.start_logging()
+            # Start data logging
+            logging_started = self._start_csv_logging(storage_backend)
             
             session_details = [
                 f"→ Session name: {self.current_session['session_id']}",
@@ -149,7 +551,10 @@ class ControllerManager:
             ]
             
             if logging_started:
-                session_details.append("→ CSV logging: 4 files created (1.0s interval)")
+                logger_status = self.csv_logger.get_status()
+                rate = "native rate" if logger_status['mode'] == 'native' else f"{self.csv_logger.log_interval}s interval"
+                session_details.append(f"→ Data logging: {logger_status['files_active']} "
+                                       f"{logger_status['storage_backend']} files created ({rate})")
             else:
                 session_details.extend([
                     "→ CSV logging: FAILED - No CSV files will be created",
@@ -188,31 +593,25 @@ class ControllerManager:
             self.timer.reset()
             
             # Stop CSV logging first
-            logging_stats = self.csv_logger.stop_logging()
+            logging_stats = self._stop_csv_logging()
             
             # End the current session (this saves active channels automatically)
             final_session = end_test_session(status)
             
             # Run post-processing on the completed session (skip for emergency stops)
             if final_session and logging_stats.get('log_count', 0) > 0 and status != "emergency_stop":
-                try:
-                    from data.post_processor import process_session_data
-                    
-                    # Get active channels from the final session metadata
-                    active_channels = final_session.get('active_channels')
-                    
-                    # Process the session data
-                    post_success = process_session_data(
-                        final_session['folder_path'], 
-                        active_channels
+                # Get active channels from the final session metadata
+                active_channels = final_session.get('active_channels')
+                
+                if self.post_processing_config['background']:
+                    self.post_processing_thread = threading.Thread(
+                        target=self._run_post_processing,
+                        args=(final_session['folder_path'], active_channels),
+                        daemon=True, name="post_processing"
                     )
-                    
-                    # Post-processing messages are handled in post_processor.py
-                        
-                except Exception as e:
-                    log.error("PostProcessor", f"Post-processing error: {e}", [
-                        "→ Test session saved successfully, but plots not generated"
-                    ])
+                    self.post_processing_thread.start()
+                else:
+                    self._run_post_processing(final_session['folder_path'], active_channels)
             
             # Update test state
             self.test_running = False
@@ -239,10 +638,30 @@ class ControllerManager:
             self.timer.reset()
             return None
     
+    def _run_post_processing(self, session_folder: str, active_channels: Optional[Dict[str, Any]]):
+        """Generate the session plots (messages are handled in post_processor.py)"""
+        try:
+            from data.post_processor import process_session_data
+            process_session_data(session_folder, active_channels)
+        except Exception as e:
+            log.error("PostProcessor", f"Post-processing error: {e}", [
+                "→ Test session saved successfully, but plots not generated"
+            ])
+    
     def emergency_stop(self) -> Optional[Dict[str, Any]]:
         """Emergency stop - immediately halt test and disconnect services"""
         print("🚨 EMERGENCY STOP ACTIVATED")
         
+        # Flag the stop first so it is recorded while the session is still logging
+        self.state.set_emergency_stop(True)
+        
+        # De-energize outputs in the acquisition processes before the normal shutdown
+        if self.process_acquisition:
+            self.process_acquisition.emergency_stop()
+        else:
+            # The NI DAQ thread writes the all-off state on its next output update
+            self.state.set_outputs_safe()
+        
         # Stop timer immediately
         self.timer.reset()
         print("   → Timer stopped immediately")
@@ -252,7 +671,7 @@ class ControllerManager:
         if self.test_running:
             # Stop CSV logging immediately
             try:
-                self.csv_logger.stop_logging()
+                self._stop_csv_logging()
             except Exception as e:
                 print(f"⚠️  Error stopping CSV logging during emergency: {e}")
             
@@ -315,13 +734,14 @@ class ControllerManager:
         except Exception:
             return None
     
-    def _start_ni_daq(self):
+    def _start_ni_daq(self, phases: Optional[Dict[str, float]] = None):
         """Start NI DAQ service using actual NIDAQService"""
         try:
             # Create and connect actual service
-            self.ni_daq_service = NIDAQService()
-            if self.ni_daq_service.connect():
-                if self.ni_daq_service.start_polling():
+            phases = phases if phases is not None else {}
+            self.ni_daq_service = self._time_phase(phases, 'create', lambda: self._create_service('ni_daq', NIDAQService))
+            if self._time_phase(phases, 'connect', self.ni_daq_service.connect):
+                if self._begin_polling('ni_daq', self.ni_daq_service, phases):
                     self.services['ni_daq']['connected'] = True
                     self.services['ni_daq']['service'] = self.ni_daq_service
                     # Service connection message is handled by NIDAQService itself
@@ -338,13 +758,14 @@ class ControllerManager:
             log.error("System", f"NI cDAQ failed: {e}")
             return False
     
-    def _start_pico_tc08(self):
+    def _start_pico_tc08(self, phases: Optional[Dict[str, float]] = None):
         """Start Pico TC-08 service using actual PicoTC08Service"""
         try:
             # Create and connect actual service
-            self.pico_tc08_service = PicoTC08Service()
-            if self.pico_tc08_service.connect():
-                if self.pico_tc08_service.start_polling():
+            phases = phases if phases is not None else {}
+            self.pico_tc08_service = self._time_phase(phases, 'create', lambda: self._create_service('pico_tc08', PicoTC08Service))
+            if self._time_phase(phases, 'connect', self.pico_tc08_service.connect):
+                if self._begin_polling('pico_tc08', self.pico_tc08_service, phases):
                     self.services['pico_tc08']['connected'] = True
                     self.services['pico_tc08']['service'] = self.pico_tc08_service
                     # Service connection message is handled by PicoTC08Service itself
@@ -361,14 +782,15 @@ class ControllerManager:
             log.error("System", f"Pico TC-08 failed: {e}")
             return False
     
-    def _start_bga244(self):
+    def _start_bga244(self, phases: Optional[Dict[str, float]] = None):
         """Start BGA244 service using actual BGA244Service"""
         try:
             # Create and connect actual service
-            self.bga244_service = BGA244Service()
-            if self.bga244_service.connect():
+            phases = phases if phases is not None else {}
+            self.bga244_service = self._time_phase(phases, 'create', lambda: self._create_service('bga244', BGA244Service))
+            if self._time_phase(phases, 'connect', self.bga244_service.connect):
                 # Attempt to start polling
-                polling_started = self.bga244_service.start_polling()
+                polling_started = self._begin_polling('bga244', self.bga244_service, phases)
                 
                 # BGA244 service is considered operational even if no individual BGAs are connected
                 # (polling_started will be False if no BGAs connected, but service is still functional)
@@ -385,13 +807,15 @@ class ControllerManager:
             log.error("System", f"BGA244 failed: {e}")
             return False
     
-    def _start_cvm24p(self):
+    def _start_cvm24p(self, phases: Optional[Dict[str, float]] = None):
         """Start CVM-24P service using actual CVM24PService"""
         try:
             # Create and connect actual service
-            self.cvm24p_service = CVM24PService()
-            if self.cvm24p_service.connect():
-                if self.cvm24p_service.start_polling():
+            phases = phases if phases is not None else {}
+            self.cvm24p_service = self._time_phase(phases, 'create', lambda: self._create_service('cvm24p', CVM24PService))
+            runtime_loop = self.runtime.loop if self.runtime else None
+            if self._time_phase(phases, 'connect', lambda: self.cvm24p_service.connect(loop=runtime_loop)):
+                if self._begin_polling('cvm24p', self.cvm24p_service, phases):
                     self.services['cvm24p']['connected'] = True
                     self.services['cvm24p']['service'] = self.cvm24p_service
                     # Service connection message is handled by CVM24PService itself
@@ -411,6 +835,7 @@ class ControllerManager:
     def _stop_ni_daq(self):
         """Stop NI DAQ service"""
         if self.services['ni_daq']['connected'] and self.ni_daq_service:
+            self._end_polling('ni_daq')
             self.ni_daq_service.stop_polling()
             self.ni_daq_service.disconnect()
             self.services['ni_daq']['connected'] = False
@@ -421,6 +846,7 @@ class ControllerManager:
     def _stop_pico_tc08(self):
         """Stop Pico TC-08 service"""
         if self.services['pico_tc08']['connected'] and self.pico_tc08_service:
+            self._end_polling('pico_tc08')
             self.pico_tc08_service.stop_polling()
             self.pico_tc08_service.disconnect()
             self.services['pico_tc08']['connected'] = False
@@ -431,6 +857,7 @@ class ControllerManager:
     def _stop_bga244(self):
         """Stop BGA244 service"""
         if self.services['bga244']['connected'] and self.bga244_service:
+            self._end_polling('bga244')
             self.bga244_service.stop_polling()
             self.bga244_service.disconnect()
             self.services['bga244']['connected'] = False
@@ -441,6 +868,7 @@ class ControllerManager:
     def _stop_cvm24p(self):
         """Stop CVM-24P service"""
         if self.services['cvm24p']['connected'] and self.cvm24p_service:
+            self._end_polling('cvm24p')
             self.cvm24p_service.stop_polling()
             self.cvm24p_service.disconnect()
             self.services['cvm24p']['connected'] = False
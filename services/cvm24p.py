@@ -8,6 +8,7 @@ import time
 import threading
 from typing import List, Optional
 from core.state import get_global_state
+from core.timer import get_scheduler
 from config.device_config import get_device_config
 from utils.logger import log
 
@@ -48,10 +49,15 @@ class CVM24PService:
         
         # Async handling
         self.loop = None
+        self._owns_loop = True  # False when running on the shared acquisition runtime loop
         self.polling_thread = None
         
-    def connect(self) -> bool:
-        """Connect to CVM24P modules"""
+        # Heartbeat for the service supervisor
+        self.last_sample_time = None  # time.monotonic() of last successful poll
+        self.last_error = None
+        
+    def connect(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+        """Connect to CVM24P modules (optionally on an already running external event loop)"""
         if not XC2_AVAILABLE:
             log.error("CVM24P", "XC2 libraries not available")
             return False
@@ -67,8 +73,9 @@ class CVM24PService:
                 log.error("CVM24P", "No serial ports found")
                 return False
             
-            # Create event loop for async operations
-            self.loop = asyncio.new_event_loop()
+            # Create event loop for async operations, or borrow the runtime's loop
+            self._owns_loop = loop is None
+            self.loop = loop or asyncio.new_event_loop()
             
             # Try each port
             for port in ports:
@@ -79,16 +86,17 @@ class CVM24PService:
                     return True
             
             # Clean up loop if all ports failed
-            self.loop.close()
+            if self._owns_loop:
+                self.loop.close()
             self.loop = None
             log.error("CVM24P", "Failed to connect on any port")
             return False
             
         except Exception as e:
             log.error("CVM24P", f"Connection failed: {e}")
-            if self.loop:
+            if self.loop and self._owns_loop:
                 self.loop.close()
-                self.loop = None
+            self.loop = None
             return False
     
     def _connect_to_port(self, port: str) -> bool:
@@ -104,7 +112,7 @@ class CVM24PService:
             )
             
             # Connect and initialize in the event loop
-            self.loop.run_until_complete(self._async_connect())
+            self._run_on_loop(self._async_connect())
             
             # Verify we got all expected modules
             if len(self.devices) != self.expected_modules:
@@ -117,6 +125,12 @@ class CVM24PService:
             self.devices.clear()
             return False
     
+    def _run_on_loop(self, coro):
+        """Run a coroutine to completion on the service loop (private or borrowed from another thread)"""
+        if self._owns_loop:
+            return self.loop.run_until_complete(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
     async def _async_connect(self):
         """Async connection and initialization"""
         # Connect bus
@@ -136,8 +150,8 @@ class CVM24PService:
         if self.polling:
             self.stop_polling()
         
-        # Clean up async resources
-        if self.loop and not self.loop.is_closed():
+        # Clean up async resources (a borrowed runtime loop is left running)
+        if self.loop and self._owns_loop and not self.loop.is_closed():
             self.loop.close()
         
         self.loop = None
@@ -149,8 +163,8 @@ class CVM24PService:
         self.state.update_connection_status('cvm24p', False)
         log.success("CVM24P", "Disconnected")
     
-    def start_polling(self) -> bool:
-        """Start polling cell voltage data"""
+    def start_polling(self, threaded: bool = True) -> bool:
+        """Start polling cell voltage data (threaded=False leaves poll_once_async() to an external scheduler)"""
         if not self.connected:
             log.error("CVM24P", "Cannot start polling - not connected")
             return False
@@ -159,8 +173,10 @@ class CVM24PService:
             return True
             
         self.polling = True
-        self.polling_thread = threading.Thread(target=self._poll_data, daemon=True)
-        self.polling_thread.start()
+        self.last_sample_time = time.monotonic()
+        if threaded:
+            self.polling_thread = threading.Thread(target=self._poll_data, daemon=True)
+            self.polling_thread.start()
         
         log.success("CVM24P", f"Polling started at {self.sample_rate} Hz")
         return True
@@ -173,6 +189,7 @@ class CVM24PService:
         self.polling = False
         if self.polling_thread:
             self.polling_thread.join(timeout=2.0)
+            self.polling_thread = None
         
         log.info("CVM24P", "Polling stopped")
     
@@ -185,22 +202,30 @@ class CVM24PService:
     
     async def _async_poll(self):
         """Async polling loop"""
+        deadline = get_scheduler().create_task('cvm24p', self.sample_rate)
         while self.polling and self.connected:
             try:
-                # Read all voltages
-                voltages = await self._read_all_voltages()
-                
-                # Update state
-                self.voltage_data = voltages
-                self.state.update_sensor_values(cell_voltages=voltages)
+                await self.poll_once_async()
                 
-                # Sleep for sample rate
-                await asyncio.sleep(1.0 / self.sample_rate)
+                # Sleep until the next absolute deadline
+                await asyncio.sleep(deadline.tick())
                 
             except Exception as e:
                 log.error("CVM24P", f"Polling error: {e}")
+                self.last_error = str(e)
                 break
     
+    async def poll_once_async(self):
+        """Read all modules once and publish the cell voltages to state"""
+        # Read all voltages
+        voltages = await self._read_all_voltages()
+        
+        # Update state
+        self.voltage_data = voltages
+        self.state.update_sensor_values(cell_voltages=voltages)
+        self.state.publish_samples('cvm24p', [(time.time_ns(), list(voltages))])
+        self.last_sample_time = time.monotonic()
+    
     async def _read_all_voltages(self) -> List[float]:
         """Read voltages from all modules in physical order"""
         all_voltages = []
@@ -7,6 +7,7 @@ Handles NI-9253 (4-20mA analog inputs) and NI-9485 (digital outputs)
 import time
 import threading
 from core.state import get_global_state
+from core.timer import get_scheduler
 from config.device_config import get_device_config
 from utils.logger import log
 
@@ -30,6 +31,10 @@ class NIDAQService:
         self.polling_thread = None
         self._stop_event = threading.Event()
         
+        # Heartbeat for the service supervisor
+        self.last_sample_time = None  # time.monotonic() of last successful poll
+        self.last_error = None
+        
         # Configuration
         self.current_range = self.device_config.get_current_range_config()
         self.sample_rate = 100  # Hz
@@ -108,15 +113,17 @@ class NIDAQService:
         self.state.update_connection_status('ni_daq', False)
         log.success("DAQ", "NI cDAQ disconnected")
     
-    def start_polling(self):
-        """Start data acquisition"""
+    def start_polling(self, threaded: bool = True):
+        """Start data acquisition (threaded=False leaves poll_once() to an external scheduler)"""
         if not self.connected or self.polling:
             return False
         
         self._stop_event.clear()
         self.polling = True
-        self.polling_thread = threading.Thread(target=self._polling_loop, daemon=True)
-        self.polling_thread.start()
+        self.last_sample_time = time.monotonic()
+        if threaded:
+            self.polling_thread = threading.Thread(target=self._polling_loop, daemon=True)
+            self.polling_thread.start()
         
         log.success("DAQ", f"Polling started ({self.sample_rate} Hz)")
         return True
@@ -201,50 +208,59 @@ class NIDAQService:
     
     def _polling_loop(self):
         """Main data acquisition loop"""
+        deadline = get_scheduler().create_task('ni_daq', self.sample_rate)
         while self.polling and not self._stop_event.is_set():
             try:
-                # Read analog inputs
-                analog_data = self._read_analog_inputs()
-                
-                # Get sensor mapping from config
-                channels_config = self.device_config.get_ni_cdaq_config()['analog_inputs']['channels']
-                
-                # Build pressure values array in correct order to match CSV headers
-                pressure_values = []
-                # Use the exact order from device config that matches CSV headers
-                ordered_pressure_sensors = ['pt01', 'pt02', 'pt03', 'pt04', 'pt05', 'pt06']
-                for sensor_name in ordered_pressure_sensors:
-                    if sensor_name in channels_config:
-                        pressure_values.append(analog_data.get(sensor_name, 0.0))
-                    else:
-                        pressure_values.append(0.0)
-                
-                # Get current and flowrate from config
-                current_value = 0.0
-                flowrate_value = 0.0
-                for name, config in channels_config.items():
-                    if config.get('units') == 'A':
-                        current_value = analog_data.get(name, 0.0)
-                    elif config.get('units') == 'SLM':
-                        flowrate_value = analog_data.get(name, 0.0)
+                self.poll_once()
                 
-                # Update state
-                self.state.update_sensor_values(
-                    pressure_values=pressure_values,
-                    current_value=current_value,
-                    flowrate_value=flowrate_value
-                )
-                
-                # Update digital outputs
-                self._update_digital_outputs()
-                
-                # Sleep for sample rate
-                time.sleep(1.0 / self.sample_rate)
+                # Sleep until the next absolute deadline
+                if not deadline.wait(self._stop_event):
+                    break
                 
             except Exception as e:
                 log.error("DAQ", f"Polling error: {e}")
+                self.last_error = str(e)
                 break
     
+    def poll_once(self):
+        """Read analog inputs, publish to state and refresh digital outputs (one acquisition cycle)"""
+        # Read analog inputs
+        analog_data = self._read_analog_inputs()
+        
+        # Get sensor mapping from config
+        channels_config = self.device_config.get_ni_cdaq_config()['analog_inputs']['channels']
+        
+        # Build pressure values array in correct order to match CSV headers
+        pressure_values = []
+        # Use the exact order from device config that matches CSV headers
+        ordered_pressure_sensors = ['pt01', 'pt02', 'pt03', 'pt04', 'pt05', 'pt06']
+        for sensor_name in ordered_pressure_sensors:
+            if sensor_name in channels_config:
+                pressure_values.append(analog_data.get(sensor_name, 0.0))
+            else:
+                pressure_values.append(0.0)
+        
+        # Get current and flowrate from config
+        current_value = 0.0
+        flowrate_value = 0.0
+        for name, config in channels_config.items():
+            if config.get('units') == 'A':
+                current_value = analog_data.get(name, 0.0)
+            elif config.get('units') == 'SLM':
+                flowrate_value = analog_data.get(name, 0.0)
+        
+        # Update state
+        self.state.update_sensor_values(
+            pressure_values=pressure_values,
+            current_value=current_value,
+            flowrate_value=flowrate_value
+        )
+        self.state.publish_samples('ni_daq', [(time.time_ns(), pressure_values + [current_value, flowrate_value])])
+        self.last_sample_time = time.monotonic()
+        
+        # Update digital outputs
+        self._update_digital_outputs()
+    
     def _read_analog_inputs(self):
         """Read and scale analog inputs"""
         try:
@@ -332,12 +348,8 @@ class NIDAQService:
     
     def _set_all_outputs_safe(self):
         """Set all outputs to OFF"""
-        # Update state
-        with self.state._lock:
-            self.state.pump_state = False
-            self.state.koh_pump_state = False
-            for i in range(len(self.state.valve_states)):
-                self.state.valve_states[i] = False
+        # Update state (through the setter so every closure is recorded as an event)
+        self.state.set_outputs_safe()
         
         # Set physical outputs
         for task in self.do_tasks.values():
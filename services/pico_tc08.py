@@ -6,8 +6,9 @@ Real hardware integration for 8-channel temperature monitoring
 import time
 import threading
 
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from core.state import get_global_state
+from core.timer import get_scheduler
 from config.device_config import get_device_config
 from utils.logger import log
 
@@ -38,6 +39,7 @@ class PicoTC08Config:
     
     # Sampling configuration
     SAMPLE_INTERVAL_MS = 1000  # TC-08 sampling rate
+    BUFFER_READINGS = 600  # Driver buffers up to 600 streamed readings per channel
     
     # Temperature units (0 = Celsius, 1 = Fahrenheit, 2 = Kelvin, 3 = Rankine)
     TEMP_UNITS = 0  # Celsius
@@ -58,14 +60,34 @@ class PicoTC08Config:
 class PicoTC08Hardware:
     """Low-level Pico TC-08 hardware interface"""
     
-    def __init__(self):
-        self.dll = None
+    def __init__(self, dll=None):
+        self.dll = dll  # Optional pre-loaded library (e.g. VirtualTC08DLL)
         self.handle = None
         self.is_connected = False
         self.is_streaming = False
         
-    def load_dll(self) -> bool:
-        """Load the Windows TC-08 DLL"""        
+        # Preallocated ctypes buffers reused on every poll
+        self._temp_buffer = (ctypes.c_float * PicoTC08Config.BUFFER_READINGS)()
+        self._time_buffer = (ctypes.c_int32 * PicoTC08Config.BUFFER_READINGS)()
+        self._overflow = ctypes.c_int16(0)
+        
+        # Latest reading per channel (0-based) held between polls: (device time ms, temperature, valid)
+        self.last_readings = {}
+        
+        # Epoch nanoseconds of device time 0 (taken when streaming starts; device times are ms after it)
+        self.stream_start_ns = None
+        
+    def load_dll(self, backend: str = "dll") -> bool:
+        """Load the Windows TC-08 DLL, or the virtual backend when configured"""
+        if self.dll is None and backend == "virtual":
+            from services.pico_tc08_virtual import VirtualTC08DLL
+            self.dll = VirtualTC08DLL()
+        
+        if self.dll is not None:
+            self._setup_function_prototypes()
+            print(f"   → TC-08 library loaded: {type(self.dll).__name__}")
+            return True
+        
         for dll_path in PicoTC08Config.DLL_PATHS:
             try:
                 self.dll = ctypes.WinDLL(dll_path)
@@ -116,6 +138,15 @@ class PicoTC08Hardware:
         ]
         self.dll.usb_tc08_get_temp.restype = ctypes.c_int32
         
+        # usb_tc08_get_single
+        self.dll.usb_tc08_get_single.argtypes = [
+            ctypes.c_int16,                     # handle
+            ctypes.POINTER(ctypes.c_float),     # temp buffer (cold junction + 8 channels)
+            ctypes.POINTER(ctypes.c_int16),     # overflow flags (bit per channel)
+            ctypes.c_int16                      # units
+        ]
+        self.dll.usb_tc08_get_single.restype = ctypes.c_int16
+        
         # usb_tc08_stop
         self.dll.usb_tc08_stop.argtypes = [ctypes.c_int16]
         self.dll.usb_tc08_stop.restype = ctypes.c_int16
@@ -176,6 +207,9 @@ class PicoTC08Hardware:
             return False
         
         try:
+            # Anchor the device clock to the epoch once; readings are stamped from the device
+            # clock after this, so the stream does not follow host scheduling jitter
+            stream_start_ns = time.time_ns()
             actual_interval = self.dll.usb_tc08_run(self.handle, PicoTC08Config.SAMPLE_INTERVAL_MS)
             
             if actual_interval <= 0:
@@ -183,6 +217,8 @@ class PicoTC08Hardware:
                 return False
             
             self.is_streaming = True
+            self.stream_start_ns = stream_start_ns
+            self.last_readings.clear()
             print("   → TC-08 streaming started at 1Hz")
             return True
             
@@ -190,54 +226,100 @@ class PicoTC08Hardware:
             print(f"   → Error starting TC-08 streaming: {e}")
             return False
     
-    def read_temperatures(self, enabled_channels: set = None) -> List[Tuple[str, float, bool]]:
-        """Read temperatures from enabled channels only to avoid ground loops"""
+    def read_temperature_blocks(self, enabled_channels: set = None) -> Dict[int, Tuple[List[int], List[float], bool]]:
+        """Drain every buffered reading for the enabled channels, one driver call per channel
+        
+        Returns:
+            Dict of 0-based channel index -> (device times in ms, temperatures, overflow flag)
+        """
         if not self.is_streaming:
-            return []
+            return {}
         
         # Default to all channels if none specified (backward compatibility)
         if enabled_channels is None:
-            enabled_channels = set(range(8))
+            enabled_channels = set(range(PicoTC08Config.NUM_CHANNELS))
         
-        temperatures = []
+        blocks = {}
         
-        try:
-            for ch in range(1, PicoTC08Config.NUM_CHANNELS + 1):
-                channel_index = ch - 1  # Convert to 0-based index
-                channel_name = PicoTC08Config.CHANNEL_NAMES[channel_index]
-                
-                if channel_index in enabled_channels:
-                    # Prepare buffers
-                    temp_buffer = (ctypes.c_float * 1)()
-                    time_buffer = (ctypes.c_int32 * 1)()
-                    overflow = ctypes.c_int16(0)
-                    
-                    # Read temperature from hardware
-                    self.dll.usb_tc08_get_temp(
-                        self.handle,
-                        temp_buffer,
-                        time_buffer,
-                        1,  # One reading
-                        ctypes.byref(overflow),
-                        ctypes.c_int16(ch),
-                        ctypes.c_int16(PicoTC08Config.TEMP_UNITS),
-                        ctypes.c_int16(0)  # No trigger
-                    )
-                    
-                    temperature = temp_buffer[0]
-                    
-                    # Check for valid reading (TC-08 returns very large negative values for disconnected)
-                    valid = temperature > -100.0  # Reasonable threshold
-                    
-                    temperatures.append((channel_name, temperature, valid))
-                else:
-                    # Channel disabled - no hardware polling, return placeholder
-                    temperatures.append((channel_name, 0.0, False))
+        for channel_index in sorted(enabled_channels):
+            if not 0 <= channel_index < PicoTC08Config.NUM_CHANNELS:
+                continue
             
-            return temperatures
+            self._overflow.value = 0
+            count = self.dll.usb_tc08_get_temp(
+                self.handle,
+                self._temp_buffer,
+                self._time_buffer,
+                PicoTC08Config.BUFFER_READINGS,
+                ctypes.byref(self._overflow),
+                ctypes.c_int16(channel_index + 1),
+                ctypes.c_int16(PicoTC08Config.TEMP_UNITS),
+                ctypes.c_int16(0)  # No trigger
+            )
             
-        except Exception:
+            if count <= 0:
+                # Nothing new since the last poll (or driver error) - keep the held reading
+                continue
+            
+            blocks[channel_index] = (
+                self._time_buffer[:count],
+                self._temp_buffer[:count],
+                bool(self._overflow.value)
+            )
+        
+        return blocks
+    
+    def read_temperature_rows(self, enabled_channels: set = None) -> List[Tuple[int, List[Tuple[str, float, bool]]]]:
+        """
+        Every buffered reading since the last poll, merged across channels by device time
+        
+        Channels without a reading at a row's time (or read at a different instant) hold
+        their latest reading; disabled channels are placeholders (0.0, invalid).
+        
+        Returns:
+            [(device time in ms, [(channel name, temperature, valid), ...]), ...] oldest first
+        """
+        if not self.is_streaming:
             return []
+        
+        # Default to all channels if none specified (backward compatibility)
+        if enabled_channels is None:
+            enabled_channels = set(range(PicoTC08Config.NUM_CHANNELS))
+        
+        blocks = self.read_temperature_blocks(enabled_channels)
+        readings: Dict[int, Dict[int, Tuple[float, bool]]] = {}
+        for channel_index, (times_ms, temps, overflowed) in blocks.items():
+            for time_ms, temperature in zip(times_ms, temps):
+                # Check for valid reading (TC-08 returns very large negative values for disconnected)
+                valid = temperature > -100.0 and not overflowed  # Reasonable threshold
+                readings.setdefault(time_ms, {})[channel_index] = (temperature, valid)
+        
+        rows = []
+        for time_ms in sorted(readings):
+            for channel_index, (temperature, valid) in readings[time_ms].items():
+                self.last_readings[channel_index] = (time_ms, temperature, valid)
+            rows.append((time_ms, self._held_readings(enabled_channels)))
+        return rows
+    
+    def _held_readings(self, enabled_channels: set) -> List[Tuple[str, float, bool]]:
+        """Latest reading of every channel (placeholder for disabled or not yet read channels)"""
+        temperatures = []
+        for channel_index, channel_name in enumerate(PicoTC08Config.CHANNEL_NAMES):
+            if channel_index in enabled_channels and channel_index in self.last_readings:
+                _, temperature, valid = self.last_readings[channel_index]
+                temperatures.append((channel_name, temperature, valid))
+            else:
+                # Channel disabled (no hardware polling) or no reading yet - return placeholder
+                temperatures.append((channel_name, 0.0, False))
+        return temperatures
+    
+    def get_latest_device_time(self, enabled_channels: set = None) -> Optional[float]:
+        """Device timestamp in seconds since streaming started of the newest held reading"""
+        times = [
+            reading[0] for channel_index, reading in self.last_readings.items()
+            if enabled_channels is None or channel_index in enabled_channels
+        ]
+        return max(times) / 1000.0 if times else None
     
     def stop_streaming(self):
         """Stop temperature streaming"""
@@ -265,18 +347,23 @@ class PicoTC08Hardware:
 class PicoTC08Service:
     """Service for Pico TC-08 thermocouple unit with real hardware integration"""
     
-    def __init__(self):
+    def __init__(self, hardware: Optional[PicoTC08Hardware] = None):
         self.connected = False
         self.polling = False
         self.poll_thread = None
         self.state = get_global_state()
         self.device_config = get_device_config()
         
+        # Heartbeat for the service supervisor
+        self.last_sample_time = None  # time.monotonic() of last successful poll
+        self.last_error = None
+        
         # Hardware interface
-        self.hardware = PicoTC08Hardware()
+        self.hardware = hardware or PicoTC08Hardware()
         
         # TC-08 configuration from device config
         tc_config = self.device_config.get_pico_tc08_config()
+        self.backend = self.device_config.get_pico_tc08_backend()
         self.device_name = "TC-08"
         self.sample_rate = self.device_config.get_sample_rate('pico_tc08')
         self.num_channels = PicoTC08Config.NUM_CHANNELS
@@ -301,7 +388,7 @@ class PicoTC08Service:
         
         try:
             # Try to load DLL and connect to real hardware
-            if self.hardware.load_dll():
+            if self.hardware.load_dll(self.backend):
                 if self.hardware.connect():
                     if self.hardware.configure_channels():
                         # Prepare channel details
@@ -347,8 +434,8 @@ class PicoTC08Service:
         
         log.success("TC08", "Pico TC-08 disconnected")
     
-    def start_polling(self) -> bool:
-        """Start polling thermocouple data"""
+    def start_polling(self, threaded: bool = True) -> bool:
+        """Start polling thermocouple data (threaded=False leaves poll_once() to an external scheduler)"""
         if not self.connected:
             log.error("TC08", "Cannot start polling - Pico TC-08 not connected")
             return False
@@ -363,8 +450,10 @@ class PicoTC08Service:
             return False
         
         self.polling = True
-        self.poll_thread = threading.Thread(target=self._poll_data, daemon=True)
-        self.poll_thread.start()
+        self.last_sample_time = time.monotonic()
+        if threaded:
+            self.poll_thread = threading.Thread(target=self._poll_data, daemon=True)
+            self.poll_thread.start()
         
         log.success("TC08", f"Pico TC-08 polling started at {self.sample_rate} Hz")
         return True
@@ -386,49 +475,53 @@ class PicoTC08Service:
     
     def _poll_data(self):
         """Polling thread function"""
+        deadline = get_scheduler().create_task('pico_tc08', self.sample_rate)
         while self.polling and self.connected:
             try:
-                # Read from hardware
-                temp_readings = self._read_hardware_temperature_data()
+                self.poll_once()
                 
-                # Update global state
-                self.state.update_sensor_values(temperature_values=temp_readings)
-                
-                # Sleep for sample rate
-                time.sleep(1.0 / self.sample_rate)
+                # Sleep until the next absolute deadline
+                deadline.wait()
                 
             except Exception as e:
                 print(f"❌ Pico TC-08 polling error: {e}")
+                self.last_error = str(e)
                 break
     
-    def _read_hardware_temperature_data(self) -> List[float]:
-        """Read temperatures from real TC-08 hardware"""
+    def poll_once(self):
+        """Drain the TC-08 buffers and publish every reading, stamped from the device clock"""
+        rows = self._read_hardware_temperature_rows()
+        self.last_sample_time = time.monotonic()
+        if not rows:
+            return  # Nothing completed since the last poll
+        
+        # Device time t ms after streaming started is stream_start_ns + t ms on the epoch clock
+        anchor_ns = self.hardware.stream_start_ns
+        latest_ms, temp_readings = rows[-1]
+        self.state.update_sensor_values(temperature_values=temp_readings,
+                                        temperature_device_time=latest_ms / 1000.0)
+        self.state.publish_samples('pico_tc08', [(anchor_ns + time_ms * 1_000_000, temperatures)
+                                                 for time_ms, temperatures in rows])
+    
+    def _read_hardware_temperature_rows(self) -> List[Tuple[int, List[float]]]:
+        """Read every drained reading from the TC-08 as (device time in ms, temperatures) rows"""
         try:
             # Get enabled channels from UI selection to avoid polling disconnected channels
             enabled_channels = self.state.visible_temperature_channels
             
             # Read from hardware - only poll enabled channels to prevent ground loops
-            raw_readings = self.hardware.read_temperatures(enabled_channels)
+            raw_rows = self.hardware.read_temperature_rows(enabled_channels)
             
-            if not raw_readings:
-                # Return zeros if no readings available
-                return [0.0] * self.num_channels
-            
-            temperatures = []
-            
-            for i, (channel_name, raw_temp, valid) in enumerate(raw_readings):
-                if valid:
-                    temperatures.append(round(raw_temp, 2))
-                else:
-                    # Invalid reading (disconnected thermocouple or disabled channel)
-                    temperatures.append(0.0)
-            
-            return temperatures
+            rows = []
+            for time_ms, raw_readings in raw_rows:
+                # Invalid readings (disconnected thermocouple or disabled channel) are logged as 0.0
+                rows.append((time_ms, [round(raw_temp, 2) if valid else 0.0
+                                       for channel_name, raw_temp, valid in raw_readings]))
+            return rows
             
         except Exception as e:
             print(f"⚠️  Hardware temperature reading error: {e}")
-            # Return zeros on error
-            return [0.0] * self.num_channels
+            return []
     
     def get_status(self) -> Dict[str, Any]:
         """Get current service status"""
@@ -438,7 +531,7 @@ class PicoTC08Service:
             'device': self.device_name,
             'sample_rate': f"{self.sample_rate} Hz",
             'channels': self.num_channels,
-            'mode': 'Hardware',
+            'mode': 'Virtual' if type(self.hardware.dll).__name__ == 'VirtualTC08DLL' else 'Hardware',
             'channel_config': self.channel_config,
             'calibration_date': self.device_config.get_calibration_date()
         }
@@ -0,0 +1,203 @@
+"""
+Virtual Pico TC-08 backend for hardware-free temperature acquisition
+Implements the usbtc08 functions used by PicoTC08Hardware so PicoTC08Service can run without the vendor DLL
+"""
+
+import time
+import random
+from typing import Callable, Dict, List, Optional, Set
+
+
+# Value the real driver reports for an open (disconnected) thermocouple
+DISCONNECTED_TEMPERATURE = -1.0e9
+
+
+def _value(arg):
+    """Unwrap a plain value from an int/float or ctypes scalar argument"""
+    return arg.value if hasattr(arg, 'value') else arg
+
+
+def _target(pointer_arg):
+    """Resolve the ctypes object behind a byref() argument"""
+    return getattr(pointer_arg, '_obj', pointer_arg)
+
+
+class _VirtualFunction:
+    """Callable standing in for a DLL export (accepts argtypes/restype like a ctypes function)"""
+
+    def __init__(self, func: Callable):
+        self._func = func
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args):
+        return self._func(*args)
+
+
+class VirtualTC08DLL:
+    """Drop-in replacement for the usbtc08 shared library
+
+    Channels stream readings on a software clock at the interval passed to usb_tc08_run,
+    buffered per channel like the real driver (oldest readings dropped beyond the buffer size).
+    """
+
+    BUFFER_READINGS = 600
+    NUM_CHANNELS = 8
+
+    def __init__(self, base_temperatures: Optional[List[float]] = None, noise_std: float = 0.05,
+                 disconnected_channels: Optional[Set[int]] = None,
+                 overflow_channels: Optional[Set[int]] = None,
+                 seed: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize virtual TC-08
+
+        Args:
+            base_temperatures: Mean temperature (°C) for channels 1-8 (defaults to 25 °C)
+            noise_std: Standard deviation of the gaussian noise added to each reading
+            disconnected_channels: 1-based channels reporting an open thermocouple
+            overflow_channels: 1-based channels that raise the overflow flag
+            seed: Random seed for reproducible signals
+            clock: Time source in seconds (inject a fake clock for deterministic tests)
+        """
+        self.base_temperatures = list(base_temperatures or [25.0] * self.NUM_CHANNELS)
+        self.noise_std = noise_std
+        self.disconnected_channels = set(disconnected_channels or set())
+        self.overflow_channels = set(overflow_channels or set())
+        self.cold_junction_temperature = 22.0
+        self._random = random.Random(seed)
+        self._clock = clock
+
+        # Device state
+        self.handle = 0
+        self.channel_types: Dict[int, bytes] = {}
+        self.interval_ms = 0
+        self.streaming = False
+        self._run_start = 0.0
+        self._next_sample_index: Dict[int, int] = {}
+
+        # Call accounting for benchmarks and gating checks
+        self.get_temp_calls: Dict[int, int] = {ch: 0 for ch in range(self.NUM_CHANNELS + 1)}
+        self.get_single_calls = 0
+
+        # Exported functions
+        self.usb_tc08_open_unit = _VirtualFunction(self._open_unit)
+        self.usb_tc08_set_channel = _VirtualFunction(self._set_channel)
+        self.usb_tc08_run = _VirtualFunction(self._run)
+        self.usb_tc08_get_temp = _VirtualFunction(self._get_temp)
+        self.usb_tc08_get_single = _VirtualFunction(self._get_single)
+        self.usb_tc08_stop = _VirtualFunction(self._stop)
+        self.usb_tc08_close_unit = _VirtualFunction(self._close_unit)
+
+    def _sample(self, channel: int) -> float:
+        """Generate one reading for a 1-based channel"""
+        if channel == 0:
+            return self.cold_junction_temperature
+        if channel in self.disconnected_channels:
+            return DISCONNECTED_TEMPERATURE
+        return self.base_temperatures[channel - 1] + self._random.gauss(0.0, self.noise_std)
+
+    def _open_unit(self) -> int:
+        self.handle = 1
+        return self.handle
+
+    def _set_channel(self, handle, channel, tc_type) -> int:
+        if _value(handle) != self.handle or not 0 <= _value(channel) <= self.NUM_CHANNELS:
+            return 0
+        self.channel_types[_value(channel)] = _value(tc_type)
+        return 1
+
+    def _run(self, handle, interval_ms) -> int:
+        if _value(handle) != self.handle:
+            return 0
+        self.interval_ms = max(int(_value(interval_ms)), 100)
+        self.streaming = True
+        self._run_start = self._clock()
+        self._next_sample_index = {ch: 0 for ch in self.channel_types}
+        return self.interval_ms
+
+    def _get_temp(self, handle, temp_buffer, time_buffer, buffer_length, overflow, channel, units, fill_missing) -> int:
+        channel = _value(channel)
+        self.get_temp_calls[channel] = self.get_temp_calls.get(channel, 0) + 1
+
+        if not self.streaming or _value(handle) != self.handle or channel not in self.channel_types:
+            return -1
+
+        # Readings completed since run started, limited to what the driver buffer can hold
+        elapsed_ms = (self._clock() - self._run_start) * 1000.0
+        available = int(elapsed_ms // self.interval_ms)
+        first = max(self._next_sample_index.get(channel, 0), available - self.BUFFER_READINGS)
+        count = min(available - first, _value(buffer_length))
+
+        for i in range(count):
+            sample_index = first + i
+            temp_buffer[i] = self._sample(channel)
+            time_buffer[i] = (sample_index + 1) * self.interval_ms
+
+        self._next_sample_index[channel] = first + max(count, 0)
+        _target(overflow).value = 1 if count > 0 and channel in self.overflow_channels else 0
+        return max(count, 0)
+
+    def _get_single(self, handle, temp_buffer, overflow_flags, units) -> int:
+        self.get_single_calls += 1
+
+        if self.streaming or _value(handle) != self.handle:
+            return 0
+
+        flags = 0
+        for channel in range(self.NUM_CHANNELS + 1):
+            temp_buffer[channel] = self._sample(channel)
+            if channel in self.overflow_channels:
+                flags |= 1 << channel
+        _target(overflow_flags).value = flags
+        return 1
+
+    def _stop(self, handle) -> int:
+        self.streaming = False
+        return 1
+
+    def _close_unit(self, handle) -> int:
+        self.streaming = False
+        self.handle = 0
+        return 1
+
+
+def main():
+    """Run PicoTC08Service against the virtual backend and benchmark one poll"""
+    from services.pico_tc08 import PicoTC08Hardware, PicoTC08Service
+    from core.state import get_global_state
+
+    print("=" * 60)
+    print("VIRTUAL TC-08 TEST: Service on the fake DLL backend")
+    print("=" * 60)
+
+    # Fake clock so a few seconds of streaming happen instantly
+    now = [0.0]
+    dll = VirtualTC08DLL(base_temperatures=[20.0 + i for i in range(8)],
+                         disconnected_channels={8}, seed=1, clock=lambda: now[0])
+
+    service = PicoTC08Service(hardware=PicoTC08Hardware(dll=dll))
+    state = get_global_state()
+    state.visible_temperature_channels = {0, 1, 2, 7}
+
+    print(f"\n1. Connect: {'✅' if service.connect() else '❌'}")
+    print(f"2. Start streaming: {'✅' if service.hardware.start_streaming() else '❌'}")
+
+    now[0] = 3.0
+    start = time.perf_counter()
+    rows = service._read_hardware_temperature_rows()
+    elapsed_us = (time.perf_counter() - start) * 1e6
+
+    print(f"3. One poll took {elapsed_us:.0f} µs ({len(rows)} readings drained)")
+    for time_ms, temperatures in rows:
+        print(f"   t={time_ms / 1000.0:.1f} s: {temperatures}")
+    print(f"   Device time: {service.hardware.get_latest_device_time(state.visible_temperature_channels)} s")
+
+    polled = sorted(ch - 1 for ch, calls in dll.get_temp_calls.items() if ch > 0 and calls)
+    print(f"4. Channels polled: {polled} (visible: {sorted(state.visible_temperature_channels)})")
+
+    service.disconnect()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
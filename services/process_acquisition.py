@@ -0,0 +1,524 @@
+"""
+Multi-process acquisition for AWE test rig
+Runs each device service in a child process that publishes samples to a shared-memory ring,
+so Tk/matplotlib redraws in the main process cannot steal time from the polling loops
+"""
+
+import importlib
+import multiprocessing as mp
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from core.state import get_global_state
+from core.shared_ring import SharedRingBuffer
+from core.timer import get_scheduler
+from config.device_config import get_device_config
+from services.bga244 import gas_sample_values
+from utils.logger import log
+
+
+BGA_UNITS = ['bga_1', 'bga_2', 'bga_3']
+LEGACY_GASES = ['H2', 'O2', 'N2', 'other']
+ENHANCED_FIELDS = ['primary_gas_concentration', 'secondary_gas_concentration', 'remaining_gas_concentration']
+
+# Service classes instantiated inside the child processes
+SERVICE_CLASSES = {
+    'ni_daq': ('services.ni_daq', 'NIDAQService'),
+    'pico_tc08': ('services.pico_tc08', 'PicoTC08Service'),
+    'bga244': ('services.bga244', 'BGA244Service'),
+    'cvm24p': ('services.cvm24p', 'CVM24PService')
+}
+
+
+# Ring row layouts: values a service publishes (child) and how they are restored into state (parent)
+def _pack_ni_daq(state) -> List[float]:
+    return list(state.pressure_values) + [state.current_value, state.flowrate_value]
+
+
+def _sample_ni_daq(values, state) -> List[Any]:
+    return values[:8].tolist()
+
+
+def _unpack_ni_daq(values, state):
+    state.update_sensor_values(pressure_values=values[:6].tolist(),
+                               current_value=float(values[6]),
+                               flowrate_value=float(values[7]))
+
+
+def _pack_pico_tc08(state) -> List[float]:
+    return list(state.temperature_values) + [state.temperature_device_time]
+
+
+def _pack_pico_tc08_sample(values, state) -> List[float]:
+    return list(values) + [state.temperature_device_time]
+
+
+def _sample_pico_tc08(values, state) -> List[Any]:
+    return values[:8].tolist()
+
+
+def _unpack_pico_tc08(values, state):
+    state.update_sensor_values(temperature_values=values[:8].tolist(),
+                               temperature_device_time=float(values[8]))
+
+
+def _pack_bga244(state) -> List[float]:
+    row = []
+    for legacy, enhanced in zip(state.gas_concentrations, state.enhanced_gas_data):
+        row.extend(legacy.get(gas, 0.0) for gas in LEGACY_GASES)
+        row.extend(enhanced.get(field, 0.0) for field in ENHANCED_FIELDS)
+    return row
+
+
+def _bga244_readings(values, state):
+    """Legacy and enhanced gas readings for one ring row"""
+    device_config = get_device_config()
+    legacy_readings = []
+    enhanced_readings = []
+    
+    for i, unit_id in enumerate(BGA_UNITS):
+        unit_values = values[i * 7:(i + 1) * 7].tolist()
+        gas_config = device_config.get_bga_gas_config(unit_id, state.purge_mode)
+        
+        legacy_readings.append(dict(zip(LEGACY_GASES, unit_values[:4])))
+        enhanced = {
+            'primary_gas': gas_config.get('primary_gas', 'H2'),
+            'secondary_gas': gas_config.get('secondary_gas', 'O2'),
+            'remaining_gas': gas_config.get('remaining_gas', 'N2')
+        }
+        enhanced.update(zip(ENHANCED_FIELDS, unit_values[4:]))
+        enhanced_readings.append(enhanced)
+    
+    return legacy_readings, enhanced_readings
+
+
+def _sample_bga244(values, state) -> List[Any]:
+    return gas_sample_values(_bga244_readings(values, state)[1], state.purge_mode)
+
+
+def _unpack_bga244(values, state):
+    legacy_readings, enhanced_readings = _bga244_readings(values, state)
+    state.update_sensor_values(gas_concentrations=legacy_readings, enhanced_gas_data=enhanced_readings)
+
+
+def _pack_cvm24p(state) -> List[float]:
+    return list(state.cell_voltages)
+
+
+def _sample_cvm24p(values, state) -> List[Any]:
+    return values.tolist()
+
+
+def _unpack_cvm24p(values, state):
+    state.update_sensor_values(cell_voltages=values.tolist())
+
+
+# 'sample' turns a ring row into the values the service itself would publish to sample listeners;
+# 'pack_sample' (optional) writes one ring row per published sample instead of one per poll,
+# for services that drain several device-timestamped readings in a single poll
+RING_LAYOUTS = {
+    'ni_daq': {'width': 8, 'pack': _pack_ni_daq, 'unpack': _unpack_ni_daq, 'sample': _sample_ni_daq},
+    'pico_tc08': {'width': 9, 'pack': _pack_pico_tc08, 'unpack': _unpack_pico_tc08, 'sample': _sample_pico_tc08,
+                  'pack_sample': _pack_pico_tc08_sample},
+    'bga244': {'width': 21, 'pack': _pack_bga244, 'unpack': _unpack_bga244, 'sample': _sample_bga244},
+    'cvm24p': {'width': 120, 'pack': _pack_cvm24p, 'unpack': _unpack_cvm24p, 'sample': _sample_cvm24p}
+}
+
+
+def _service_process_main(name: str, ring_name: str, conn, config: Dict[str, Any], epoch_ns: int):
+    """
+    Child process entry point: own one device service and publish its samples
+    
+    The command pipe doubles as the sleep between polls, so valve/pump/purge/E-stop
+    commands are applied as soon as they arrive instead of at the next sample.
+    """
+    # Use the parent's configuration (including any runtime overrides) and deadline grid
+    get_device_config().config = config
+    get_scheduler().epoch_ns = epoch_ns
+    
+    state = get_global_state()
+    layout = RING_LAYOUTS[name]
+    module_name, class_name = SERVICE_CLASSES[name]
+    service = getattr(importlib.import_module(module_name), class_name)()
+    ring = SharedRingBuffer.attach(ring_name)
+    
+    # Sample blocks published by the service during one poll (only for per-sample layouts)
+    published = []
+    if 'pack_sample' in layout:
+        state.add_sample_listener(lambda stream, samples: published.extend(samples))
+    
+    try:
+        connected = service.connect()
+        conn.send(('ready', connected, {
+            'sample_rate': service.sample_rate,
+            'bga_connections': dict(state.bga_connections)
+        }))
+        if not connected:
+            return
+        
+        if hasattr(service, 'poll_once_async'):
+            def poll():
+                service.loop.run_until_complete(service.poll_once_async())
+        else:
+            poll = service.poll_once
+        
+        deadline = None
+        next_run = None  # None while not polling
+        
+        while True:
+            timeout = None if next_run is None else max(next_run - time.monotonic(), 0.0)
+            if conn.poll(timeout):
+                command = conn.recv()
+                if command[0] == 'shutdown':
+                    break
+                if command[0] == 'start':
+                    started = service.start_polling(threaded=False)
+                    deadline = get_scheduler().create_task(name, service.sample_rate)
+                    next_run = time.monotonic() if started else None
+                    conn.send(('started', started, None))
+                elif command[0] == 'stop':
+                    service.stop_polling()
+                    next_run = None
+                else:
+                    _apply_command(name, service, state, command)
+                continue
+            
+            poll()
+            if 'pack_sample' in layout:
+                # Ring timestamps are monotonic seconds - convert from the samples' epoch nanoseconds
+                offset_s = time.monotonic() - time.time_ns() / 1e9
+                for timestamp_ns, values in published:
+                    ring.write(layout['pack_sample'](values, state), timestamp_ns / 1e9 + offset_s)
+                published.clear()
+                ring.touch()  # Rows carry device sample times; the heartbeat is this poll
+            else:
+                ring.write(layout['pack'](state), service.last_sample_time)
+            next_run = time.monotonic() + deadline.tick()
+    
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except Exception as e:
+        log.error("Acquisition", f"{name} process error: {e}")
+        try:
+            conn.send(('error', str(e), None))
+        except Exception:
+            pass
+    finally:
+        try:
+            if service.polling:
+                service.stop_polling()
+            if service.connected:
+                service.disconnect()
+        finally:
+            ring.close()
+
+
+def _actuator_snapshot(state) -> Dict[str, Any]:
+    """Full actuator state sent to the NI DAQ process (idempotent, so ordering never matters)"""
+    with state._lock:
+        return {
+            'valve_states': list(state.valve_states),
+            'pump_state': state.pump_state,
+            'koh_pump_state': state.koh_pump_state
+        }
+
+
+def _apply_command(name: str, service, state, command):
+    """Apply a control command received from the main process"""
+    kind, payload = command
+    
+    if kind == 'actuators':
+        with state._lock:
+            state.valve_states = list(payload['valve_states'])
+            state.pump_state = payload['pump_state']
+            state.koh_pump_state = payload['koh_pump_state']
+        if name == 'ni_daq':
+            service._update_digital_outputs()
+    elif kind == 'estop':
+        with state._lock:
+            state.valve_states = [False] * len(state.valve_states)
+            state.pump_state = False
+            state.koh_pump_state = False
+        if name == 'ni_daq':
+            service._update_digital_outputs()
+    elif kind == 'purge' and hasattr(service, 'set_purge_mode'):
+        service.set_purge_mode(payload)
+    elif kind == 'visible_temperature_channels':
+        state.visible_temperature_channels = set(payload)
+
+
+class ServiceProcessProxy:
+    """Main-process stand-in for a service running in a child process
+    
+    Exposes the attributes ControllerManager, the supervisor and the UI use on real services
+    (connected, polling, sample_rate, last_sample_time, last_error, set_purge_mode, get_status).
+    """
+    
+    READY_TIMEOUT = 60.0
+    
+    def __init__(self, name: str, context, ring_capacity: int = 1024):
+        self.name = name
+        self.state = get_global_state()
+        self.device_config = get_device_config()
+        self.sample_rate = self.device_config.get_sample_rate(name) if name != 'ni_daq' else 100
+        self.ring_capacity = ring_capacity
+        self._context = context
+        self._lock = threading.Lock()
+        self._recv_lock = threading.Lock()
+        self._inbox = deque()  # Replies read while looking for errors, kept for _receive
+        
+        self.process = None
+        self.ring = None
+        self.conn = None
+        self.connected = False
+        self.polling = False
+        self.purge_mode = False
+        self._last_error = None
+        self._start_time = None
+        self.last_count = 0  # ring rows already mirrored into state
+    
+    @property
+    def last_sample_time(self) -> Optional[float]:
+        """Heartbeat for the supervisor: monotonic time of the child's latest poll"""
+        heartbeat = self.ring.heartbeat if self.ring else None
+        return heartbeat if heartbeat is not None else self._start_time
+    
+    @property
+    def last_error(self) -> Optional[str]:
+        """Latest error reported by the child process (or by the pipe itself)"""
+        if self.conn and self._recv_lock.acquire(blocking=False):
+            try:
+                while self.conn.poll(0):
+                    message = self.conn.recv()
+                    if message[0] == 'error':
+                        self._last_error = message[1]
+                    else:
+                        self._inbox.append(message)  # A command's reply, still awaited by _receive
+            except (EOFError, OSError):
+                self._last_error = self._last_error or "service process exited"
+            finally:
+                self._recv_lock.release()
+        return self._last_error
+    
+    def _send(self, command) -> bool:
+        with self._lock:
+            try:
+                self.conn.send(command)
+                return True
+            except Exception as e:
+                self._last_error = str(e)
+                return False
+    
+    def _receive(self, expected: str, timeout: float):
+        """Wait for a reply of the expected kind (errors reported by the child are recorded)"""
+        deadline = time.monotonic() + timeout
+        with self._recv_lock:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    if self._inbox:
+                        kind, value, info = self._inbox.popleft()
+                    elif remaining <= 0 or not self.conn.poll(remaining):
+                        return None
+                    else:
+                        kind, value, info = self.conn.recv()
+                except (EOFError, OSError):
+                    self._last_error = self._last_error or "service process exited"
+                    return None
+                if kind == 'error':
+                    self._last_error = value
+                    return None
+                if kind == expected:
+                    return value, info
+    
+    def connect(self, loop=None) -> bool:
+        """Spawn the child process and wait until its device is connected"""
+        self.ring = SharedRingBuffer.create(RING_LAYOUTS[self.name]['width'], self.ring_capacity)
+        self.conn, child_conn = self._context.Pipe()
+        self._inbox.clear()
+        self.process = self._context.Process(
+            target=_service_process_main,
+            args=(self.name, self.ring.name, child_conn, self.device_config.config, get_scheduler().epoch_ns),
+            daemon=True,
+            name=f"acq_{self.name}"
+        )
+        self.process.start()
+        child_conn.close()
+        
+        reply = self._receive('ready', self.READY_TIMEOUT)
+        if not reply or not reply[0]:
+            self._shutdown_process()
+            return False
+        
+        self.sample_rate = reply[1]['sample_rate']
+        self.connected = True
+        self.state.update_connection_status(self.name, True)
+        if self.name == 'bga244':
+            for unit, unit_connected in reply[1]['bga_connections'].items():
+                self.state.update_connection_status(unit, unit_connected)
+        return True
+    
+    def disconnect(self):
+        """Stop the child process and release the ring"""
+        self._shutdown_process()
+        self.connected = False
+        self.polling = False
+        self.state.update_connection_status(self.name, False)
+        if self.name == 'bga244':
+            for unit in self.state.bga_connections:
+                self.state.update_connection_status(unit, False)
+    
+    def _shutdown_process(self):
+        if self.process:
+            self._send(('shutdown', None))
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+        if self.conn:
+            self.conn.close()
+        if self.ring:
+            self.ring.close()
+        self.process = None
+        self.conn = None
+        self.ring = None
+    
+    def start_polling(self, threaded: bool = True) -> bool:
+        """Start the child's acquisition loop"""
+        if not self.connected:
+            return False
+        if self.polling:
+            return True
+        
+        self._start_time = time.monotonic()
+        if self.name == 'ni_daq':
+            self._send(('actuators', _actuator_snapshot(self.state)))
+        if not self._send(('start', None)):
+            return False
+        reply = self._receive('started', 10.0)
+        self.polling = bool(reply and reply[0])
+        return self.polling
+    
+    def stop_polling(self):
+        """Pause the child's acquisition loop"""
+        if self.polling:
+            self._send(('stop', None))
+            self.polling = False
+    
+    def set_purge_mode(self, purge_enabled: bool):
+        """Forward purge mode to the BGA244 process"""
+        self.purge_mode = purge_enabled
+        self._send(('purge', purge_enabled))
+    
+    def send_command(self, kind: str, payload: Any = None) -> bool:
+        """Send a control command to the child process"""
+        return self.connected and self._send((kind, payload))
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get service status"""
+        return {
+            'connected': self.connected,
+            'polling': self.polling,
+            'process_id': self.process.pid if self.process else None,
+            'sample_rate': self.sample_rate,
+            'samples_published': self.ring.count if self.ring else 0,
+            'last_error': self._last_error
+        }
+
+
+class ProcessAcquisition:
+    """Owns the service processes, mirrors their rings into global state and routes commands"""
+    
+    def __init__(self, mirror_rate: float = 20.0, ring_capacity: int = 1024):
+        self.state = get_global_state()
+        self.mirror_rate = mirror_rate
+        self.ring_capacity = ring_capacity
+        
+        # Spawn everywhere so children never inherit locks or threads held by the UI process
+        self._context = mp.get_context('spawn')
+        self.proxies: Dict[str, ServiceProcessProxy] = {}
+        
+        self._mirror_thread = None
+        self._stop_event = threading.Event()
+        self._visible_temperature_channels = None
+    
+    def create_proxy(self, name: str) -> ServiceProcessProxy:
+        """Create the proxy for a service (replaces an earlier proxy after a reconnect)"""
+        proxy = ServiceProcessProxy(name, self._context, self.ring_capacity)
+        self.proxies[name] = proxy
+        return proxy
+    
+    def start(self):
+        """Start mirroring rings into state and forwarding actuator changes"""
+        self._stop_event.clear()
+        self.state.add_actuator_listener(self._on_actuator_change)
+        self._mirror_thread = threading.Thread(target=self._mirror_loop, daemon=True, name="ring_mirror")
+        self._mirror_thread.start()
+        log.info("Acquisition", f"Process acquisition active (state mirrored at {self.mirror_rate:g} Hz)")
+    
+    def stop(self):
+        """Stop mirroring (service processes are stopped through their proxies)"""
+        self._stop_event.set()
+        self.state.remove_actuator_listener(self._on_actuator_change)
+        if self._mirror_thread and self._mirror_thread.is_alive():
+            self._mirror_thread.join(timeout=2.0)
+        self.proxies.clear()
+    
+    def emergency_stop(self):
+        """De-energize outputs in every service process ahead of the normal shutdown"""
+        for proxy in list(self.proxies.values()):
+            proxy.send_command('estop')
+        
+        # The processes update only their own state; record the closures in this one
+        self.state.set_outputs_safe()
+    
+    def _publish_ring_rows(self, name: str, proxy: ServiceProcessProxy):
+        """Mirror the newest row into state and publish all new rows as one sample block"""
+        count, rows = proxy.ring.read_since(proxy.last_count)
+        if count == proxy.last_count or not len(rows):
+            return
+        proxy.last_count = count
+        
+        layout = RING_LAYOUTS[name]
+        layout['unpack'](rows[-1][1:], self.state)
+        
+        # Ring timestamps are monotonic seconds - convert to epoch nanoseconds
+        offset_ns = time.time_ns() - int(time.monotonic() * 1e9)
+        self.state.publish_samples(name, [
+            (offset_ns + int(row[0] * 1e9), layout['sample'](row[1:], self.state)) for row in rows
+        ])
+    
+    def _on_actuator_change(self):
+        """Push the full actuator snapshot to the NI DAQ process"""
+        proxy = self.proxies.get('ni_daq')
+        if proxy:
+            proxy.send_command('actuators', _actuator_snapshot(self.state))
+    
+    def _mirror_loop(self):
+        """Copy the newest row of each ring into global state for the dashboard and logger
+        
+        When sample listeners are registered (native-rate logging), every row written since
+        the last pass is also published, so nothing is lost to the mirror rate.
+        """
+        period = 1.0 / self.mirror_rate
+        while not self._stop_event.wait(period):
+            for name, proxy in list(self.proxies.items()):
+                try:
+                    if not proxy.ring:
+                        continue
+                    if self.state._sample_listeners:
+                        self._publish_ring_rows(name, proxy)
+                        continue
+                    latest = proxy.ring.read_latest()
+                    if latest and latest[0] != proxy.last_count:
+                        proxy.last_count = latest[0]
+                        RING_LAYOUTS[name]['unpack'](latest[1][1:], self.state)
+                except Exception as e:
+                    log.error("Acquisition", f"Mirror error for {name}: {e}")
+            
+            # Thermocouple gating follows the channels the operator has visible
+            visible = frozenset(self.state.visible_temperature_channels)
+            if visible != self._visible_temperature_channels and 'pico_tc08' in self.proxies:
+                if self.proxies['pico_tc08'].send_command('visible_temperature_channels', sorted(visible)):
+                    self._visible_temperature_channels = visible
@@ -3,6 +3,7 @@
 Control buttons for AWE test rig dashboard
 """
 
+import threading
 import tkinter as tk
 from tkinter import ttk
 from core.state import get_global_state
@@ -649,11 +650,16 @@ class ControlPanel:
     
     def _on_connect_click(self):
         """Handle Connect button click"""
-        if not self.controller.is_all_connected():
+        if self.controller.services_starting:
+            # Startup already in progress - ignore repeated clicks
+            return
+        
+        if not self.controller.services_running:
             log.info("UI", "Connect button clicked")
             
-            # Use ControllerManager to start all services
-            success = self.controller.start_all_services()
+            # Start services off the Tk thread so the UI stays responsive while devices connect
+            self.connect_button.configure(text="Connecting...", state='disabled')
+            threading.Thread(target=self.controller.start_all_services, daemon=True).start()
             
             # Service connection messages are handled by individual services
         else:
@@ -696,9 +702,8 @@ class ControlPanel:
         if not self.state.test_paused:
             log.info("UI", "Pause button clicked")
             
-            # Update GlobalState and pause timer
-            with self.state._lock:
-                self.state.test_paused = True
+            # Update GlobalState (recorded as a pause event) and pause timer
+            self.state.update_test_status(paused=True)
             
             self.timer.pause()
             log.success("UI", "Test paused", [
@@ -708,9 +713,8 @@ class ControlPanel:
         else:
             log.info("UI", "Resume button clicked")
             
-            # Update GlobalState and resume timer
-            with self.state._lock:
-                self.state.test_paused = False
+            # Update GlobalState (recorded as a resume event) and resume timer
+            self.state.update_test_status(paused=False)
             
             self.timer.resume()
             log.success("UI", "Test resumed", [
@@ -735,8 +739,7 @@ class ControlPanel:
         log.info("UI", "PURGE button clicked")
         
         # Update GlobalState
-        with self.state._lock:
-            self.state.purge_mode = new_purge
+        self.state.set_purge_mode(new_purge)
         
         # Call BGA244 service to actually set purge mode
         try:
@@ -761,13 +764,16 @@ class ControlPanel:
     def _update_ui(self):
         """Update UI elements based on current state"""
         # Update button states based on ControllerManager and GlobalState
-        all_connected = self.controller.is_all_connected()
+        # (services_running also covers degraded mode where only some devices came up)
+        all_connected = self.controller.services_running
         
         # Connect button
-        if all_connected:
-            self.connect_button.configure(text="Disconnect")
+        if self.controller.services_starting:
+            self.connect_button.configure(text="Connecting...", state='disabled')
+        elif all_connected:
+            self.connect_button.configure(text="Disconnect", state='normal')
         else:
-            self.connect_button.configure(text="Connect")
+            self.connect_button.configure(text="Connect", state='normal')
         
         # Start Test button - only enabled when connected
         if all_connected:
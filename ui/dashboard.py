@@ -13,6 +13,7 @@ Valve mapping (matches NI cDAQ hardware configuration):
 import tkinter as tk
 from tkinter import ttk, messagebox, PhotoImage
 import os
+from typing import Any, Dict
 from .controls import ControlPanel
 from .status_indicators import StatusIndicators
 from .plots import PressurePlot, VoltagePlot, TemperaturePlot, CurrentPlot
@@ -445,6 +446,12 @@ class Dashboard:
         if self.current_plot:
             self.current_plot.reset()
     
+    def get_plot_frame_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get frame time statistics per live plot (see LivePlot.get_frame_stats)"""
+        plots = {'pressure': self.pressure_plot, 'voltage': self.voltage_plot,
+                 'temperature': self.temperature_plot, 'current': self.current_plot}
+        return {name: plot.get_frame_stats() for name, plot in plots.items() if plot}
+    
     def _start_status_updates(self):
         """Start periodic status updates"""
         self._update_status_indicators()
@@ -469,6 +476,8 @@ class Dashboard:
         bga_service_info = controller.services.get('bga244')
         bga_service = bga_service_info['service'] if bga_service_info else None
         
+        # Stale: the supervisor saw no new samples (values shown are the last good ones)
+        bga_stale = self.state.is_device_stale('bga244')
         if bga_service and hasattr(bga_service, 'get_individual_connection_status'):
             individual_bga_status = bga_service.get_individual_connection_status()
             
@@ -477,7 +486,7 @@ class Dashboard:
                 device_key = f'bga244_{i+1}'
                 if device_key in self.status_indicators.device_status:
                     info = connection_info[device_key] if connected else ""
-                    self.status_indicators.update_device_status(device_key, connected, info)
+                    self.status_indicators.update_device_status(device_key, connected, info, bga_stale)
         else:
             # Fallback to combined BGA status if individual status not available
             bga_connected = self.state.connections.get('bga244', False)
@@ -485,12 +494,13 @@ class Dashboard:
                 device_key = f'bga244_{i}'
                 if device_key in self.status_indicators.device_status:
                     info = connection_info[device_key] if bga_connected else ""
-                    self.status_indicators.update_device_status(device_key, bga_connected, info)
+                    self.status_indicators.update_device_status(device_key, bga_connected, info, bga_stale)
         
         # Update other devices normally
         for device in ['ni_daq', 'pico_tc08', 'cvm24p']:
             connected = self.state.connections[device]
-            self.status_indicators.update_device_status(device, connected, connection_info[device])
+            self.status_indicators.update_device_status(device, connected, connection_info[device],
+                                                        self.state.is_device_stale(device))
         
         # Update valve button states and colors
         for i, valve_button in enumerate(self.valve_labels):
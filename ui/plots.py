@@ -1,10 +1,6 @@
 """
 Real-time plotting components for AWE test rig dashboard
-Includes pressure, gas concentration, voltage, and temperature plots
-
-TEMPORARY MODIFICATION: VoltagePlot shows channels 96-110 individually
-TO REVERT: Search for "TEMPORARY CHANGE" and "ORIGINAL CODE TO RESTORE" comments
-and replace the modified sections with the original group averaging code.
+Includes pressure, gas concentration, voltage, temperature and current plots (LivePlot subclasses)
 """
 
 import tkinter as tk
@@ -12,81 +8,468 @@ from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-import matplotlib.animation as animation
 from collections import deque
+import math
+import threading
 import time
-from typing import List, Tuple, Dict
+from typing import Any, Hashable, List, Optional, Sequence, Tuple, Dict
+import numpy as np
+from core.decimation import LevelOfDetailHistory, axes_target_points, decimate
 from core.state import get_global_state
+from core.timer import get_scheduler
 from config.device_config import get_device_config
+from utils.logger import log
 
 
-class PressurePlot:
-    """Live pressure and gas concentration vs time plot"""
+def decimate_history(history: LevelOfDetailHistory, columns: Sequence[int],
+                     n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The full history of the given channels, decimated to n_out points
+    
+    The level-of-detail snapshot is a few thousand rows whatever the test length and all
+    channels are reduced in one vectorized pass (core.decimation), so preparation cost
+    stays flat however long the test runs.
+    
+    Returns:
+        (times, values) with values (rows, len(columns)); times is (rows,) or, for LTTB,
+        (rows, len(columns))
+    """
+    x, y = history.snapshot(columns)
+    return decimate(x, y, n_out, get_device_config().get_plot_decimation_config()['method'])
+
+
+# Frame times kept per plot for get_frame_stats()
+FRAME_STATS_WINDOW = 100
+
+# Minimum seconds between slow-frame warnings from one plot
+SLOW_FRAME_WARNING_INTERVAL = 60.0
+
+
+class PlotFrame:
+    """Ready-to-draw data for one live plot, prepared by the PlotDataWorker
+    
+    Never modified once published, so the Tk thread can read it without a lock.
+    """
+    
+    __slots__ = ('seq', 'relative_time', 'shown', 'x', 'y', 'prepared_at', 'prepare_seconds')
+    
+    def __init__(self, seq: int, relative_time: float, shown: Tuple[Hashable, ...], x: np.ndarray,
+                 y: np.ndarray, prepared_at: float, prepare_seconds: float):
+        self.seq = seq
+        self.relative_time = relative_time
+        self.shown = shown
+        self.x = x
+        self.y = y
+        self.prepared_at = prepared_at  # time.perf_counter() at publication
+        self.prepare_seconds = prepare_seconds
+
+
+class PlotDataWorker:
+    """Background thread that prepares the frames of every registered live plot
+    
+    At a steady cadence (paced by the shared deadline scheduler) it reads GlobalState,
+    appends to each plot's history and decimates the visible series, then publishes the
+    result with a single attribute assignment (LivePlot.prepare_frame). The Tk thread only
+    applies the newest frame and draws, so button handling such as E-stop never waits
+    behind sample collection or decimation.
+    """
+    
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Frames prepared per second
+        """
+        self.rate = rate
+        self._plots: List['LivePlot'] = []  # Replaced, never mutated, so the worker iterates it without a lock
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.deadline = None
+        self.errors = 0
+        self._last_error_log = 0.0
+    
+    def register(self, plot: 'LivePlot'):
+        """Prepare frames for plot (starts the thread with the first plot)"""
+        with self._lock:
+            self._plots = self._plots + [plot]
+            if self._thread is None:
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                                name="PlotDataWorker", daemon=True)
+                self._thread.start()
+    
+    def unregister(self, plot: 'LivePlot'):
+        """Stop preparing frames for plot (stops the thread with the last plot)"""
+        with self._lock:
+            self._plots = [registered for registered in self._plots if registered is not plot]
+            if not self._plots and self._thread is not None:
+                self._stop_event.set()
+                self._thread = None
+    
+    def _run(self, stop_event: threading.Event):
+        self.deadline = get_scheduler().create_task('live_plots', self.rate)
+        while not stop_event.is_set():
+            self.prepare_all()
+            if not self.deadline.wait(stop_event):
+                break
     
-    def __init__(self, parent_frame, max_points: int = 300):
+    def prepare_all(self):
+        """Prepare one frame for every registered plot"""
+        for plot in self._plots:
+            try:
+                plot.prepare_frame()
+            except Exception as e:
+                # One failing plot must not stop the others; the next tick retries
+                self.errors += 1
+                now = time.monotonic()
+                if now - self._last_error_log > SLOW_FRAME_WARNING_INTERVAL:
+                    self._last_error_log = now
+                    log.error("Plots", f"Preparing {type(plot).__name__} frame failed: {e}",
+                              [f"→ Errors so far: {self.errors}"])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker state, error count and deadline statistics"""
+        return {
+            'running': self._thread is not None,
+            'plots': len(self._plots),
+            'errors': self.errors,
+            'deadline': self.deadline.get_stats() if self.deadline else None
+        }
+
+
+# Global instance
+_plot_worker = None
+
+
+def get_plot_worker() -> PlotDataWorker:
+    """Get the shared live plot data worker"""
+    global _plot_worker
+    if _plot_worker is None:
+        _plot_worker = PlotDataWorker(get_device_config().get_live_plot_config()['update_rate'])
+    return _plot_worker
+
+
+class LivePlot:
+    """Base for the live time plots: persistent line artists redrawn by blitting
+    
+    Each series gets one Line2D, created once and marked animated, so full figure draws
+    (title, labels, grid, ticks, legend) only happen when the visible channels or the
+    x-limits change; every other frame restores the cached background, draws the lines
+    with set_data and blits. Subclasses define the series and how samples are collected.
+    
+    Samples are collected and decimated by the PlotDataWorker thread (prepare_frame); the
+    Tk timer only applies the newest prepared frame, within system.live_plots.frame_budget_ms.
+    """
+    
+    title = ""
+    ylabel = ""
+    ylim = (0, 1)
+    empty_message = "No channels selected"
+    
+    def __init__(self, parent_frame, max_points: Optional[int] = None):
+        """
+        Args:
+            parent_frame: Tk container for the canvas
+            max_points: Recent samples kept at full resolution (older history is kept as
+                        min/max tiers); defaults to system.plot_decimation.history_raw_points
+        """
         self.parent_frame = parent_frame
         self.state = get_global_state()
         self.device_config = get_device_config()
-        self.max_points = max_points
-        
-        # Data storage - store ALL pressure/gas data continuously
-        self.time_data = deque()  # Store entire test history
-        self.all_pressure_data = {}  # Store data for all 5 pressure sensors continuously
-        self.all_gas_data = {}  # Store data for all 3 gas analyzers continuously
-        
-        # Initialize deques for all 6 pressure sensors
-        for i in range(6):
-            self.all_pressure_data[i] = deque()
-            
-        # Initialize deques for all 3 gas concentration channels
-        for i in range(3):
-            self.all_gas_data[i] = deque()
-        
-        self.last_update_time = 0
-        
-        # Create the matplotlib figure
+        decimation = self.device_config.get_plot_decimation_config()
+        live_plots = self.device_config.get_live_plot_config()
+        self.max_points = max_points or decimation['history_raw_points']
+        self.update_interval = 1.0 / live_plots['update_rate']
+        self.frame_budget = live_plots['frame_budget_ms'] / 1000.0
+        self.series_keys: List[Hashable] = []
+        
+        # Create the matplotlib figure with its static decoration
         self.fig = Figure(figsize=(6, 4), dpi=80, facecolor='white')
         self.ax = self.fig.add_subplot(111)
-        
-        # Get colormaps for different data types
-        self.pressure_colors = plt.cm.get_cmap('Set1', 6)  # 6 pressure channels
-        self.gas_colors = plt.cm.get_cmap('Set2', 3)  # 3 gas channels
+        self.ax.set_title(self.title, fontsize=12, fontweight='bold')
+        self.ax.set_xlabel("Time (s)", fontsize=10)
+        self.ax.set_ylabel(self.ylabel, fontsize=10)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.set_xlim(0, 120)
+        self.ax.set_ylim(*self.ylim)
+        self.message = self.ax.text(0.5, 0.5, "Test not started", ha='center', va='center',
+                                    transform=self.ax.transAxes)
+        
+        # One persistent line per series (hidden until visible and holding data)
+        self.lines: Dict[Hashable, Any] = {}
+        self._create_series()
+        
+        # Entire test history of every series, visible or not, in bounded memory
+        # (written by the worker; the lock keeps reset() from clearing it mid-frame)
+        self.history = LevelOfDetailHistory(len(self.series_keys), self.max_points,
+                                            decimation['history_tier_points'], decimation['history_factor'])
+        self._history_lock = threading.Lock()
+        for line in self.lines.values():
+            line.set_animated(True)
+            line.set_visible(False)
+        self._shown = None  # Series the legend was built for
+        self._background = None
+        
+        # Frame hand-over: the worker replaces _pending, the Tk thread applies newer frames
+        self._pending: Optional[PlotFrame] = None
+        self._prepared_seq = 0
+        self._applied_seq = 0
+        self._skip_ticks = 0
+        self._target_points = axes_target_points(self.ax, decimation['points_per_pixel'])
+        
+        # Frame timing
+        self.frame_times = deque(maxlen=FRAME_STATS_WINDOW)
+        self.prepare_times = deque(maxlen=FRAME_STATS_WINDOW)
+        self.frame_ages = deque(maxlen=FRAME_STATS_WINDOW)
+        self.frames = 0
+        self.full_redraws = 0
+        self.slow_frames = 0
+        self.skipped_frames = 0
+        self._last_slow_warning = 0.0
         
         # Create canvas and add to parent frame
         self.canvas = FigureCanvasTkAgg(self.fig, parent_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         
-        # Start animation
-        self.animation = animation.FuncAnimation(
-            self.fig, self._update_plot, interval=100, blit=False, cache_frame_data=False
-        )
+        # Start updates on a canvas timer (FuncAnimation would request a full draw after
+        # every frame; blitting is done in _update_plot instead)
+        self.timer = self.canvas.new_timer(interval=int(self.update_interval * 1000))
+        self.timer.add_callback(self._update_plot, None)
+        self.timer.start()
         
-        # Pack the canvas
         self.canvas.draw()
+        get_plot_worker().register(self)
+    
+    # Subclass hooks (called from the worker thread)
+    def _create_series(self):
+        """Create the series (self._add_line for each, in sample order)"""
+        raise NotImplementedError
+    
+    def _read_sample(self) -> List[float]:
+        """Current GlobalState values of every series (visible or not), in series order"""
+        raise NotImplementedError
+    
+    def _visible_series(self) -> List[Hashable]:
+        """Series keys currently selected for display, in legend order"""
+        raise NotImplementedError
+    
+    def _legend_style(self, count: int) -> Dict[str, Any]:
+        """Legend keyword arguments for count entries"""
+        return {'fontsize': 10, 'ncol': 1}
+    
+    def _add_line(self, key: Hashable, **style):
+        """Create the persistent (empty) line for a series"""
+        self.series_keys.append(key)
+        self.lines[key] = self.ax.plot([], [], **style)[0]
+    
+    # Data preparation (PlotDataWorker thread)
+    def prepare_frame(self) -> bool:
+        """
+        Record the current sample and publish the decimated visible history as a PlotFrame
+        
+        Returns:
+            True if a frame was published
+        """
+        # Check test states
+        if self.state.emergency_stop or not self.state.test_running or self.state.test_paused:
+            return False
+        
+        started = time.perf_counter()
+        relative_time = self.state.timer_value
+        sample = self._read_sample()
+        shown = tuple(self._visible_series())
+        columns = [self.series_keys.index(key) for key in shown]
+        with self._history_lock:
+            self.history.append(relative_time, sample)
+            
+            # Decimate the FULL history of the visible series to the plot width in one pass
+            x, y = decimate_history(self.history, columns, self._target_points)
+            
+            # Publishing is one reference assignment (atomic under the GIL): the Tk thread
+            # sees either the previous frame or this one, never a partial update
+            self._prepared_seq += 1
+            now = time.perf_counter()
+            self._pending = PlotFrame(self._prepared_seq, relative_time, shown, x, y, now, now - started)
+        return True
+    
+    # Drawing (Tk thread)
+    def _on_draw(self, event):
+        """After every full draw: cache the static background, then draw the lines on top"""
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        
+        # Full draws follow resizes; the worker decimates to the current width
+        self._target_points = axes_target_points(
+            self.ax, self.device_config.get_plot_decimation_config()['points_per_pixel'])
+        self._draw_lines()
+    
+    def _draw_lines(self):
+        for line in self.lines.values():
+            if line.get_visible():
+                self.ax.draw_artist(line)
+    
+    def _update_layout(self, shown: Tuple[Hashable, ...], relative_time: float) -> bool:
+        """
+        Update the static layers (x-limits, legend, message) if needed
+        
+        Returns:
+            True if the background must be re-rendered
+        """
+        changed = False
+        
+        # The x-axis extends in steps (to 1.2x the elapsed time) instead of every frame
+        if relative_time > self.ax.get_xlim()[1]:
+            self.ax.set_xlim(0, max(relative_time * 1.2, 120))
+            changed = True
+        
+        if shown != self._shown:
+            legend = self.ax.get_legend()
+            if legend:
+                legend.remove()
+            if shown:
+                legend = self.ax.legend(handles=[self.lines[key] for key in shown], loc='upper right',
+                                        **self._legend_style(len(shown)))
+                # Legend entries copy the lines' animated flag; they belong to the static layer
+                for handle in legend.legend_handles:
+                    handle.set_animated(False)
+            self.message.set_text(self.empty_message)
+            self.message.set_visible(not shown)
+            self._shown = shown
+            changed = True
+        
+        return changed
     
     def _update_plot(self, frame):
-        """Update plot with new data from GlobalState based on visible channels."""
-        current_time = time.time()
+        """Apply the newest frame prepared by the worker and draw it (Tk timer callback)"""
+        # Over-budget frames are paid for by skipping ticks, so drawing averages at most
+        # frame_budget per update interval and the event loop stays free for input
+        if self._skip_ticks:
+            self._skip_ticks -= 1
+            self.skipped_frames += 1
+            return
         
-        # Throttle updates
-        if current_time - self.last_update_time < 0.1:  # 10 Hz max update rate
+        plot_frame = self._pending
+        if plot_frame is None or plot_frame.seq == self._applied_seq:
             return
-        self.last_update_time = current_time
+        self._applied_seq = plot_frame.seq
+        
+        started = time.perf_counter()
+        x, y = plot_frame.x, plot_frame.y
+        for line in self.lines.values():
+            line.set_visible(False)
+        for column, key in enumerate(plot_frame.shown):
+            self.lines[key].set_data(x if x.ndim == 1 else x[:, column], y[:, column])
+            self.lines[key].set_visible(True)
+        
+        if self._update_layout(plot_frame.shown, plot_frame.relative_time) or self._background is None:
+            # Full draw; _on_draw re-caches the background and draws the lines
+            self.canvas.draw()
+            self.full_redraws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.fig.bbox)
+        
+        seconds = time.perf_counter() - started
+        if seconds > self.frame_budget:
+            self._skip_ticks = math.ceil(seconds / self.frame_budget) - 1
+        self._record_frame(seconds, plot_frame)
+    
+    def _record_frame(self, seconds: float, plot_frame: PlotFrame):
+        self.frame_times.append(seconds)
+        self.prepare_times.append(plot_frame.prepare_seconds)
+        self.frame_ages.append(time.perf_counter() - plot_frame.prepared_at)
+        self.frames += 1
+        if seconds > self.frame_budget:
+            self.slow_frames += 1
+            now = time.monotonic()
+            if now - self._last_slow_warning > SLOW_FRAME_WARNING_INTERVAL:
+                self._last_slow_warning = now
+                stats = self.get_frame_stats()
+                log.warning("Plots", f"{type(self).__name__} frame took {seconds * 1000:.0f} ms", [
+                    f"→ Budget: {self.frame_budget * 1000:.0f} ms, p95: {stats['p95_ms']:.1f} ms",
+                    f"→ Visible series: {len(self._shown or ())}, skipping {self._skip_ticks} update(s)"
+                ])
+    
+    def get_frame_stats(self) -> Dict[str, Any]:
+        """Get frame time statistics (over the last FRAME_STATS_WINDOW frames) and counters
+        
+        *_ms are Tk-thread apply-and-draw times; prepare_ms is the worker's time per frame
+        and age_ms how long a frame waited between publication and drawing.
+        """
+        times_ms = np.array(self.frame_times) * 1000 if self.frame_times else np.zeros(1)
+        prepare_ms = np.array(self.prepare_times) * 1000 if self.prepare_times else np.zeros(1)
+        age_ms = np.array(self.frame_ages) * 1000 if self.frame_ages else np.zeros(1)
+        return {
+            'frames': self.frames,
+            'full_redraws': self.full_redraws,
+            'slow_frames': self.slow_frames,
+            'skipped_frames': self.skipped_frames,
+            'last_ms': float(times_ms[-1]),
+            'mean_ms': float(times_ms.mean()),
+            'p95_ms': float(np.percentile(times_ms, 95)),
+            'max_ms': float(times_ms.max()),
+            'prepare_ms': float(prepare_ms.mean()),
+            'age_ms': float(age_ms.mean())
+        }
+    
+    def reset(self):
+        """Reset plot data"""
+        # Under the history lock no frame of the old data can be published afterwards
+        with self._history_lock:
+            self.history.clear()
+            self._pending = None
+        self._skip_ticks = 0
+        
+        # Back to the empty layout and redraw
+        for line in self.lines.values():
+            line.set_data([], [])
+            line.set_visible(False)
+        legend = self.ax.get_legend()
+        if legend:
+            legend.remove()
+        self._shown = None
+        self.ax.set_xlim(0, 120)
+        self.message.set_text("Test not started")
+        self.message.set_visible(True)
+        self.canvas.draw()
+    
+    def destroy(self):
+        """Clean up resources"""
+        get_plot_worker().unregister(self)
+        if hasattr(self, 'timer'):
+            self.timer.stop()
+        self.canvas.get_tk_widget().destroy()
 
-        # Check test states
-        if self.state.emergency_stop or not self.state.test_running or self.state.test_paused:
-            return
 
-        relative_time = self.state.timer_value
-        self.time_data.append(relative_time)
+class PressurePlot(LivePlot):
+    """Live pressure and gas concentration vs time plot"""
+    
+    title = "Pressure & Gas Concentrations vs Time"
+    ylabel = "Pressure (PSI) / Gas Fraction"
+    ylim = (0, 1)  # 0-1 range for mixed pressure/gas display
+    
+    def _create_series(self):
+        # Get colormaps for different data types
+        pressure_colors = plt.get_cmap('Set1', 6)  # 6 pressure channels
+        gas_colors = plt.get_cmap('Set2', 3)  # 3 gas channels
         
+        # Channel names (dynamically loaded from devices.yaml)
+        pressure_names = self.device_config.get_pressure_channel_names()  # Only pressure sensors
+        gas_names = self.device_config.get_bga244_unit_names()
+        
+        # All 6 pressure sensors and all 3 gas concentration channels, stored continuously
+        for i in range(6):
+            self._add_line(('pressure', i), color=pressure_colors(i), linewidth=2, linestyle='-',
+                           label=pressure_names[i] if i < len(pressure_names) else f"Pressure {i + 1}")
+        for i in range(3):
+            self._add_line(('gas', i), color=gas_colors(i), linewidth=1.5, alpha=0.8, linestyle='--',
+                           label=gas_names[i] if i < len(gas_names) else f"Gas {i + 1}")
+    
+    def _read_sample(self) -> List[float]:
         # CONTINUOUSLY store data for ALL pressure channels
         pressure_values = self.state.pressure_values
-        for i in range(6):
-            if len(pressure_values) > i:
-                self.all_pressure_data[i].append(pressure_values[i])
-            else:
-                self.all_pressure_data[i].append(0.0)
+        sample = [pressure_values[i] if len(pressure_values) > i else 0.0 for i in range(6)]
         
         # CONTINUOUSLY store data for ALL gas concentration channels
         gas_concentrations = self.state.gas_concentrations
@@ -97,7 +480,7 @@ class PressurePlot:
             # Use primary gas concentrations (convert to 0-1 range)
             for i in range(3):
                 primary_conc = enhanced_gas_data[i]['primary_gas_concentration'] if enhanced_gas_data[i]['primary_gas_concentration'] else 0.0
-                self.all_gas_data[i].append(primary_conc / 100.0)  # Convert percentage to fraction
+                sample.append(primary_conc / 100.0)  # Convert percentage to fraction
         else:
             # Fallback to legacy gas concentrations
             gas_values = [
@@ -105,513 +488,108 @@ class PressurePlot:
                 (gas_concentrations[1]['O2'] / 100.0) if len(gas_concentrations) > 1 else 0.0,
                 (gas_concentrations[2]['H2'] / 100.0) if len(gas_concentrations) > 2 else 0.0
             ]
-            for i in range(3):
-                self.all_gas_data[i].append(gas_values[i])
-        
-        # Get currently visible pressure channels
-        visible_pressure_channels = sorted(list(self.state.visible_pressure_channels))
-        visible_gas_channels = sorted(list(self.state.visible_gas_channels))
-        
-        # --- Redraw the entire plot for dynamic channel visibility ---
-        self.ax.clear()
-        
-        # Configure plot appearance
-        self.ax.set_title("Pressure & Gas Concentrations vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Pressure (PSI) / Gas Fraction", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-
-        # Channel names (dynamically loaded from devices.yaml)
-        pressure_names = self.device_config.get_pressure_channel_names()  # Only pressure sensors
-        gas_names = self.device_config.get_bga244_unit_names()
-        
-        has_visible_channels = False
-        
-        # Plot visible pressure channels
-        for channel_idx in visible_pressure_channels:
-            if self.time_data and self.all_pressure_data[channel_idx]:
-                time_list = list(self.time_data)
-                data_list = list(self.all_pressure_data[channel_idx])
-                
-                self.ax.plot(time_list, data_list, 
-                             color=self.pressure_colors(channel_idx), 
-                             linewidth=2, 
-                             label=pressure_names[channel_idx],
-                             linestyle='-')
-                has_visible_channels = True
-        
-        # Plot visible gas channels
-        for channel_idx in visible_gas_channels:
-            if self.time_data and self.all_gas_data[channel_idx]:
-                time_list = list(self.time_data)
-                data_list = list(self.all_gas_data[channel_idx])
-                
-                self.ax.plot(time_list, data_list, 
-                             color=self.gas_colors(channel_idx), 
-                             linewidth=1.5, 
-                             alpha=0.8,
-                             label=gas_names[channel_idx],
-                             linestyle='--')
-                has_visible_channels = True
-
-        if not has_visible_channels:
-            self.ax.text(0.5, 0.5, "No channels selected", ha='center', va='center', transform=self.ax.transAxes)
-
-        # Set axis limits
-        self.ax.set_xlim(0, max(relative_time * 1.2, 120))
-        self.ax.set_ylim(0, 1)  # 0-1 range for mixed pressure/gas display
-
-        # Update legend
-        if has_visible_channels:
-            self.ax.legend(loc='upper right', fontsize=10, ncol=1)
-
-    def reset(self):
-        """Reset plot data"""
-        self.time_data.clear()
-        
-        # Clear all pressure and gas data
-        for i in range(6):
-            self.all_pressure_data[i].clear()
-        for i in range(3):
-            self.all_gas_data[i].clear()
-
-        self.last_update_time = 0
-        
-        # Clear the plot and redraw
-        self.ax.clear()
-        self.ax.set_title("Pressure & Gas Concentrations vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Pressure (PSI) / Gas Fraction", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_xlim(0, 120)
-        self.ax.set_ylim(0, 1)
-        self.ax.text(0.5, 0.5, "Test not started", ha='center', va='center', transform=self.ax.transAxes)
-        self.canvas.draw()
+            sample.extend(gas_values)
+        return sample
     
-    def destroy(self):
-        """Clean up resources"""
-        if hasattr(self, 'animation'):
-            self.animation.event_source.stop()
-        self.canvas.get_tk_widget().destroy()
+    def _visible_series(self) -> List[Hashable]:
+        return ([('pressure', i) for i in sorted(self.state.visible_pressure_channels) if i < 6] +
+                [('gas', i) for i in sorted(self.state.visible_gas_channels) if i < 3])
 
 
-class VoltagePlot:
+class VoltagePlot(LivePlot):
     """Live cell voltage vs time plot"""
     
-    def __init__(self, parent_frame, max_points: int = 300):
-        self.parent_frame = parent_frame
-        self.state = get_global_state()
-        self.max_points = max_points
-        
-        # Data storage - store ALL channel data continuously, regardless of visibility
-        self.time_data = deque()  # Store entire test history
-        self.all_channel_data = {}  # Store data for ALL 120 channels continuously
-        
-        # Initialize deques for all 120 channels
-        for i in range(120):
-            self.all_channel_data[i] = deque()
-
-        # Plotting objects
-        self.last_update_time = 0
-        self.fig = Figure(figsize=(6, 4), dpi=80, facecolor='white')
-        self.ax = self.fig.add_subplot(111)
-        
+    title = "Cell Voltages vs Time"
+    ylabel = "Voltage (V)"
+    ylim = (0, 5)
+    
+    def _create_series(self):
         # Get a colormap
-        self.colors = plt.cm.get_cmap('tab20', 120)
-
-        # Create canvas and add to parent frame
-        self.canvas = FigureCanvasTkAgg(self.fig, self.parent_frame)
-        self.canvas.get_tk_widget().pack(fill='both', expand=True)
-        
-        # Start animation
-        self.animation = animation.FuncAnimation(
-            self.fig, self._update_plot, interval=100, blit=False, cache_frame_data=False
-        )
+        colors = plt.get_cmap('tab20', 120)
         
-        self.canvas.draw()
+        # Store data for ALL 120 channels continuously, regardless of visibility
+        for i in range(120):
+            self._add_line(i, color=colors(i / 120.0), linewidth=1.5, label=f'Ch {i + 1}')
     
-    def _update_plot(self, frame):
-        """Update plot with new data from GlobalState based on visible channels."""
-        current_time = time.time()
-        
-        # Throttle updates
-        if current_time - self.last_update_time < 0.1:  # 10 Hz max update rate
-            return
-        self.last_update_time = current_time
-
-        # Check test states
-        if self.state.emergency_stop or not self.state.test_running or self.state.test_paused:
-            return
-
-        relative_time = self.state.timer_value
-        self.time_data.append(relative_time)
-        
+    def _read_sample(self) -> List[float]:
         cell_voltages = self.state.cell_voltages
         
         # CONTINUOUSLY store data for ALL channels (background data collection)
-        for channel_idx in range(120):
-            if len(cell_voltages) > channel_idx:
-                self.all_channel_data[channel_idx].append(cell_voltages[channel_idx])
-            else:
-                self.all_channel_data[channel_idx].append(0.0)
-        
-        # Get currently visible channels for display
-        visible_channels = sorted(list(self.state.visible_voltage_channels))
-        
-        # --- Redraw the entire plot for dynamic channel visibility ---
-        self.ax.clear()
-        
-        # Configure plot appearance
-        self.ax.set_title("Cell Voltages vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Voltage (V)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-
-        if not visible_channels:
-            # If no channels are selected, just show an empty plot
-            self.ax.text(0.5, 0.5, "No channels selected", ha='center', va='center', transform=self.ax.transAxes)
-        else:
-            # Plot only the selected channels, but with their FULL historical data
-            for channel_idx in visible_channels:
-                if self.time_data and self.all_channel_data[channel_idx]:
-                    # Use the complete historical data for this channel
-                    time_list = list(self.time_data)
-                    data_list = list(self.all_channel_data[channel_idx])
-                    
-                    self.ax.plot(time_list, data_list, 
-                                 color=self.colors(channel_idx / 120.0), 
-                                 linewidth=1.5, 
-                                 label=f'Ch {channel_idx + 1}')
-
-        # Set axis limits to show entire history
-        self.ax.set_xlim(0, max(relative_time * 1.2, 120))
-        self.ax.set_ylim(0, 5)
-
-        # Update legend
-        if visible_channels:
-            # Adjust legend size and columns based on number of channels
-            num_channels = len(visible_channels)
-            if num_channels > 20:
-                ncol = 2
-                fontsize = 8
-            else:
-                ncol = 1
-                fontsize = 10
-            self.ax.legend(loc='upper right', fontsize=fontsize, ncol=ncol)
-
-    def reset(self):
-        """Reset plot data"""
-        self.time_data.clear()
-        
-        # Clear all channel data
-        for i in range(120):
-            self.all_channel_data[i].clear()
-            
-        self.last_update_time = 0
-        
-        # Clear the plot and redraw
-        self.ax.clear()
-        self.ax.set_title("Cell Voltages vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Voltage (V)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_xlim(0, 120)
-        self.ax.set_ylim(0, 5)
-        self.ax.text(0.5, 0.5, "Test not started", ha='center', va='center', transform=self.ax.transAxes)
-        self.canvas.draw()
+        return [cell_voltages[channel_idx] if len(cell_voltages) > channel_idx else 0.0
+                for channel_idx in range(120)]
     
-    def destroy(self):
-        """Clean up resources"""
-        if hasattr(self, 'animation'):
-            self.animation.event_source.stop()
-        self.canvas.get_tk_widget().destroy()
+    def _visible_series(self) -> List[Hashable]:
+        return [i for i in sorted(self.state.visible_voltage_channels) if i < 120]
+    
+    def _legend_style(self, count: int) -> Dict[str, Any]:
+        # Adjust legend size and columns based on number of channels
+        if count > 20:
+            return {'fontsize': 8, 'ncol': 2}
+        return {'fontsize': 10, 'ncol': 1}
 
 
-class TemperaturePlot:
+class TemperaturePlot(LivePlot):
     """Live temperature vs time plot"""
     
-    def __init__(self, parent_frame, max_points: int = 300):
-        self.parent_frame = parent_frame
-        self.state = get_global_state()
-        self.device_config = get_device_config()
-        self.max_points = max_points
-        
-        # Data storage - store ALL temperature and flowrate data continuously
-        self.time_data = deque()  # Store entire test history
-        self.all_temperature_data = {}  # Store data for all 8 temperature sensors continuously
-        self.flowrate_data = deque()  # Store flowrate data
-        
-        # Initialize deques for all 8 temperature sensors
-        for i in range(8):
-            self.all_temperature_data[i] = deque()
-        
-        self.last_update_time = 0
-        
-        # Create the matplotlib figure
-        self.fig = Figure(figsize=(6, 4), dpi=80, facecolor='white')
-        self.ax = self.fig.add_subplot(111)
-        
-        # Get colormap for temperature channels
-        self.colors = plt.cm.get_cmap('tab10', 8)  # 8 temperature channels
-        
-        # Create canvas and add to parent frame
-        self.canvas = FigureCanvasTkAgg(self.fig, parent_frame)
-        self.canvas.get_tk_widget().pack(fill='both', expand=True)
-        
-        # Start animation
-        self.animation = animation.FuncAnimation(
-            self.fig, self._update_plot, interval=100, blit=False, cache_frame_data=False
-        )
-        
-        self.canvas.draw()
+    title = "Temperatures & Flowrate vs Time"
+    ylabel = "Temperature (°C) / Flowrate (SLM)"
+    ylim = (0, 150)
     
-    def _update_plot(self, frame):
-        """Update plot with new data from GlobalState based on visible channels."""
-        current_time = time.time()
-        
-        # Throttle updates
-        if current_time - self.last_update_time < 0.1:  # 10 Hz max update rate
-            return
-        self.last_update_time = current_time
-
-        # Check test states
-        if self.state.emergency_stop or not self.state.test_running or self.state.test_paused:
-            return
-
-        relative_time = self.state.timer_value
-        self.time_data.append(relative_time)
-        
-        # CONTINUOUSLY store data for ALL temperature channels
-        temp_values = self.state.temperature_values
-        for i in range(8):
-            if len(temp_values) > i:
-                self.all_temperature_data[i].append(temp_values[i])
-            else:
-                self.all_temperature_data[i].append(0.0)
-        
-        # CONTINUOUSLY store flowrate data
-        flowrate_val = self.state.flowrate_value
-        self.flowrate_data.append(flowrate_val)
-        
-        # Get currently visible temperature and flowrate channels
-        visible_temp_channels = sorted(list(self.state.visible_temperature_channels))
-        visible_flowrate_channels = sorted(list(self.state.visible_flowrate_channels))
-        
-        # --- Redraw the entire plot for dynamic channel visibility ---
-        self.ax.clear()
+    def _create_series(self):
+        # Get colormap for temperature channels
+        colors = plt.get_cmap('tab10', 8)  # 8 temperature channels
         
-        # Configure plot appearance
-        self.ax.set_title("Temperatures & Flowrate vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Temperature (°C) / Flowrate (SLM)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-
         # Temperature channel names (dynamically loaded from devices.yaml)
         temp_names = self.device_config.get_pico_tc08_channel_names()
         
-        has_visible_channels = False
-        
-        # Plot visible temperature channels
-        if visible_temp_channels:
-            # Plot only the selected temperature channels with their FULL historical data
-            for channel_idx in visible_temp_channels:
-                if self.time_data and self.all_temperature_data[channel_idx]:
-                    # Use the complete historical data for this channel
-                    time_list = list(self.time_data)
-                    data_list = list(self.all_temperature_data[channel_idx])
-                    
-                    # Choose line style based on channel type
-                    if channel_idx < 4:  # TC01-TC04 (0-3)
-                        linestyle = '-'
-                        linewidth = 2
-                        alpha = 0.9
-                    else:  # TC05-TC08 (4-7)
-                        linestyle = '--'
-                        linewidth = 1.5
-                        alpha = 0.8
-                    
-                    self.ax.plot(time_list, data_list, 
-                                 color=self.colors(channel_idx), 
-                                 linewidth=linewidth, 
-                                 linestyle=linestyle,
-                                 alpha=alpha,
-                                 label=temp_names[channel_idx])
-                    has_visible_channels = True
-        
-        # Plot visible flowrate channels
-        if visible_flowrate_channels and 0 in visible_flowrate_channels:
-            if self.time_data and self.flowrate_data:
-                time_list = list(self.time_data)
-                data_list = list(self.flowrate_data)
-                
-                self.ax.plot(time_list, data_list, 
-                             color='red', 
-                             linewidth=2, 
-                             linestyle='-',
-                             alpha=1.0,
-                             label="Flowrate")
-                has_visible_channels = True
-        
-        if not has_visible_channels:
-            # If no channels are selected, just show an empty plot
-            self.ax.text(0.5, 0.5, "No channels selected", ha='center', va='center', transform=self.ax.transAxes)
-
-        # Set axis limits
-        self.ax.set_xlim(0, max(relative_time * 1.2, 120))
-        self.ax.set_ylim(0, 150)
-
-        # Update legend
-        if has_visible_channels:
-            # Adjust legend size based on number of channels
-            total_channels = len(visible_temp_channels) + len(visible_flowrate_channels)
-            if total_channels > 6:
-                fontsize = 8
-            else:
-                fontsize = 10
-            self.ax.legend(loc='upper right', fontsize=fontsize, ncol=1)
-
-    def reset(self):
-        """Reset plot data"""
-        self.time_data.clear()
-        
-        # Clear all temperature data
+        # All 8 temperature sensors, stored continuously
         for i in range(8):
-            self.all_temperature_data[i].clear()
-            
-        # Clear flowrate data
-        self.flowrate_data.clear()
-            
-        self.last_update_time = 0
-        
-        # Clear the plot and redraw
-        self.ax.clear()
-        self.ax.set_title("Temperatures & Flowrate vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Temperature (°C) / Flowrate (SLM)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_xlim(0, 120)
-        self.ax.set_ylim(0, 150)
-        self.ax.text(0.5, 0.5, "Test not started", ha='center', va='center', transform=self.ax.transAxes)
-        self.canvas.draw()
+            # Choose line style based on channel type: TC01-TC04 (0-3) solid, TC05-TC08 (4-7) dashed
+            solid = i < 4
+            self._add_line(('temperature', i), color=colors(i), linestyle='-' if solid else '--',
+                           linewidth=2 if solid else 1.5, alpha=0.9 if solid else 0.8,
+                           label=temp_names[i] if i < len(temp_names) else f"TC{i + 1:02d}")
+        self._add_line(('flowrate', 0), color='red', linewidth=2, linestyle='-', alpha=1.0, label="Flowrate")
     
-    def destroy(self):
-        """Clean up resources"""
-        if hasattr(self, 'animation'):
-            self.animation.event_source.stop()
-        self.canvas.get_tk_widget().destroy()
+    def _read_sample(self) -> List[float]:
+        # CONTINUOUSLY store data for ALL temperature channels, then flowrate
+        temp_values = self.state.temperature_values
+        return [temp_values[i] if len(temp_values) > i else 0.0 for i in range(8)] + [self.state.flowrate_value]
+    
+    def _visible_series(self) -> List[Hashable]:
+        series = [('temperature', i) for i in sorted(self.state.visible_temperature_channels) if i < 8]
+        if 0 in self.state.visible_flowrate_channels:
+            series.append(('flowrate', 0))
+        return series
+    
+    def _legend_style(self, count: int) -> Dict[str, Any]:
+        # Adjust legend size based on number of channels
+        return {'fontsize': 8 if count > 6 else 10, 'ncol': 1}
 
 
-class CurrentPlot:
+class CurrentPlot(LivePlot):
     """Live current vs time plot"""
     
-    def __init__(self, parent_frame, max_points: int = 300):
-        self.parent_frame = parent_frame
-        self.state = get_global_state()
-        self.max_points = max_points
-        
-        # Data storage - store current data continuously
-        self.time_data = deque()  # Store entire test history
-        self.current_data = deque()  # Store current sensor data
-        
-        self.last_update_time = 0
-        
-        # Create the matplotlib figure
-        self.fig = Figure(figsize=(6, 4), dpi=80, facecolor='white')
-        self.ax = self.fig.add_subplot(111)
-        
-        # Create canvas and add to parent frame
-        self.canvas = FigureCanvasTkAgg(self.fig, parent_frame)
-        self.canvas.get_tk_widget().pack(fill='both', expand=True)
-        
-        # Start animation
-        self.animation = animation.FuncAnimation(
-            self.fig, self._update_plot, interval=100, blit=False, cache_frame_data=False
-        )
-        
-        self.canvas.draw()
+    title = "Current vs Time"
+    ylabel = "Current (A)"
+    ylim = (0, 110)
+    empty_message = "Current channel not selected"
     
-    def _update_plot(self, frame):
-        """Update plot with new data from GlobalState."""
-        current_time = time.time()
-        
-        # Throttle updates
-        if current_time - self.last_update_time < 0.1:  # 10 Hz max update rate
-            return
-        self.last_update_time = current_time
-
-        # Check test states
-        if self.state.emergency_stop or not self.state.test_running or self.state.test_paused:
-            return
-
-        relative_time = self.state.timer_value
-        self.time_data.append(relative_time)
-        
+    def _create_series(self):
+        self._add_line('current', color='blue', linewidth=2, label='Stack Current')
+    
+    def _read_sample(self) -> List[float]:
         # Store current data continuously
-        current_value = self.state.current_value
-        self.current_data.append(current_value)
-        
+        return [self.state.current_value]
+    
+    def _visible_series(self) -> List[Hashable]:
         # Check if current channel is visible (for future extensibility)
         visible_current = getattr(self.state, 'visible_current_channels', {0})
-        show_current = 0 in visible_current
-        
-        # --- Redraw the entire plot ---
-        self.ax.clear()
-        
-        # Configure plot appearance
-        self.ax.set_title("Current vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Current (A)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-
-        if not show_current:
-            # If current channel not selected, show empty plot
-            self.ax.text(0.5, 0.5, "Current channel not selected", ha='center', va='center', transform=self.ax.transAxes)
-        else:
-            # Plot current data with full historical data
-            if self.time_data and self.current_data:
-                time_list = list(self.time_data)
-                data_list = list(self.current_data)
-                
-                self.ax.plot(time_list, data_list, 
-                             color='blue', 
-                             linewidth=2, 
-                             label='Stack Current')
-
-        # Set axis limits
-        self.ax.set_xlim(0, max(relative_time * 1.2, 120))
-        self.ax.set_ylim(0, 110)
-
-        # Update legend
-        if show_current:
-            self.ax.legend(loc='upper right', fontsize=10)
-
-    def reset(self):
-        """Reset plot data"""
-        self.time_data.clear()
-        self.current_data.clear()
-        self.last_update_time = 0
-        
-        # Clear the plot and redraw
-        self.ax.clear()
-        self.ax.set_title("Current vs Time", fontsize=12, fontweight='bold')
-        self.ax.set_xlabel("Time (s)", fontsize=10)
-        self.ax.set_ylabel("Current (A)", fontsize=10)
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_xlim(0, 120)
-        self.ax.set_ylim(0, 110)
-        self.ax.text(0.5, 0.5, "Test not started", ha='center', va='center', transform=self.ax.transAxes)
-        self.canvas.draw()
-    
-    def destroy(self):
-        """Clean up resources"""
-        if hasattr(self, 'animation'):
-            self.animation.event_source.stop()
-        self.canvas.get_tk_widget().destroy()
+        return ['current'] if 0 in visible_current else []
 
 
 def test_pressure_plot():
-    """Test the pressure, gas concentration, voltage, and temperature plots independently"""
-    import threading
+    """Test the pressure/gas, voltage and temperature/flowrate plots together"""
     from services.controller_manager import get_controller_manager
     
     # Create test window
@@ -638,7 +616,7 @@ def test_pressure_plot():
     voltage_frame.grid(row=0, column=1, padx=(5, 0), pady=(0, 5), sticky='nsew')
     
     # Bottom-left: Temperature plot
-    temperature_frame = ttk.LabelFrame(main_frame, text="Temperatures", padding="5")
+    temperature_frame = ttk.LabelFrame(main_frame, text="Temperatures & Flowrate", padding="5")
     temperature_frame.grid(row=1, column=0, padx=(0, 5), pady=(5, 0), sticky='nsew')
     
     # Bottom-right: Info panel
@@ -655,38 +633,27 @@ def test_pressure_plot():
     info_text.pack(fill='both', expand=True)
     
     info_content = """PLOT TESTING - ALL LIVE PLOTS
-    
+
 🔥 Pressure & Gas (Y: 0-1):
-   • Blue solid: Pressure 1
-   • Red solid: Pressure 2  
-   • Green dashed: H₂ (H-side)
-   • Magenta dashed: O₂ (O-side)
-   • Green dotted: H₂ (mixed)
+   • PT01-PT06: solid lines (Set1 colors)
+   • BGA 1-3 primary gas fraction: dashed lines
 
 ⚡ Cell Voltages (Y: 0-5V):
-   • Blue: Group 1 (cells 1-20)
-   • Green: Group 2 (cells 21-40)
-   • Red: Group 3 (cells 41-60)
-   • Magenta: Group 4 (cells 61-80)
-   • Cyan: Group 5 (cells 81-100)
-   • Yellow: Group 6 (cells 101-120)
-
-🌡️  Temperatures (Y: 0-100°C):
-   • Blue: Inlet water temp
-   • Red: Outlet water temp
-   • Green: Stack temp 1
-   • Magenta: Stack temp 2
-   • Cyan dashed: Ambient temp
-   • Yellow dashed: Cooling temp
-   • Orange: Gas output temp
-   • Brown: Case temp
-
-ARCHITECTURE:
-✅ Static Y-axis, dynamic X-axis
-✅ Same deque() storage pattern
-✅ Same update throttling (10Hz)
-✅ Same state checking logic
-✅ Thread-safe operations
+   • Channels 1-120, one line per selected channel
+
+🌡️  Temperatures & Flowrate (Y: 0-150):
+   • TC01-TC04 solid, TC05-TC08 dashed
+   • Flowrate (SLM): red
+
+Only channels selected in the control panel are drawn
+(GlobalState visible_*_channels); all are recorded.
+
+ARCHITECTURE (LivePlot):
+✅ Background worker samples GlobalState and decimates
+✅ Full history in a level-of-detail pyramid
+✅ Persistent lines redrawn by blitting
+✅ Frame budget: slow frames skip following updates
+✅ Static Y-axis, X-axis grows in 1.2x steps
 ✅ Reset functionality
 
 Close window when done testing..."""
@@ -712,19 +679,12 @@ Close window when done testing..."""
     print("=" * 70)
     print("ALL PLOTS TEST: PRESSURE, GAS, VOLTAGE & TEMPERATURE")
     print("=" * 70)
-    print("✅ Live pressure & gas concentration plot created")
-    print("✅ Live cell voltage plot created (120 cells, 6 groups)")
-    print("✅ Live temperature plot created (8 thermocouples)")
-    print("✅ Data updating from GlobalState")
+    print("✅ Live pressure & gas concentration plot created (6 pressure + 3 gas channels)")
+    print("✅ Live cell voltage plot created (120 channels)")
+    print("✅ Live temperature & flowrate plot created (8 thermocouples + flowrate)")
+    print("✅ Data prepared from GlobalState by the plot data worker")
     print("✅ Static Y-axis, dynamic X-axis for all plots")
-    print("\nPressure & Gas Plot (Y: 0-1):")
-    print("   • 2 pressure sensors + 3 gas concentrations")
-    print("\nVoltage Plot (Y: 0-5V):")
-    print("   • 6 group averages (20 cells each)")
-    print("\nTemperature Plot (Y: 0-100°C):")
-    print("   • 8 thermocouple channels")
-    print("   • Inlet, outlet, stack, ambient, cooling, gas, case temps")
-    print("\nAll plots follow same proven architecture!")
+    print("\nOnly the channels selected for display are drawn; all are recorded.")
     print("Close window when done testing...")
     
     root.mainloop()
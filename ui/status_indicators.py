@@ -79,12 +79,19 @@ class StatusIndicators:
             info_label.grid(row=i, column=3, sticky='w', padx=5, pady=2)
             self.status_labels[device_key] = info_label
     
-    def update_device_status(self, device: str, connected: bool, info: str = ""):
-        """Update the status of a specific device"""
+    def update_device_status(self, device: str, connected: bool, info: str = "", stale: bool = False):
+        """Update the status of a specific device (stale: connected but no new samples)"""
         if device in self.device_status:
             self.device_status[device] = connected
             
-            if connected:
+            if connected and stale:
+                self.status_indicators[device].configure(
+                    text="⚠️ Stale",
+                    background="orange",
+                    foreground="black"
+                )
+                self.status_labels[device].configure(text="No new data", foreground="darkorange")
+            elif connected:
                 self.status_indicators[device].configure(
                     text="✅ Connected",
                     background="green",